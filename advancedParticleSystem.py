@@ -4,7 +4,28 @@ from collections import OrderedDict
 import bgl
 import aud
 import os
+import math
 import random
+from functools import partial
+
+import numpy as np
+
+from shaderCache import program_cache, source_key
+from uniformState import uniform_state_for, totals as uniform_totals
+from audioRegistry import audio_registry
+from particleManager import get_manager
+from weatherRegistry import get_registry, resolve_weather_type, quality_priority
+from debugLog import get_logger
+from frameProfiler import profiler, profiled
+from atlasBuilder import load_metadata
+from windField import get_wind_field
+from particleBuffers import (ParticleBuffers, StateTexture, heightfield_from_object,
+                             STATE_TEXTURE_UNIT, RANDOM_TEXTURE_UNIT)
+from randomSource import RANDOM_SOURCES, DEFAULT_LUT_SIZE, generate_lut
+from particleSimulator import BILLBOARD_MODES, EMISSION_MODES, DEFAULT_HYBRID_SAMPLES, compute_hybrid_grid
+
+# Mensagens dos sistemas (nível ajustável com debugLog.set_level)
+log = get_logger("particulas")
 
 # Vertex Shader - Processa cada vértice da geometria base
 vertex = """
@@ -30,28 +51,80 @@ out geomData {
     float fade;
     float life_progress;
     vec3 color;
+#if FLIPBOOK
+    vec4 frame_rect;
+    vec4 next_rect;
+    float frame_blend;
+#endif
 } geom;
 
 uniform sampler2D bgl_DepthTexture;
 uniform vec2 screen_size;
 
 uniform float time;
+uniform float intensity;
 uniform int emission_mode;
 uniform int use_tracking;
 
-uniform float ref_pos_x;
-uniform float ref_pos_y;
-uniform float ref_pos_z;
+uniform vec3 ref_pos;
+
+// Vento da cena (windField): vetor médio e amplitude da turbulência
+uniform vec3 wind_vector;
+uniform float wind_turbulence;
 
 // Gera valor aleatório baseado em coordenadas
 float getRand(vec2 coord){
     return fract(sin(dot(coord, vec2(12.9898, 78.233))) * 43758.5453);
 }
 
-// Converte coordenadas de tela para posição mundial usando depth buffer
-vec3 getWorldPos(vec2 uv) {
-    float depth = texture(bgl_DepthTexture, uv).r;
-    return vec3((uv.x - 0.5) * 20.0, (uv.y - 0.5) * 20.0, depth * 10.0 - 5.0);
+#if RANDOM_SOURCE == 1
+// Hash inteiro PCG: igual bit a bit ao randomSource.hash_rand (NumPy)
+uint pcgHash(uint v) {
+    uint state = v * 747796405u + 2891336453u;
+    uint word = ((state >> ((state >> 28u) + 4u)) ^ state) * 277803737u;
+    return (word >> 22u) ^ word;
+}
+
+float hashRand(int j, uint stream) {
+    return float(pcgHash(uint(j) * 4u + stream) >> 8u) * (1.0 / 16777216.0);
+}
+#endif
+
+// Três valores aleatórios da partícula (dispersão x, y e z) pela fonte
+// escolhida no arg random_source
+vec3 particleNoise(int j) {
+#if RANDOM_SOURCE == 1
+    return vec3(hashRand(j, 0u), hashRand(j, 1u), hashRand(j, 2u));
+#elif RANDOM_SOURCE == 2
+    // Tabela sorteada: um texel por partícula, uma única leitura
+    int index = j % random_lut_entries;
+    return texelFetch(random_lut, ivec2(index % random_lut_size, index / random_lut_size), 0).xyz;
+#else
+    return vec3(getRand(vec2(j, 0.5)), getRand(vec2(j, 1.3)), getRand(vec2(j, 2.7)));
+#endif
+}
+
+// Reconstrói a posição da superfície a partir do depth buffer
+// (inversa da view-projection; resultado no espaço do objeto, o mesmo
+// usado por gl_ModelViewMatrix na saída dos vértices)
+vec3 getWorldPos(vec2 uv, float depth) {
+    vec4 ndc = vec4(uv * 2.0 - 1.0, depth * 2.0 - 1.0, 1.0);
+    vec4 position = gl_ModelViewProjectionMatrixInverse * ndc;
+    return position.xyz / position.w;
+}
+
+// Retângulo uv (canto inferior esquerdo, tamanho) de um quadro do flipbook:
+// lido dos metadados do atlas ou calculado pela grade (o quadro 0 fica no
+// canto superior esquerdo da imagem, como no atlas exportado)
+vec4 flipbookRect(float index) {
+#if ATLAS_RECTS
+    return frame_rects[int(index)];
+#else
+    float column = mod(index, float(flipbook_grid.x));
+    float row = floor(index / float(flipbook_grid.x));
+    vec2 size = 1.0 / vec2(flipbook_grid);
+    return vec4(vec2(column, float(flipbook_grid.y) - 1.0 - row) * size, size);
+#endif
 }
 
 // Função para Billboard 2D (Screen-Aligned)
@@ -77,15 +150,63 @@ vec3 applyBillboard3D(vec3 position, vec3 target, vec2 vertex_offset, float scal
 }
 
 void main() {
-    // Loop através de todas as partículas
-    for (int j = 0; j < amount; j++) {
+    // Bloco de partículas desta invocação (emissão em blocos acima de max_vertices)
+    int chunk = CHUNK_PRIMITIVE * chunk_invocations + CHUNK_INVOCATION;
+    if (chunk >= chunk_count) return;
+    int first_particle = chunk * chunk_size;
+
+#if STATEFUL
+    // Com estado, a intensidade controla a taxa de criação na CPU e os
+    // slots vivos ficam espalhados pelo anel inteiro
+    int active_amount = state_capacity;
+#else
+    // Apenas a fração ativa de amount é emitida (intensity 0..1)
+    int active_amount = int(ceil(float(amount) * clamp(intensity, 0.0, 1.0)));
+#endif
+    int last_particle = min(first_particle + chunk_size, active_amount);
+    if (first_particle >= last_particle) return;
+
+    // Modo Hybrid: grade de amostras cobrindo a tela inteira, cada célula
+    // lê um único texel do depth (nível 0, no centro da célula)
+    int hybrid_cells = hybrid_grid.x * hybrid_grid.y;
+    int per_cell = max(1, (amount + hybrid_cells - 1) / hybrid_cells);
+    int cached_cell = -1;
+    bool cell_surface = false;
+    vec3 cell_position = vec3(0.0);
+
+    // Loop através das partículas do bloco (j é o índice global da partícula)
+    for (int j = first_particle; j < last_particle; j++) {
+#if STATEFUL
+        // Estado dos buffers NumPy: xyz = posição, w = progresso da vida (<0 = slot livre)
+        vec4 state = texelFetch(particle_state, ivec2(j % state_width, j / state_width), 0);
+        if (state.w < 0.0) continue;
+        float life_progress = state.w;
+#else
         // Calcula progresso da vida da partícula
         float life_progress = mod(time + float(j) * 0.1, life) / life;
+#endif
         geom.life_progress = life_progress;
+
+#if FLIPBOOK
+        // Quadro do flipbook calculado uma vez por partícula: pela vida ou em
+        // loop por fps; o fragment faz uma leitura (duas com mistura)
+        float frames = float(flipbook_frames);
+        float frame_position = flipbook_fps > 0.0
+            ? (time + float(j) * 0.1) * flipbook_fps
+            : life_progress * frames;
+        float frame_index = mod(floor(frame_position), frames);
+        float next_index = flipbook_fps > 0.0
+            ? mod(frame_index + 1.0, frames)
+            : min(frame_index + 1.0, frames - 1.0);
+        geom.frame_rect = flipbookRect(frame_index);
+        geom.next_rect = flipbookRect(next_index);
+        geom.frame_blend = fract(frame_position);
+#endif
         
         // Gera ruído para variação
-        float noise_x = getRand(vec2(j, 0.5));
-        float noise_y = getRand(vec2(j, 1.3));
+        vec3 noise = particleNoise(j);
+        float noise_x = noise.x;
+        float noise_y = noise.y;
         
         // Calcula fade baseado no progresso da vida
         geom.fade = 1.0 - (life_progress / life);
@@ -103,6 +224,10 @@ void main() {
         }
         geom.color = final_color;
 
+#if STATEFUL
+        // Posição integrada (e colidida) na CPU
+        vec3 final_position = state.xyz;
+#else
         // POSICIONAMENTO BASE
         vec3 base_position = vec3(0.0);
         
@@ -112,15 +237,24 @@ void main() {
             base_position = world_emission_center;
         } else if (emission_mode == 1) { 
             // Modo Camera: posição relativa à câmera
-            base_position = vec3(ref_pos_x, ref_pos_y, ref_pos_z);
+            base_position = ref_pos;
         } else if (emission_mode == 2) { 
-            // Modo Hybrid: baseado em depth buffer
-            vec2 texcoord = vec2(
-                float(j % int(screen_size.x)) / screen_size.x,
-                float(j / int(screen_size.x)) / screen_size.y
-            );
-            base_position = getWorldPos(texcoord);
+            // Modo Hybrid: ancorado na superfície visível (partículas
+            // consecutivas compartilham a célula e a leitura de depth)
+            int cell = (j / per_cell) % hybrid_cells;
+            if (cell != cached_cell) {
+                cached_cell = cell;
+                vec2 uv = (vec2(cell % hybrid_grid.x, cell / hybrid_grid.x) + 0.5) / vec2(hybrid_grid);
+                ivec2 texel = clamp(ivec2(uv * screen_size), ivec2(0), ivec2(screen_size) - 1);
+                float depth = texelFetch(bgl_DepthTexture, texel, 0).r;
+                cell_surface = depth < 1.0;
+                cell_position = getWorldPos(uv, depth);
+            }
+            // Céu (sem superfície): a partícula não é emitida
+            if (!cell_surface) continue;
+            base_position = cell_position;
         }
+        // Modo Volume: ancorado no mundo e dobrado na caixa da referência (abaixo)
 
         // MOVIMENTO BÁSICO
         vec3 movement = base_direction * movement_speed * life_progress;
@@ -129,21 +263,48 @@ void main() {
         vec3 dispersion = vec3(
             (noise_x * 2.0 - 1.0) * dispersion_area.x,
             (noise_y * 2.0 - 1.0) * dispersion_area.y,
-            (getRand(vec2(j, 2.7)) * 2.0 - 1.0) * dispersion_area.z
+            (noise.z * 2.0 - 1.0) * dispersion_area.z
         );
+        if (emission_mode == 3) {
+            // Volume: distribuição uniforme em uma caixa (o módulo faz o resto)
+            dispersion = noise * volume_size;
+        }
+
+        // VENTO: deriva acumulada pela idade da partícula e oscilação
+        // própria de cada uma (fase pelo ruído)
+        float age = life_progress * life;
+        vec3 wind_offset = wind_vector * (wind_influence * age);
+        wind_offset.xy += wind_turbulence * wind_influence * vec2(
+            sin(time * 1.7 + noise_x * 6.2831853),
+            cos(time * 1.3 + noise_y * 6.2831853));
 
         // POSIÇÃO FINAL COM MOVIMENTO E DISPERSÃO
-        vec3 final_position = base_position + movement + dispersion;
+        vec3 final_position = base_position + movement + dispersion + wind_offset;
 
         // REINICIO quando a partícula chega ao fim da vida
         if (life_progress >= 1.0) {
             if (emission_mode == 0) final_position = world_emission_center;
-            else if (emission_mode == 1) final_position = vec3(ref_pos_x, ref_pos_y, ref_pos_z);
+            else if (emission_mode == 1) final_position = ref_pos;
+        }
+
+        // VOLUME: posição módulo a caixa centrada na referência, então a
+        // mesma quantidade de partículas cerca o observador onde ele estiver
+        if (emission_mode == 3) {
+            vec3 corner = ref_pos - 0.5 * volume_size;
+            final_position = corner + mod(final_position - corner, volume_size);
+        }
+#endif
+
+        // Fade nas bordas do volume para esconder o salto do módulo
+        if (emission_mode == 3) {
+            vec3 edge = abs(final_position - ref_pos) / (0.5 * volume_size);
+            float border = max(edge.x, max(edge.y, edge.z));
+            geom.fade *= 1.0 - smoothstep(1.0 - volume_fade, 1.0, border);
         }
 
         // SISTEMA DE BILLBOARD/TrackTo
         if (use_tracking == 1 && rotate_movement == 1) {
-            vec3 target_pos = vec3(ref_pos_x, ref_pos_y, ref_pos_z);
+            vec3 target_pos = ref_pos;
             float current_scale = scale_start + (scale_end - scale_start) * life_progress;
             
             if (billboard_mode == 1) {
@@ -229,21 +390,34 @@ in geomData {
     float fade;
     float life_progress;
     vec3 color;
+#if FLIPBOOK
+    vec4 frame_rect;
+    vec4 next_rect;
+    float frame_blend;
+#endif
 } geom;
 
 uniform sampler2D textures[7];
 uniform int texture_count;
 
 void main() {
-    // Amostra textura base
-    vec4 tex_color = texture(textures[0], geom.coord);
-    
-    // Sequência de texturas baseada no tempo de vida
-    for (int i = 0; i < texture_count; i++) {
-        if (geom.life_progress > (1.0 / float(texture_count)) * float(i)) {
+#if FLIPBOOK
+    // Flipbook: quadro vindo do geometry shader, uma leitura do atlas
+    vec4 tex_color = texture(textures[0], geom.frame_rect.xy + geom.coord * geom.frame_rect.zw);
+#if FLIPBOOK_BLEND
+    tex_color = mix(tex_color, texture(textures[0], geom.next_rect.xy + geom.coord * geom.next_rect.zw), geom.frame_blend);
+#endif
+#else
+    // Sequência de texturas baseada no tempo de vida: a etapa é calculada
+    // antes e apenas a textura escolhida é lida
+    int stage = clamp(int(ceil(geom.life_progress * float(texture_count))) - 1, 0, max(texture_count - 1, 0));
+    vec4 tex_color = vec4(0.0);
+    for (int i = 0; i < 7; i++) {
+        if (i == stage) {
             tex_color = texture(textures[i], geom.coord);
         }
     }
+#endif
 
     // Aplica cor e transparência
     gl_FragColor.rgb = tex_color.rgb * geom.color;
@@ -251,6 +425,142 @@ void main() {
 }
 """
 
+# Parâmetros do shader ajustáveis em tempo de execução: nome -> tipo GLSL
+# No modo constantes viram `const`; no modo uniforms viram `uniform`
+RUNTIME_PARAMETERS = OrderedDict([
+    ("amount", "int"),
+    ("life", "float"),
+    ("scale_start", "float"),
+    ("scale_end", "float"),
+    ("movement_speed", "float"),
+    ("fade_in", "float"),
+    ("fade_out", "float"),
+    ("base_direction", "vec3"),
+    ("rotate_movement", "int"),
+    ("billboard_mode", "int"),
+    ("dispersion_area", "vec3"),
+    ("start_color", "vec3"),
+    ("mid_color", "vec3"),
+    ("end_color", "vec3"),
+    ("world_emission_center", "vec3"),
+])
+
+def glsl_literal(kind, value):
+    """
+    Formata um valor Python como literal GLSL do tipo informado
+    """
+    if kind == "vec3":
+        return f"vec3({float(value[0])}, {float(value[1])}, {float(value[2])})"
+    if kind == "float":
+        return str(float(value))
+    return str(int(value))
+
+# Níveis de LOD por distância: fração de amount, fração de life e billboard
+# forçado (None mantém o configurado). O índice 0 é o sistema completo.
+LOD_TIERS = [
+    {"amount": 1.0, "life": 1.0, "billboard_mode": None},
+    {"amount": 0.5, "life": 1.0, "billboard_mode": None},
+    {"amount": 0.25, "life": 0.75, "billboard_mode": "Nenhum"},
+    {"amount": 0.1, "life": 0.5, "billboard_mode": "Nenhum"},
+]
+
+# Máximo de quadros de um atlas enviados como uniforms (frame_rects)
+MAX_ATLAS_FRAMES = 64
+
+# Metadados de atlas já lidos: caminho absoluto -> lista de retângulos uv
+atlas_cache = {}
+
+def load_atlas_rects(path):
+    """
+    Retângulos uv (u, v, largura, altura) de um atlas gerado pelo
+    atlasBuilder, lidos uma vez por processo
+    Retorna: lista de tuplas ou None se os metadados não puderem ser lidos
+    """
+    rects = atlas_cache.get(path)
+    if rects is None:
+        try:
+            rects = load_metadata(path)["rects"]
+        except (OSError, ValueError, KeyError) as error:
+            log.error("Metadados de atlas inválidos: %s (%s)", path, error)
+            return None
+        atlas_cache[path] = rects
+    return rects
+
+# Tabelas aleatórias já enviadas à GPU: semente -> StateTexture
+random_textures = {}
+
+def load_random_texture(seed):
+    """
+    Textura da tabela aleatória de uma semente, criada e enviada uma vez
+    por processo e compartilhada pelos sistemas com a mesma semente
+    """
+    texture = random_textures.get(seed)
+    if texture is None:
+        texture = StateTexture(DEFAULT_LUT_SIZE, DEFAULT_LUT_SIZE, RANDOM_TEXTURE_UNIT)
+        texture.upload(generate_lut(seed, DEFAULT_LUT_SIZE))
+        random_textures[seed] = texture
+    return texture
+
+# Limites do geometry shader (mínimos garantidos pela especificação; os
+# valores do driver são lidos uma vez por geometry_output_limits)
+MIN_GEOMETRY_OUTPUT_VERTICES = 256      # GL_MAX_GEOMETRY_OUTPUT_VERTICES
+MIN_GEOMETRY_OUTPUT_COMPONENTS = 1024   # GL_MAX_GEOMETRY_TOTAL_OUTPUT_COMPONENTS
+MAX_GEOMETRY_INVOCATIONS = 32           # GL_MAX_GEOMETRY_SHADER_INVOCATIONS mínimo garantido
+GL_MAX_GEOMETRY_OUTPUT_VERTICES = 0x8DE0
+GL_MAX_GEOMETRY_TOTAL_OUTPUT_COMPONENTS = 0x8DE1
+
+# Componentes de saída por vértice: gl_Position (4) + geomData (coord 2,
+# fade 1, life_progress 1, color 3); o Flipbook soma frame_rect 4,
+# next_rect 4 e frame_blend 1
+GEOMETRY_VERTEX_COMPONENTS = 11
+FLIPBOOK_VERTEX_COMPONENTS = 9
+
+# Limites lidos do driver: (vértices, componentes)
+geometry_limits = []
+
+def geometry_output_limits():
+    """
+    Máximo de vértices e de componentes de saída do geometry shader,
+    consultados no driver na primeira compilação (precisa de contexto GL)
+    Retorna: (vértices, componentes), nunca abaixo dos mínimos da especificação
+    """
+    if not geometry_limits:
+        limits = []
+        for name, minimum in ((GL_MAX_GEOMETRY_OUTPUT_VERTICES, MIN_GEOMETRY_OUTPUT_VERTICES),
+                              (GL_MAX_GEOMETRY_TOTAL_OUTPUT_COMPONENTS, MIN_GEOMETRY_OUTPUT_COMPONENTS)):
+            value = 0
+            try:
+                buffer = bgl.Buffer(bgl.GL_INT, 1)
+                bgl.glGetIntegerv(name, buffer)
+                value = int(buffer[0])
+            except (AttributeError, TypeError, ValueError, RuntimeError):
+                pass
+            limits.append(max(value, minimum))
+        geometry_limits.extend(limits)
+        log.info("Geometry shader: até %d vértices e %d componentes de saída", *limits)
+    return tuple(geometry_limits)
+
+def compute_chunk_layout(amount, components=GEOMETRY_VERTEX_COMPONENTS, limits=None):
+    """
+    Divide `amount` partículas em blocos que cabem na saída do geometry
+    shader: max_vertices e o total de componentes (vértices x componentes
+    por vértice, 3 vértices por partícula)
+    Cada bloco é emitido por uma invocação do geometry shader; acima de
+    MAX_GEOMETRY_INVOCATIONS blocos, os triângulos da malha base também
+    recebem blocos distintos (gl_PrimitiveIDIn)
+    `limits`: (vértices, componentes); padrão: os mínimos da especificação
+    Retorna: (chunk_size, chunk_count, invocations, triangles_needed)
+    """
+    amount = max(int(amount), 1)
+    max_vertices, max_components = limits or (MIN_GEOMETRY_OUTPUT_VERTICES, MIN_GEOMETRY_OUTPUT_COMPONENTS)
+    per_chunk_limit = max(1, min(max_vertices // 3, max_components // (3 * components)))
+    chunk_count = -(-amount // per_chunk_limit)
+    # Distribui igualmente para não deixar um bloco quase vazio
+    chunk_size = -(-amount // chunk_count)
+    invocations = min(chunk_count, MAX_GEOMETRY_INVOCATIONS)
+    triangles_needed = -(-chunk_count // invocations)
+    return chunk_size, chunk_count, invocations, triangles_needed
+
 class AdvancedParticleSystem(types.KX_PythonComponent):
     # Define os argumentos configuráveis do componente
     args = OrderedDict([
@@ -262,9 +572,12 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         ("life", 5.0),    # Duração de vida em segundos
         
         # SISTEMA DE EMISSÃO
-        ("emission_mode", {"World", "Camera", "Hybrid"}),  # Modo de emissão
+        ("emission_mode", {"World", "Camera", "Hybrid", "Volume"}),  # Modo de emissão (Volume = caixa que segue a referência)
         ("world_emission_center", Vector((0, 0, 0))),     # Centro de emissão para modo World
         ("reference_object", "Camera"),                   # Objeto de referência para modo Camera
+        ("hybrid_samples", DEFAULT_HYBRID_SAMPLES),       # Leituras de depth por frame no modo Hybrid
+        ("volume_size", Vector((30.0, 30.0, 20.0))),      # Caixa do modo Volume (centrada na referência)
+        ("volume_fade", 0.15),                            # Fração da meia caixa usada no fade das bordas
         
         # MOVIMENTO
         ("base_direction", Vector((0, 1, 0))),           # Direção base do movimento
@@ -291,6 +604,51 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         ("fade_in", 0.2),   # 20% da vida para fade in
         ("fade_out", 0.3),  # 30% da vida para fade out
 
+        # TEXTURAS
+        ("texture_mode", {"Sequência", "Flipbook"}),  # Sequência = um slot por etapa; Flipbook = atlas no slot 0
+        ("flipbook_grid", Vector((4, 4, 0))),         # Colunas e linhas do atlas
+        ("flipbook_frames", 0),                       # Quadros usados (0 = colunas x linhas)
+        ("flipbook_fps", 0.0),                        # 0 = quadros distribuídos pela vida; >0 = loop por segundo
+        ("flipbook_blend", False),                    # Mistura o quadro atual com o próximo (2 leituras)
+        ("flipbook_atlas", ""),                       # JSON (ou PNG) gerado pelo atlasBuilder; substitui a grade
+
+        # PARÂMETROS EM TEMPO REAL
+        ("runtime_parameters", False),  # Envia parâmetros como uniforms (ajustes sem recompilar)
+
+        # LOD POR DISTÂNCIA DA CÂMERA
+        ("lod_enabled", False),                         # Reduz o sistema conforme a distância
+        ("lod_distances", Vector((40.0, 80.0, 160.0))), # Distâncias de troca para LOD 1, 2 e 3
+        ("lod_hysteresis", 5.0),                        # Margem para evitar alternância na fronteira
+
+        # CULLING POR FRUSTUM
+        ("frustum_culling", True),  # Esconde o sistema quando fora da visão da câmera
+        ("culling_margin", 1.0),    # Margem extra no volume envolvente
+
+        # VENTO DA CENA
+        ("wind_influence", 1.0),  # Quanto o vento global arrasta o sistema (0 = ignora)
+
+        # ALEATORIEDADE POR PARTÍCULA
+        ("random_source", {"Seno", "Hash", "Tabela"}),  # Seno = getRand original; Hash = PCG inteiro; Tabela = textura sorteada
+        ("random_seed", 1),                             # Semente da tabela (modo Tabela)
+
+        # ESTADO PERSISTENTE (CPU/NumPy)
+        ("stateful", False),                              # Posição/velocidade/idade em buffers (colisão com o chão)
+        ("gravity", Vector((0.0, 0.0, 0.0))),             # Aceleração aplicada às partículas com estado
+        ("collision", {"Nenhuma", "Plano", "Heightfield"}),
+        ("collision_response", {"Morrer", "Parar", "Quicar"}),  # Morrer = chuva; Parar = neve que assenta
+        ("ground_height", 0.0),                           # Altura do plano de colisão
+        ("ground_object", ""),                            # Terreno usado como heightfield
+        ("ground_cell_size", 1.0),                        # Espaçamento da grade do heightfield
+        ("bounce", 0.3),                                  # Restituição no modo Quicar
+
+        # GERENCIADOR DE CENA
+        ("use_manager", True),  # Atualização centralizada uma vez por frame
+        ("weather_type", {"Automático", "chuva", "neve", "nevoa", "poeira", "folhas", "Nenhum"}),  # Tipo de clima (Automático = pelo nome)
+
+        # QUALIDADE ADAPTATIVA (governador do gerenciador)
+        ("quality_min", 0.1),     # Fração mínima de partículas mantida sob pressão
+        ("quality_priority", 0),  # 0 = pelo tipo de clima; menor = reduzido primeiro
+
         # SISTEMA DE ÁUDIO
         ("audio_file", ""),  # Arquivo de áudio principal
         ("audio_behavior", {"Nenhum", "Contínuo", "Uma Vez", "Aleatório"}),  # Comportamento do áudio
@@ -316,21 +674,74 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
             
         # Armazena configurações para uso posterior
         self.args = args
+        self.compiled_amount = args["amount"]
+
+        # LOD usa o modo uniforms: um único programa atende todos os níveis
+        self.lod_enabled = args.get("lod_enabled", False)
+        self.lod_distances = sorted(d for d in args.get("lod_distances", ()) if d > 0)
+        self.lod_hysteresis = args.get("lod_hysteresis", 5.0)
+        self.lod_tiers = [dict(tier) for tier in LOD_TIERS]
+        self.lod_level = 0
+        self.runtime_parameters = args.get("runtime_parameters", False) or self.lod_enabled
+
+        # Culling: volume envolvente recalculado quando os parâmetros mudam
+        self.frustum_culling = args.get("frustum_culling", True)
+        self.culling_margin = args.get("culling_margin", 1.0)
+        self.local_bounds = None
+        self.bounds_dirty = True
+        self.culled = False
+
+        # Intensidade (fração de partículas emitidas) - sempre um uniform
+        # O uniform recebe intensity x quality_scale (escala do governador)
+        self.intensity = 1.0
+        self.quality_scale = 1.0
+        self.quality_min = max(0.0, min(1.0, args.get("quality_min", 0.1)))
+
+        # Uniforms próprios do objeto (nome -> (tipo, valor)), enviados no
+        # callback de desenho porque o shader é compartilhado pelo material
+        self.object_uniforms = OrderedDict()
+        self.object_uniforms_dirty = set()
+        self.draw_callback = False
         
-        # Inicializa sistema de áudio
-        self.audio_device = aud.Device()
+        # Inicializa sistema de áudio (dispositivo e buffers compartilhados)
+        self.audio_device = audio_registry.device()
         self.audio_handle = None
         self.audio_buffers = []
+        self.audio_paths = []
+        self.audio_pending = []
         self.last_audio_time = 0.0
         self.next_audio_time = 0.0
         self.audio_initialized = False
         
-        # Configura sistema de áudio
+        # Configura sistema de áudio (a decodificação fica para load_audio)
         self.initialize_audio_system(args)
+        if args["activateParticle"]:
+            # Já ativo na cena: activate_system() retornou antes de carregar
+            self.load_audio()
 
         # Inicialização do shader - será feito na primeira ativação
         self.shader = None
+        self.uniforms = None
+        self.atlas_rects = None
         self.shader_compiled = False
+
+        # Modo Volume: caixa que acompanha a referência (sem eixo nulo)
+        self.volume_size = [max(0.01, abs(float(c))) for c in args.get("volume_size", (30.0, 30.0, 20.0))]
+
+        # Vento compartilhado pela cena (um update por frame para todos)
+        self.wind = get_wind_field(self.object.scene)
+        self.wind_influence = args.get("wind_influence", 1.0)
+        self.wind_revision = None
+        self.wind_transform = None
+        self.wind_basis = None
+
+        # Modo com estado: buffers criados na compilação (capacidade = amount)
+        self.stateful = args.get("stateful", False)
+        self.buffers = None
+        self.state_texture = None
+        self.last_state_time = None
+        self.ground = None
+        self.random_texture = None
         self.cam = self.object.scene.active_camera
         
         # Obtém referência do material do objeto
@@ -349,7 +760,19 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         if args["reference_object"]:
             self.ref_obj = self.object.scene.objects.get(args["reference_object"])
         
-        print(f"{self.object.name}: Sistema de partículas inicializado (INATIVO)")
+        # Entra no registro de clima da cena (propriedade/arg, nome como fallback)
+        self.weather_type = resolve_weather_type(self.object, args.get("weather_type", "Automático"))
+        self.weather_registry = get_registry(self.object.scene)
+        self.weather_registry.register(self, self.weather_type)
+        self.quality_priority = args.get("quality_priority", 0) or quality_priority(self.weather_type)
+
+        # Registra no gerenciador da cena (atualização única por frame)
+        self.manager = None
+        if args.get("use_manager", True):
+            self.manager = get_manager(self.object.scene)
+            self.manager.register(self)
+        
+        log.info("%s: Sistema de partículas inicializado (INATIVO)", self.object.name)
     
     def iniciarAtivado(self):
         """
@@ -364,30 +787,25 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
     def initialize_audio_system(self, args):
         """
         Inicializa o sistema de áudio baseado nas configurações
+        Apenas resolve os caminhos; os sons são decodificados em load_audio()
         """
         base_path = logic.expandPath("//")
         
-        # Carrega áudio principal se especificado
+        # Áudio principal se especificado
         if args["audio_file"]:
             audio_path = os.path.join(base_path, args["audio_file"])
             if os.path.exists(audio_path):
-                audio_buffer = aud.Sound(audio_path)
-                audio_buffer = aud.Sound.cache(audio_buffer)
-                self.audio_buffers.append(audio_buffer)
-                print(f"Audio principal carregado: {audio_path}")
+                self.audio_pending.append(audio_path)
             else:
                 print(f"Erro: Arquivo de audio não encontrado: {audio_path}")
         
-        # Carrega lista de áudios para randomização
+        # Lista de áudios para randomização
         if args["audio_files_random"]:
             audio_files = [f.strip() for f in args["audio_files_random"].split(',') if f.strip()]
             for audio_file in audio_files:
                 audio_path = os.path.join(base_path, audio_file)
                 if os.path.exists(audio_path):
-                    audio_buffer = aud.Sound(audio_path)
-                    audio_buffer = aud.Sound.cache(audio_buffer)
-                    self.audio_buffers.append(audio_buffer)
-                    print(f"Audio randomizado carregado: {audio_path}")
+                    self.audio_pending.append(audio_path)
                 else:
                     print(f"Erro: Arquivo de audio randomizado não encontrado: {audio_path}")
         
@@ -396,99 +814,654 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         self.audio_volume = args["audio_volume"]
         self.min_interval = args["min_interval"]
         self.max_interval = args["max_interval"]
+
+    def load_audio(self):
+        """
+        Decodifica (ou busca no cache compartilhado) os áudios pendentes
+        Chamado no aquecimento ou, no mais tardar, na primeira ativação
+        Retorna: número de arquivos carregados agora
+        """
+        if not self.audio_pending:
+            return 0
+
+        loaded = 0
+        for audio_path in self.audio_pending:
+            audio_buffer = audio_registry.acquire(audio_path)
+            self.audio_buffers.append(audio_buffer)
+            self.audio_paths.append(audio_path)
+            loaded += 1
+        self.audio_pending = []
         self.audio_initialized = len(self.audio_buffers) > 0
         
         if self.audio_initialized:
-            print(f"Sistema de audio inicializado: {len(self.audio_buffers)} arquivos, comportamento: {self.audio_behavior}")
+            log.info("%s: Sistema de audio inicializado: %d arquivos, comportamento: %s",
+                     self.object.name, len(self.audio_buffers), self.audio_behavior)
+        return loaded
 
+    def warm_up_shader(self):
+        """
+        Compila o shader sem ativar o sistema (aquecimento / tela de carregamento)
+        Retorna: True se o shader está pronto
+        """
+        if not self.shader_compiled and self.mat:
+            self.shader_compiled = self.compile_shader()
+        return self.shader_compiled
+
+    def warm_up(self):
+        """
+        Prepara shader e áudio para que a primeira ativação não trave o frame
+        Retorna: True se o shader está pronto
+        """
+        ready = self.warm_up_shader()
+        self.load_audio()
+        return ready
+
+    @profiled("compile_shader")
     def compile_shader(self):
         """
         Compila o shader apenas quando necessário
         Retorna: Boolean indicando sucesso
         """
         if not self.mat:
-            print(f"{self.object.name}: Não há material para compilar shader")
+            log.warning("%s: Não há material para compilar shader", self.object.name)
             return False
             
-        print(f"{self.object.name}: Compilando shader...")
-        
-        # Calcula número máximo de vértices baseado na quantidade de partículas
-        value = min(self.args["amount"] * 3, 1023)
+        log.info("%s: Compilando shader...", self.object.name)
+
+        # Obtém referência do shader do material (compartilhado pelos objetos
+        # que usam o material) e registra o callback de desenho deste objeto
+        self.shader = self.mat.getShader()
+        if self.shader is None:
+            log.error("%s: Falha ao obter shader", self.object.name)
+            return False
+        self.uniforms = uniform_state_for(self.shader)
+        self.attach_draw_callback()
         
+        # Divide as partículas em blocos que respeitam os limites de saída do geometry shader
+        # (no modo uniforms, amount pode ser reduzido depois até este valor)
+        self.compiled_amount = self.args["amount"]
+        components = GEOMETRY_VERTEX_COMPONENTS
+        if self.args.get("texture_mode", "Sequência") == "Flipbook":
+            components += FLIPBOOK_VERTEX_COMPONENTS
+        chunk_size, chunk_count, invocations, triangles_needed = compute_chunk_layout(
+            self.compiled_amount, components, geometry_output_limits())
+        value = chunk_size * 3
+
+        if chunk_count > 1:
+            log.info("%s: %d partículas em %d blocos de %d", self.object.name, self.args['amount'], chunk_count, chunk_size)
+        if triangles_needed > 1:
+            mesh_polygons = getattr(self.object.meshes[0], 'numPolygons', 1) if self.object.meshes else 1
+            if mesh_polygons < triangles_needed:
+                log.warning("%s: malha base precisa de %d triângulos para emitir todas as partículas",
+                            self.object.name, triangles_needed)
+
+        # Grade do modo Hybrid (orçamento de leituras de depth na proporção da tela)
+        hybrid_columns, hybrid_rows = compute_hybrid_grid(
+            self.args.get("hybrid_samples", DEFAULT_HYBRID_SAMPLES),
+            render.getWindowWidth(), render.getWindowHeight())
+
+        # Flipbook: quadro no geometry shader, leitura única no fragment
+        flipbook_const, fragment_const = self.build_flipbook_declarations()
+
+        # Blocos extras usam invocações do geometry shader (GL_ARB_gpu_shader5)
+        extension = "#extension GL_ARB_gpu_shader5 : enable" if invocations > 1 else ""
+        layout_in = f"triangles, invocations = {invocations}" if invocations > 1 else "triangles"
+
         # Define constantes do shader baseado nas configurações
-        const = f"""
-        layout(triangles) in;
+        const = f"""{extension}
+        #define CHUNK_INVOCATION {"gl_InvocationID" if invocations > 1 else "0"}
+        #define CHUNK_PRIMITIVE {"gl_PrimitiveIDIn" if triangles_needed > 1 else "0"}
+        layout({layout_in}) in;
         layout(triangle_strip, max_vertices = {value}) out;
 
-        const int amount = {self.args["amount"]};
-        const float life = {self.args["life"]};
-        const float scale_start = {self.args["scale_start"]};
-        const float scale_end = {self.args["scale_end"]};
-        const float movement_speed = {self.args["movement_speed"]};
-        const float fade_in = {self.args["fade_in"]};
-        const float fade_out = {self.args["fade_out"]};
-        const vec3 base_direction = vec3({self.args["base_direction"][0]}, {self.args["base_direction"][1]}, {self.args["base_direction"][2]});
-        const int rotate_movement = {1 if self.args["rotate_movement"] else 0};
-        const int billboard_mode = {0 if self.args["billboard_mode"] == "Nenhum" else 1 if self.args["billboard_mode"] == "2D" else 2};
-        const vec3 dispersion_area = vec3({self.args["dispersion_area"][0]}, {self.args["dispersion_area"][1]}, {self.args["dispersion_area"][2]});
-        const vec3 start_color = vec3({self.args["start_color"][0]}, {self.args["start_color"][1]}, {self.args["start_color"][2]});
-        const vec3 mid_color = vec3({self.args["mid_color"][0]}, {self.args["mid_color"][1]}, {self.args["mid_color"][2]});
-        const vec3 end_color = vec3({self.args["end_color"][0]}, {self.args["end_color"][1]}, {self.args["end_color"][2]});
-        const vec3 world_emission_center = vec3({self.args["world_emission_center"][0]}, {self.args["world_emission_center"][1]}, {self.args["world_emission_center"][2]});
+        const int chunk_size = {chunk_size};
+        const int chunk_count = {chunk_count};
+        const int chunk_invocations = {invocations};
+        const float wind_influence = {float(self.wind_influence)};
+        const vec3 volume_size = {glsl_literal("vec3", self.volume_size)};
+        const float volume_fade = {float(self.args.get("volume_fade", 0.15))};
+        const ivec2 hybrid_grid = ivec2({hybrid_columns}, {hybrid_rows});
+        {flipbook_const}
+        {self.build_state_declarations()}
+        {self.build_random_declarations()}
+        {self.build_parameter_declarations()}
         """
 
         # Combina shaders com constantes
         sources = {
             "vertex": vertex,
             "geometry": const + geometry,
-            "fragment": fragment
+            "fragment": fragment_const + fragment
         }
         
-        # Obtém referência do shader do material
-        self.shader = self.mat.getShader()
-        
-        if self.shader is not None:
-            # Compila shader se não for válido
-            if not self.shader.isValid():
-                self.shader.setSourceList(sources, 1)
-                
-            # Configura texturas do material
-            texture_count = 0
-            for i, tex in enumerate(self.mat.textures):
-                if tex and hasattr(tex, 'name'):
-                    self.shader.setSampler(f"textures[{i}]", i)
-                    texture_count += 1
-            self.shader.setUniform1i("texture_count", texture_count)
-
-            # Configura textura de depth buffer
-            self.shader.setSampler("bgl_DepthTexture", 1)
-            
-            # Configurações de tela
-            self.shader.setUniform2f("screen_size", render.getWindowWidth(), render.getWindowHeight())
-            
-            # Uniformes básicos
-            self.shader.setUniform1f("ref_pos_x", 0.0)
-            self.shader.setUniform1f("ref_pos_y", 0.0)
-            self.shader.setUniform1f("ref_pos_z", 0.0)
-            self.shader.setUniform1i("use_tracking", 0)
-            self.shader.setUniform1i("billboard_mode", 0)
+        # Compila apenas se o shader ainda não tiver este programa (cache global por fonte)
+        previous_key = program_cache.loaded_key(self.shader)
+        key = source_key(sources)
+        if not program_cache.bind(self.shader, sources, key):
+            log.info("%s: Shader reutilizado do cache", self.object.name)
+        else:
+            # Programa novo: os uniforms voltam aos valores padrão
+            self.uniforms.invalidate()
+            if previous_key is not None and previous_key != key:
+                log.info("%s: Shader recompilado (configuração alterada ou material compartilhado)", self.object.name)
             
-            print(f"{self.object.name}: Shader compilado com sucesso")
-            return True
+        # Configura texturas do material
+        texture_count = 0
+        for i, tex in enumerate(self.mat.textures):
+            if tex and hasattr(tex, 'name'):
+                self.shader.setSampler(f"textures[{i}]", i)
+                texture_count += 1
+        self.uniforms.set1i("texture_count", texture_count)
+
+        # Retângulos dos quadros do atlas (modo Flipbook com metadados)
+        for i, rect in enumerate(self.atlas_rects or ()):
+            self.uniforms.set4f(f"frame_rects[{i}]", *rect)
+
+        # Configura textura de depth buffer
+        self.shader.setSampler("bgl_DepthTexture", 1)
+
+        # Estado das partículas (modo com estado)
+        if self.state_texture is not None:
+            self.shader.setSampler("particle_state", STATE_TEXTURE_UNIT)
+
+        # Tabela aleatória (random_source = Tabela)
+        if self.random_texture is not None:
+            self.shader.setSampler("random_lut", RANDOM_TEXTURE_UNIT)
+
+        if not self.draw_callback and (self.state_texture is not None or self.random_texture is not None):
+            # Sem callbacks por objeto vale a ligação feita no upload
+            log.warning("%s: Shader sem objectCallbacks; texturas de estado compartilham as unidades %d e %d",
+                        self.object.name, STATE_TEXTURE_UNIT, RANDOM_TEXTURE_UNIT)
+        
+        # Configurações de tela
+        self.uniforms.set2f("screen_size", render.getWindowWidth(), render.getWindowHeight())
+        
+        # Uniformes básicos (ref_pos é da referência; os demais são do objeto)
+        self.uniforms.set3f("ref_pos", 0.0, 0.0, 0.0)
+        self.set_object_uniform("use_tracking", "int", 0)
+        self.set_object_uniform("emission_mode", "int", EMISSION_MODES.get(self.args["emission_mode"], 0))
+        self.set_object_uniform("intensity", "float", self.intensity * self.quality_scale)
+
+        # No modo uniforms os parâmetros são enviados aqui em vez de embutidos
+        if self.runtime_parameters:
+            self.upload_parameters()
+        
+        log.info("%s: Shader compilado com sucesso", self.object.name)
+        return True
+
+    def build_flipbook_declarations(self):
+        """
+        Constantes do flipbook para o geometry e o fragment shader
+        Retorna: (declarações do geometry, cabeçalho do fragment)
+        """
+        flipbook = self.args.get("texture_mode", "Sequência") == "Flipbook"
+        grid = self.args.get("flipbook_grid", (4, 4, 0))
+        columns = max(1, int(grid[0]))
+        rows = max(1, int(grid[1]))
+        available = columns * rows
+        blend = flipbook and self.args.get("flipbook_blend", False)
+
+        # Atlas com metadados: os retângulos de cada quadro vêm do JSON
+        self.atlas_rects = None
+        atlas = self.args.get("flipbook_atlas", "")
+        if flipbook and atlas:
+            rects = load_atlas_rects(logic.expandPath("//" + atlas))
+            if rects:
+                if len(rects) > MAX_ATLAS_FRAMES:
+                    log.warning("%s: atlas com %d quadros, usando os primeiros %d",
+                                self.object.name, len(rects), MAX_ATLAS_FRAMES)
+                self.atlas_rects = rects[:MAX_ATLAS_FRAMES]
+                available = len(self.atlas_rects)
+
+        frames = int(self.args.get("flipbook_frames", 0)) or available
+        frames = max(1, min(frames, available))
+
+        geometry_const = f"""#define FLIPBOOK {1 if flipbook else 0}
+        #define ATLAS_RECTS {1 if self.atlas_rects else 0}
+        const ivec2 flipbook_grid = ivec2({columns}, {rows});
+        const int flipbook_frames = {frames};
+        const float flipbook_fps = {float(self.args.get("flipbook_fps", 0.0))};"""
+        if self.atlas_rects:
+            geometry_const += f"""
+        uniform vec4 frame_rects[{len(self.atlas_rects)}];"""
+
+        fragment_const = f"""
+        #define FLIPBOOK {1 if flipbook else 0}
+        #define FLIPBOOK_BLEND {1 if blend else 0}
+        """
+        return geometry_const, fragment_const
+
+    def build_state_declarations(self):
+        """
+        Cria os buffers e a textura de estado (modo com estado) e retorna as
+        declarações correspondentes do geometry shader
+        """
+        if not self.stateful:
+            return "#define STATEFUL 0"
+
+        capacity = self.compiled_amount
+        if self.buffers is None or self.buffers.capacity != capacity:
+            self.buffers = ParticleBuffers(capacity)
+            if self.state_texture is not None:
+                self.state_texture.free()
+            self.state_texture = StateTexture(self.buffers.texture_width, self.buffers.texture_height)
+            self.ground = self.resolve_ground()
+            log.info("%s: Buffers de estado para %d partículas (textura %dx%d)", self.object.name,
+                     capacity, self.buffers.texture_width, self.buffers.texture_height)
+
+        return f"""#define STATEFUL 1
+        const int state_capacity = {capacity};
+        const int state_width = {self.buffers.texture_width};
+        uniform sampler2D particle_state;"""
+
+    def build_random_declarations(self):
+        """
+        Fonte dos valores aleatórios por partícula; no modo Tabela também
+        obtém a textura compartilhada da semente configurada
+        """
+        source = RANDOM_SOURCES.get(self.args.get("random_source", "Seno"), 0)
+        self.random_texture = None
+        if source != RANDOM_SOURCES["Tabela"]:
+            return f"#define RANDOM_SOURCE {source}"
+
+        self.random_texture = load_random_texture(int(self.args.get("random_seed", 1)))
+        return f"""#define RANDOM_SOURCE {source}
+        const int random_lut_size = {DEFAULT_LUT_SIZE};
+        const int random_lut_entries = {DEFAULT_LUT_SIZE * DEFAULT_LUT_SIZE};
+        uniform sampler2D random_lut;"""
+
+    def attach_draw_callback(self):
+        """
+        Registra o callback chamado quando o motor desenha este objeto
+        (objectCallbacks do shader): envia os uniforms próprios do objeto e
+        liga as suas texturas, para que os objetos de um mesmo material não
+        sobrescrevam os valores uns dos outros
+        Sem objectCallbacks, LOD e parâmetros em tempo real não funcionam com
+        material compartilhado e são desligados
+        """
+        self.draw_callback = self.uniforms.attach(self.object, self.bind_object_state)
+        if self.draw_callback or not (self.lod_enabled or self.runtime_parameters):
+            return
+        if self.material_shared():
+            log.warning("%s: Material %s compartilhado e shader sem objectCallbacks; "
+                        "LOD e parâmetros em tempo real desligados", self.object.name, self.mat.name)
+            self.lod_enabled = False
+            self.lod_level = 0
+            self.runtime_parameters = False
+
+    def material_shared(self):
+        """
+        Retorna: True se outro objeto da cena usa o material deste sistema
+        """
+        for obj in self.object.scene.objects:
+            if obj is self.object or not getattr(obj, "meshes", None):
+                continue
+            if any(material is self.mat for material in obj.meshes[0].materials):
+                return True
+        return False
+
+    def bind_object_state(self, obj):
+        """Callback de desenho: uniforms e texturas deste sistema"""
+        self.apply_object_uniforms()
+        if self.state_texture is None and self.random_texture is None:
+            return
+        if self.state_texture is not None:
+            self.state_texture.bind()
+        if self.random_texture is not None:
+            self.random_texture.bind()
+        bgl.glActiveTexture(bgl.GL_TEXTURE0)
+
+    def set_object_uniform(self, name, kind, value):
+        """
+        Guarda um uniform próprio deste objeto (intensity, modo de emissão,
+        tracking e parâmetros do modo uniforms); é enviado no callback de
+        desenho do objeto, ou na hora quando o shader não tem callbacks
+        """
+        if self.object_uniforms.get(name) == (kind, value):
+            return
+        self.object_uniforms[name] = (kind, value)
+        self.object_uniforms_dirty.add(name)
+        if self.uniforms and not self.draw_callback:
+            self.apply_object_uniforms()
+
+    def apply_object_uniforms(self):
+        """
+        Carrega no programa os uniforms deste objeto; quando o último objeto
+        desenhado foi este, só os que mudaram desde então
+        """
+        uniforms = self.uniforms
+        if uniforms.owner is not self:
+            names = self.object_uniforms
+        elif self.object_uniforms_dirty:
+            names = self.object_uniforms_dirty
         else:
-            print(f"{self.object.name}: Falha ao obter shader")
+            return
+        for name in names:
+            kind, value = self.object_uniforms[name]
+            if kind == "vec3":
+                uniforms.set3f(name, *value)
+            elif kind == "float":
+                uniforms.set1f(name, value)
+            else:
+                uniforms.set1i(name, value)
+        uniforms.owner = self
+        self.object_uniforms_dirty.clear()
+
+    def resolve_ground(self):
+        """
+        Chão para colisão: altura de um plano, Heightfield do terreno ou None
+        """
+        collision = self.args.get("collision", "Nenhuma")
+        if collision == "Plano":
+            return float(self.args.get("ground_height", 0.0))
+        if collision == "Heightfield":
+            ground_object = self.object.scene.objects.get(self.args.get("ground_object", ""))
+            if ground_object is None:
+                log.warning("%s: Objeto de terreno não encontrado: %s", self.object.name,
+                            self.args.get("ground_object", ""))
+                return float(self.args.get("ground_height", 0.0))
+            heightfield = heightfield_from_object(ground_object, self.args.get("ground_cell_size", 1.0))
+            if heightfield is not None:
+                rows, columns = heightfield.heights.shape
+                log.info("%s: Heightfield %dx%d de %s", self.object.name, columns, rows, ground_object.name)
+                return heightfield
+            return float(self.args.get("ground_height", 0.0))
+        return None
+
+    @profiled("state_buffers")
+    def update_state(self, current_time):
+        """
+        Modo com estado: cria as partículas do frame, integra, colide com o
+        chão e envia o estado para a textura
+        """
+        if self.last_state_time is None:
+            self.last_state_time = current_time
+            return
+        dt = current_time - self.last_state_time
+        self.last_state_time = current_time
+        if dt <= 0.0:
+            return
+
+        args = self.args
+        buffers = self.buffers
+        life = max(float(self.parameter_value("life")), 1e-3)
+        amount = self.parameter_value("amount") if self.runtime_parameters else self.compiled_amount
+        rate = amount * self.intensity * self.quality_scale / life
+
+        transform = self.object.worldTransform
+        volume = args["emission_mode"] == "Volume"
+        if volume:
+            # Caixa inteira ao redor da referência
+            center = self.ref_obj.worldPosition if self.ref_obj else (0.0, 0.0, 0.0)
+            area = [size * 0.5 for size in self.volume_size]
+        elif args["emission_mode"] == "Camera" and self.ref_obj:
+            center = self.ref_obj.worldPosition
+            area = args["dispersion_area"]
+        else:
+            center = transform @ args["world_emission_center"]
+            area = args["dispersion_area"]
+        velocity = np.asarray(tuple(args["base_direction"]), dtype=np.float32) * (args["movement_speed"] / life)
+
+        buffers.emit(rate, dt, tuple(center), tuple(area), velocity, life)
+        buffers.step(dt, tuple(args.get("gravity", (0.0, 0.0, 0.0))),
+                     wind=self.wind, wind_influence=self.wind_influence)
+        if self.ground is not None:
+            buffers.collide(self.ground, args.get("collision_response", "Morrer"), args.get("bounce", 0.3))
+        if volume:
+            buffers.wrap(tuple(center), self.volume_size)
+
+        self.state_texture.upload(buffers.pack(np.asarray(transform.inverted(), dtype=np.float32)))
+
+    def parameter_value(self, name):
+        """
+        Valor de um parâmetro já convertido para o tipo do shader
+        """
+        value = self.args[name]
+        kind = RUNTIME_PARAMETERS[name]
+        tier = self.lod_tiers[self.lod_level]
+        if name == "billboard_mode":
+            return BILLBOARD_MODES.get(tier["billboard_mode"] or value, 0)
+        if name == "rotate_movement":
+            return 1 if value else 0
+        if name == "amount" and self.runtime_parameters:
+            # O loop do shader foi dimensionado para a quantidade compilada
+            value = int(value * tier["amount"])
+            return max(0, min(value, self.compiled_amount))
+        if name == "life":
+            return float(value) * tier["life"]
+        if kind == "vec3":
+            return (float(value[0]), float(value[1]), float(value[2]))
+        if kind == "float":
+            return float(value)
+        return int(value)
+
+    def build_parameter_declarations(self):
+        """
+        Gera as declarações GLSL dos parâmetros (const ou uniform conforme o modo)
+        """
+        lines = []
+        for name, kind in RUNTIME_PARAMETERS.items():
+            if self.runtime_parameters:
+                lines.append(f"uniform {kind} {name};")
+            else:
+                lines.append(f"const {kind} {name} = {glsl_literal(kind, self.parameter_value(name))};")
+        return "\n        ".join(lines)
+
+    def upload_parameter(self, name):
+        """
+        Envia um parâmetro para o uniform correspondente do shader (por
+        objeto: cada objeto do material tem os seus valores)
+        """
+        self.set_object_uniform(name, RUNTIME_PARAMETERS[name], self.parameter_value(name))
+
+    def upload_parameters(self):
+        """
+        Envia todos os parâmetros para o shader (modo uniforms)
+        """
+        for name in RUNTIME_PARAMETERS:
+            self.upload_parameter(name)
+
+    def assign_parameter(self, name, value):
+        """
+        Valida e guarda um parâmetro nos args, sem aplicar no shader
+        Retorna: Boolean indicando se o valor foi aceito
+        """
+        kind = RUNTIME_PARAMETERS.get(name)
+        if kind is None:
+            print(f"{self.object.name}: Parâmetro desconhecido: {name}. Use: {list(RUNTIME_PARAMETERS)}")
             return False
 
+        # Valida o valor conforme o tipo do parâmetro
+        try:
+            if name == "billboard_mode":
+                if not isinstance(value, str):
+                    value = {v: k for k, v in BILLBOARD_MODES.items()}[int(value)]
+                elif value not in BILLBOARD_MODES:
+                    raise ValueError(f"use {set(BILLBOARD_MODES)}")
+            elif name == "rotate_movement":
+                value = bool(value)
+            elif kind == "vec3":
+                if len(value) != 3:
+                    raise ValueError("esperado 3 componentes")
+                value = Vector([float(c) for c in value])
+            elif kind == "float":
+                value = float(value)
+            else:
+                value = int(value)
+        except (TypeError, ValueError, KeyError) as e:
+            print(f"{self.object.name}: Valor inválido para {name}: {value} ({e})")
+            return False
+
+        if name == "amount" and self.runtime_parameters and self.shader_compiled and value > self.compiled_amount:
+            print(f"{self.object.name}: amount limitado a {self.compiled_amount} (quantidade compilada)")
+
+        self.args[name] = value
+        self.bounds_dirty = True
+        return True
+
+    def set_parameters(self, values):
+        """
+        Altera parâmetros do shader em tempo de execução (dict nome -> valor)
+        No modo uniforms apenas atualiza os uniforms; no modo constantes
+        recompila uma única vez no final
+        Retorna: Boolean indicando se todos foram aplicados
+        """
+        changed = [name for name, value in values.items() if self.assign_parameter(name, value)]
+
+        # Antes da compilação os valores serão aplicados pelo compile_shader
+        if changed and self.shader_compiled:
+            if self.runtime_parameters:
+                for name in changed:
+                    self.upload_parameter(name)
+            else:
+                # Recompila o shader para aplicar as mudanças
+                self.compile_shader()
+        return len(changed) == len(values)
+
+    def set_parameter(self, name, value):
+        """
+        Altera um único parâmetro do shader em tempo de execução
+        Retorna: Boolean indicando sucesso
+        """
+        return self.set_parameters({name: value})
+
+    def compute_local_bounds(self):
+        """
+        Esfera envolvente das partículas no espaço do objeto, a partir do
+        centro de emissão, dispersion_area, trajeto (direção * velocidade * vida)
+        e da maior escala, somando o arrasto máximo do vento
+        Retorna: (centro, raio) ou None quando o volume não é fixo
+        (Camera e Volume acompanham a referência; Hybrid depende do depth buffer)
+        """
+        self.wind_revision = self.wind.revision
+        if self.args["emission_mode"] != "World":
+            return None
+
+        # Vento: deriva de até |vento| x influência x vida mais a oscilação,
+        # em qualquer direção (m no mundo -> unidades do objeto)
+        wind = abs(self.wind_influence) * (self.wind.max_speed() * self.args["life"] + self.wind.max_turbulence())
+        wind /= max(min(abs(c) for c in self.object.worldScale), 1e-6)
+
+        center = self.args["world_emission_center"]
+        travel = Vector(self.args["base_direction"]) * (self.args["movement_speed"] * self.args["life"])
+        dispersion = self.args["dispersion_area"]
+        size = max(abs(self.args["scale_start"]), abs(self.args["scale_end"])) + self.culling_margin
+
+        low = [center[i] + min(0.0, travel[i]) - abs(dispersion[i]) - size - wind for i in range(3)]
+        high = [center[i] + max(0.0, travel[i]) + abs(dispersion[i]) + size + wind for i in range(3)]
+        local_center = Vector([(low[i] + high[i]) * 0.5 for i in range(3)])
+        radius = (Vector(high) - Vector(low)).length * 0.5
+        return local_center, radius
+
+    def local_wind_vector(self):
+        """
+        Vento médio no espaço do objeto: o shader soma o deslocamento à
+        posição local, então desfaz orientação e escala (como o pack() do
+        modo com estado). A inversa só é recalculada quando o objeto se move
+        """
+        transform = self.object.worldTransform
+        if transform != self.wind_transform:
+            self.wind_transform = transform
+            inverse = transform.inverted()
+            self.wind_basis = [tuple(float(c) for c in inverse[i][:3]) for i in range(3)]
+        x, y, z = self.wind.uniform_vector
+        return tuple(row[0] * x + row[1] * y + row[2] * z for row in self.wind_basis)
+
+    def update_culling(self):
+        """
+        Testa o volume envolvente contra o frustum da câmera e esconde o
+        sistema quando estiver fora
+        Retorna: True se o sistema está visível
+        """
+        if self.bounds_dirty or self.wind_revision != self.wind.revision:
+            self.local_bounds = self.compute_local_bounds()
+            self.bounds_dirty = False
+
+        if self.local_bounds is None:
+            visible = True
+        else:
+            local_center, radius = self.local_bounds
+            scale = max(abs(c) for c in self.object.worldScale)
+            center = self.object.worldTransform @ local_center
+            visible = self.cam.sphereInsideFrustum(center, radius * scale) != self.cam.OUTSIDE
+
+        # Só altera a visibilidade quando o estado muda
+        if visible == self.culled:
+            self.culled = not visible
+            self.object.setVisible(visible)
+            if visible:
+                # O estado não avançou enquanto estava fora da visão
+                self.last_state_time = None
+        return visible
+
+    def lod_distance(self):
+        """
+        Distância da câmera ativa até o centro de emissão
+        Retorna: float ou None quando o LOD não se aplica (modos Camera e Volume)
+        """
+        if not self.cam or self.args["emission_mode"] in ("Camera", "Volume"):
+            return None
+        if self.args["emission_mode"] == "World":
+            # world_emission_center é aplicado no espaço do objeto pelo shader
+            center = self.object.worldTransform @ Vector(self.args["world_emission_center"])
+        else:
+            center = self.object.worldPosition
+        return (self.cam.worldPosition - center).length
+
+    def update_lod(self):
+        """
+        Escolhe o nível de LOD pela distância da câmera, com histerese
+        """
+        distance = self.lod_distance()
+        if distance is None:
+            return
+
+        level = self.lod_level
+        max_level = min(len(self.lod_distances), len(self.lod_tiers) - 1)
+        # Só muda de nível depois de passar a fronteira pela margem de histerese
+        while level < max_level and distance > self.lod_distances[level] + self.lod_hysteresis:
+            level += 1
+        while level > 0 and distance < self.lod_distances[level - 1] - self.lod_hysteresis:
+            level -= 1
+
+        if level != self.lod_level:
+            self.set_lod_level(level)
+
+    def set_lod_level(self, level):
+        """
+        Aplica um nível de LOD atualizando apenas uniforms (nunca recompila)
+        """
+        self.lod_level = max(0, min(int(level), len(self.lod_tiers) - 1))
+        if self.shader_compiled and self.runtime_parameters:
+            for name in ("amount", "life", "billboard_mode"):
+                self.upload_parameter(name)
+        if log.debug_enabled:
+            log.debug("%s: LOD %d", self.object.name, self.lod_level, key=("lod", id(self)), every=2.0)
+
+    def set_intensity(self, intensity):
+        """
+        Define a fração de partículas emitidas (0.0 a 1.0) sem recompilar
+        O geometry shader encerra o loop após a fração ativa de amount
+        """
+        self.intensity = max(0.0, min(1.0, float(intensity)))
+        self.set_object_uniform("intensity", "float", self.intensity * self.quality_scale)
+
+    def set_quality_scale(self, scale):
+        """
+        Escala de qualidade aplicada pelo governador (0.0 a 1.0), multiplica
+        a intensidade sem alterá-la (transições do clima continuam valendo)
+        """
+        self.quality_scale = max(0.0, min(1.0, float(scale)))
+        self.set_object_uniform("intensity", "float", self.intensity * self.quality_scale)
+
     def set_billboard_mode(self, mode):
         """
         Altera o modo de billboard em tempo de execução
         """
         valid_modes = {"Nenhum", "2D", "3D"}
         if mode in valid_modes:
-            self.args["billboard_mode"] = mode
-            # Recompila o shader para aplicar as mudanças
-            if self.shader_compiled:
-                self.compile_shader()
+            # Atualiza o uniform (modo uniforms) ou recompila (modo constantes)
+            self.set_parameter("billboard_mode", mode)
             print(f"{self.object.name}: Modo billboard alterado para: {mode}")
         else:
             print(f"Modo inválido. Use: {valid_modes}")
@@ -513,7 +1486,7 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         """
         Ativa/desativa o tracking em tempo de execução
         """
-        self.args["rotate_movement"] = enable
+        self.set_parameter("rotate_movement", enable)
         print(f"{self.object.name}: Tracking {'ativado' if enable else 'desativado'}")
         
     def activate_system(self):
@@ -524,6 +1497,8 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
             return
             
         self.active = True
+        self.culled = False
+        self.last_state_time = None
         self.object.setVisible(True)
         
         # Compila shader apenas na primeira ativação
@@ -532,19 +1507,20 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
             if success:
                 self.shader_compiled = True
             else:
-                print(f"{self.object.name}: Falha na compilação do shader, desativando sistema")
+                log.error("%s: Falha na compilação do shader, desativando sistema", self.object.name)
                 self.active = False
                 self.object.setVisible(False)
                 return
         
-        # Inicia áudio se configurado
+        # Inicia áudio se configurado (carrega agora se não houve aquecimento)
+        self.load_audio()
         if self.audio_initialized and self.audio_buffers:
             if self.audio_behavior == "Contínuo":
                 self.play_audio(self.audio_buffers[0], True)
             elif self.audio_behavior == "Uma Vez":
                 self.play_audio(self.audio_buffers[0], False)
         
-        print(f"{self.object.name}: Sistema de partículas ATIVADO (shader_compiled: {self.shader_compiled})")
+        log.info("%s: Sistema de partículas ATIVADO (shader_compiled: %s)", self.object.name, self.shader_compiled)
 
     def deactivate_system(self):
         """
@@ -554,18 +1530,19 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
             return
             
         self.active = False
+        self.culled = False
         self.object.setVisible(False)
         
         # Para áudio
         self.stop_audio()
         
-        print(f"{self.object.name}: Sistema de partículas DESATIVADO")
+        log.info("%s: Sistema de partículas DESATIVADO", self.object.name)
 
     def start(self, args):
         """
         Chamado quando o componente é iniciado
         """
-        print(f"{self.object.name}: Sistema pronto (aguardando ativação)")
+        log.info("%s: Sistema pronto (aguardando ativação)", self.object.name)
 
     def play_audio(self, audio_buffer, loop=False):
         """
@@ -578,6 +1555,9 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         if loop:
             self.audio_handle.loop_count = -1  # Loop infinito
         self.audio_handle.volume = self.audio_volume
+
+        if profiler.enabled:
+            profiler.count(self.object.name, "audio_voices")
         
         return self.audio_handle
 
@@ -590,9 +1570,11 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
             
         audio_buffer = random.choice(self.audio_buffers)
         self.play_audio(audio_buffer, False)
-        print(f"Reproduzindo audio aleatório: {len(self.audio_buffers)} opções disponíveis")
+        if log.debug_enabled:
+            log.debug("%s: Reproduzindo audio aleatório: %d opções disponíveis", self.object.name, len(self.audio_buffers))
 
-    def update_audio_system(self):
+    @profiled("update_audio_system")
+    def update_audio_system(self, current_time=None):
         """
         Atualiza o sistema de áudio baseado no comportamento configurado
         """
@@ -600,7 +1582,8 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         if not hasattr(self, 'audio_initialized') or not self.audio_initialized:
             return
             
-        current_time = logic.getFrameTime()
+        if current_time is None:
+            current_time = logic.getFrameTime()
         
         # Comportamento ALEATÓRIO
         if self.audio_behavior == "Aleatório":
@@ -628,29 +1611,62 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         """
         Chamado a cada frame para atualizar o sistema
         """
+        # Com gerenciador, um único sistema (o condutor) atualiza todos por frame
+        if self.manager is not None:
+            self.manager.request_tick(self)
+            return
+
+        current_time = logic.getFrameTime()
+        if self.update_frame(current_time) and self.audio_initialized:
+            self.update_audio_system(current_time)
+
+    def update_frame(self, current_time):
+        """
+        Trabalho urgente do frame: compilação pendente, culling, LOD e uniforms
+        Retorna: True se o sistema está ativo (mesmo que fora da visão)
+        """
         # Verifica se precisa compilar o shader
         if self.active and not self.shader_compiled and self.mat:
             success = self.compile_shader()
             if success:
                 self.shader_compiled = True
             else:
-                print(f"{self.object.name}: Falha na compilação do shader")
+                log.error("%s: Falha na compilação do shader", self.object.name)
                 self.active = False
                 self.object.setVisible(False)
-                return
+                return False
         
         # Retorna se não estiver ativo
         if not self.active or not self.shader_compiled:
-            return
-            
-        
-        # Atualiza sistema de áudio
-        if self.audio_initialized:
-            self.update_audio_system()
+            return False
+
+        # Fora do frustum: sistema escondido e sem atualização de uniforms
+        if self.frustum_culling and self.cam and not self.update_culling():
+            return True
+
+        # Instrumentação opcional (desligada: apenas esta leitura)
+        profiling = profiler.enabled
+        if profiling:
+            started = profiler.begin()
+            uploads = uniform_totals["uploads"]
+
+        # Ajusta o nível de detalhe pela distância da câmera
+        if self.lod_enabled:
+            self.update_lod()
+
+        # Vento da cena: o primeiro sistema do frame recalcula o campo
+        self.wind.update(current_time)
+        if self.wind_influence:
+            self.set_object_uniform("wind_vector", "vec3", self.local_wind_vector())
+            self.uniforms.set1f("wind_turbulence", self.wind.uniform_turbulence)
+
+        # Modo com estado: integração e colisão na CPU
+        if self.buffers is not None:
+            self.update_state(current_time)
 
         # Atualiza tempo do shader
         if self.shader:
-            self.shader.setUniform1f("time", logic.getFrameTime())
+            self.uniforms.set1f("time", current_time)
                 
         # Atualização dos uniforms de tracking
         if self.shader and self.shader.isValid():
@@ -658,35 +1674,53 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
                 try:
                     ref_pos = self.ref_obj.worldPosition
                     
-                    # Debug periódico do tracking
-                    current_time = logic.getFrameTime()
-                    if int(current_time) % 3 == 0 and int(current_time) != getattr(self, 'last_debug_time', 0):
+                    # Debug periódico do tracking (adiado pelo gerenciador quando houver)
+                    if log.debug_enabled and int(current_time) % 3 == 0 and int(current_time) != getattr(self, 'last_debug_time', 0):
                         self.last_debug_time = int(current_time)
-                        
-                        particle_pos = self.object.worldPosition
-                        direction = ref_pos - particle_pos
-                        distance = direction.length
-                        
-                        print(f"DEBUG TRACKING:")
-                        print(f"   Particula: {particle_pos}")
-                        print(f"   Alvo: {ref_pos}")
-                        print(f"   Direção: ({direction.x:.2f}, {direction.y:.2f}, {direction.z:.2f})")
-                        print(f"   Distância: {distance:.1f}")
-                        print(f"   use_tracking: {1}, rotate_movement: {self.args['rotate_movement']}")
-                        
-                        if self.shader:
-                            print(f"   Shader válido: {self.shader.isValid()}")
+                        if self.manager is not None:
+                            self.manager.defer(partial(self.print_tracking_debug, ref_pos.copy()))
+                        else:
+                            self.print_tracking_debug(ref_pos)
                     
-                    # Atualiza uniforms de posição
-                    self.shader.setUniform1f("ref_pos_x", ref_pos.x)
-                    self.shader.setUniform1f("ref_pos_y", ref_pos.y)
-                    self.shader.setUniform1f("ref_pos_z", ref_pos.z)
-                    self.shader.setUniform1i("use_tracking", 1)
+                    # Atualiza uniforms de posição (enviados só quando mudam)
+                    self.uniforms.set3f("ref_pos", ref_pos.x, ref_pos.y, ref_pos.z)
+                    self.set_object_uniform("use_tracking", "int", 1)
                     
                 except Exception as e:
-                    print(f"Erro no tracking: {e}")
+                    log.error("%s: Erro no tracking: %s", self.object.name, e, every=5.0)
             else:
-                self.shader.setUniform1i("use_tracking", 0)
+                self.set_object_uniform("use_tracking", "int", 0)
+
+        if profiling:
+            self.profile_frame(started, uploads)
+        return True
+
+    def profile_frame(self, started, uploads):
+        """
+        Registra no profiler o span de uniforms e os contadores do frame
+        """
+        name = self.object.name
+        profiler.end("uniforms", name, started)
+        profiler.count(name, "frames")
+        profiler.count(name, "uniform_calls", uniform_totals["uploads"] - uploads)
+        amount = self.parameter_value("amount") if self.runtime_parameters else self.compiled_amount
+        profiler.count(name, "particles_emitted", math.ceil(amount * min(max(self.intensity * self.quality_scale, 0.0), 1.0)))
+
+    def print_tracking_debug(self, ref_pos):
+        """
+        Saída de debug periódica do tracking
+        """
+        particle_pos = self.object.worldPosition
+        direction = ref_pos - particle_pos
+        distance = direction.length
+        
+        log.debug(
+            "%s: TRACKING partícula %s, alvo %s, direção (%.2f, %.2f, %.2f), distância %.1f, "
+            "rotate_movement: %s, shader válido: %s",
+            self.object.name, tuple(particle_pos), tuple(ref_pos),
+            direction.x, direction.y, direction.z, distance,
+            self.args['rotate_movement'], self.shader.isValid() if self.shader else None,
+            key=("tracking", id(self)), every=3.0)
 
     def change_audio_behavior(self, new_behavior, new_volume=None):
         """
@@ -713,9 +1747,9 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
         full_path = os.path.join(base_path, audio_path)
         
         if os.path.exists(full_path):
-            audio_buffer = aud.Sound(full_path)
-            audio_buffer = aud.Sound.cache(audio_buffer)
+            audio_buffer = audio_registry.acquire(full_path)
             self.audio_buffers.append(audio_buffer)
+            self.audio_paths.append(full_path)
             self.audio_initialized = True
             print(f"Audio adicionado: {audio_path}")
             return True
@@ -723,6 +1757,32 @@ class AdvancedParticleSystem(types.KX_PythonComponent):
             print(f"Erro: Arquivo de audio não encontrado: {audio_path}")
             return False
         
+    def release_audio(self):
+        """
+        Libera os buffers de áudio deste sistema no registro compartilhado
+        """
+        self.stop_audio()
+        for audio_path in self.audio_paths:
+            audio_registry.release(audio_path)
+        self.audio_paths = []
+        self.audio_buffers = []
+        self.audio_pending = []
+        self.audio_initialized = False
+
+    def dispose(self):
+        """
+        Chamado quando o componente é removido
+        """
+        self.release_audio()
+        if self.manager is not None:
+            self.manager.unregister(self)
+        self.weather_registry.unregister(self)
+        if self.state_texture is not None:
+            self.state_texture.free()
+            self.state_texture = None
+        if self.uniforms is not None:
+            self.uniforms.detach(self.object)
+
     def debug_tracking(self):
         """
         Debug para verificar se o tracking está funcionando
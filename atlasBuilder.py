@@ -0,0 +1,296 @@
+"""
+Gerador de atlas de texturas para o modo Flipbook (headless, NumPy + zlib)
+
+Lê as imagens PNG dos slots de textura de um material de partículas (na
+ordem das etapas de vida), empacota todas em um único atlas em grade e grava
+o atlas + um JSON de metadados com o retângulo uv de cada quadro. O
+AdvancedParticleSystem lê esse JSON (arg "flipbook_atlas") e envia os
+retângulos como uniforms, então o material só precisa do atlas no slot 0.
+
+Cada quadro recebe uma borda ("gutter") que repete os pixels da beirada, e
+as células são alinhadas a múltiplos de `align` pixels, para que os mips
+reduzidos não misturem quadros vizinhos. `padding` é espaço transparente
+extra entre células.
+
+Uso:
+    python atlasBuilder.py chuva_atlas.png gota_0.png gota_1.png gota_2.png
+    python atlasBuilder.py folhas.png folha_*.png --columns 4 --gutter 8 --align 8
+"""
+import argparse
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Canais por tipo de cor do PNG
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _paeth(a, b, c):
+    """Preditor Paeth vetorizado (arrays int16)"""
+    p = a + b - c
+    pa = np.abs(p - a)
+    pb = np.abs(p - b)
+    pc = np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+
+def _unfilter(data, height, stride, bpp):
+    """
+    Desfaz os filtros de linha do PNG
+    Retorna: array uint8 (height, stride)
+    """
+    rows = np.zeros((height, stride), dtype=np.uint8)
+    previous = np.zeros(stride, dtype=np.int16)
+    offset = 0
+    for y in range(height):
+        kind = data[offset]
+        line = np.frombuffer(data, dtype=np.uint8, count=stride, offset=offset + 1).astype(np.int16)
+        offset += stride + 1
+
+        if kind == 0:
+            current = line
+        elif kind == 1:
+            # Sub: soma acumulada por canal ao longo da linha
+            current = (np.cumsum(line.reshape(-1, bpp), axis=0, dtype=np.int64) % 256).reshape(-1).astype(np.int16)
+        elif kind == 2:
+            current = (line + previous) % 256
+        else:
+            current = _unfilter_serial(line, previous, bpp, kind)
+
+        rows[y] = current
+        previous = current.astype(np.int16)
+    return rows
+
+
+def _unfilter_serial(line, previous, bpp, kind):
+    """Filtros que dependem do pixel anterior já reconstruído (Average e Paeth)"""
+    current = np.zeros_like(line)
+    zero = np.zeros(bpp, dtype=np.int16)
+    for x in range(0, len(line), bpp):
+        left = current[x - bpp:x] if x >= bpp else zero
+        up = previous[x:x + bpp]
+        if kind == 3:
+            predictor = (left + up) // 2
+        else:
+            upper_left = previous[x - bpp:x] if x >= bpp else zero
+            predictor = _paeth(left, up, upper_left)
+        current[x:x + bpp] = (line[x:x + bpp] + predictor) % 256
+    return current
+
+
+def read_png(path):
+    """
+    Lê um PNG não entrelaçado (tons de cinza, RGB, paleta, com ou sem alfa;
+    8 ou 16 bits)
+    Retorna: array uint8 (altura, largura, 4) em RGBA
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content.startswith(PNG_SIGNATURE):
+        raise ValueError(f"{path}: não é um arquivo PNG")
+
+    offset = len(PNG_SIGNATURE)
+    header = None
+    palette = None
+    transparency = None
+    compressed = []
+    while offset < len(content):
+        length, kind = struct.unpack(">I4s", content[offset:offset + 8])
+        chunk = content[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif kind == b"PLTE":
+            palette = np.frombuffer(chunk, dtype=np.uint8).reshape(-1, 3)
+        elif kind == b"tRNS":
+            transparency = np.frombuffer(chunk, dtype=np.uint8)
+        elif kind == b"IDAT":
+            compressed.append(chunk)
+        elif kind == b"IEND":
+            break
+
+    if header is None:
+        raise ValueError(f"{path}: PNG sem IHDR")
+    width, height, depth, color_type, _, _, interlace = header
+    if interlace:
+        raise ValueError(f"{path}: PNG entrelaçado não suportado")
+    if depth not in (8, 16) and color_type != 3:
+        raise ValueError(f"{path}: profundidade de {depth} bits não suportada")
+    if color_type == 3 and depth != 8:
+        raise ValueError(f"{path}: paleta precisa ter 8 bits")
+
+    channels = PNG_CHANNELS[color_type]
+    bytes_per_sample = depth // 8
+    bpp = channels * bytes_per_sample
+    stride = width * bpp
+    rows = _unfilter(zlib.decompress(b"".join(compressed)), height, stride, bpp)
+
+    samples = rows.reshape(height, width, channels * bytes_per_sample)
+    if bytes_per_sample == 2:
+        # 16 bits: mantém o byte mais significativo de cada amostra
+        samples = samples[:, :, 0::2]
+
+    if color_type == 3:
+        rgb = palette[samples[:, :, 0]]
+        alpha = np.full((height, width, 1), 255, dtype=np.uint8)
+        if transparency is not None:
+            table = np.full(256, 255, dtype=np.uint8)
+            table[:len(transparency)] = transparency
+            alpha = table[samples[:, :, 0]][:, :, None]
+        return np.concatenate([rgb, alpha], axis=2)
+    if color_type == 0:
+        return np.concatenate([np.repeat(samples, 3, axis=2), np.full((height, width, 1), 255, np.uint8)], axis=2)
+    if color_type == 4:
+        return np.concatenate([np.repeat(samples[:, :, :1], 3, axis=2), samples[:, :, 1:2]], axis=2)
+    if color_type == 2:
+        return np.concatenate([samples, np.full((height, width, 1), 255, np.uint8)], axis=2)
+    return np.ascontiguousarray(samples)
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def write_png(path, image, level=9):
+    """
+    Grava um array uint8 (altura, largura, 4) como PNG RGBA de 8 bits
+    (filtro Up em todas as linhas)
+    """
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    rows = image.reshape(height, width * 4)
+    up = rows.astype(np.int16)
+    up[1:] -= rows[:-1].astype(np.int16)
+    filtered = np.empty((height, width * 4 + 1), dtype=np.uint8)
+    filtered[:, 0] = 2
+    filtered[0, 0] = 0
+    filtered[:, 1:] = (up % 256).astype(np.uint8)
+
+    with open(path, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)))
+        f.write(_chunk(b"IDAT", zlib.compress(filtered.tobytes(), level)))
+        f.write(_chunk(b"IEND", b""))
+
+
+def _align(value, align):
+    return -(-value // align) * align
+
+
+def _next_power_of_two(value):
+    return 1 << max(0, int(value) - 1).bit_length()
+
+
+def build_atlas(images, columns=None, padding=2, gutter=4, align=4, power_of_two=True):
+    """
+    Empacota as imagens em grade (uma célula por quadro, do tamanho do maior)
+    Retorna: (atlas uint8 (H, W, 4), quadros com x, y, w, h e uv, (colunas, linhas))
+    O uv de cada quadro é (u, v, largura, altura) com origem embaixo à esquerda
+    """
+    if not images:
+        raise ValueError("Nenhuma imagem para o atlas")
+    count = len(images)
+    if columns is None:
+        columns = int(np.ceil(np.sqrt(count)))
+    columns = max(1, min(int(columns), count))
+    rows = -(-count // columns)
+
+    frame_width = max(image.shape[1] for image in images)
+    frame_height = max(image.shape[0] for image in images)
+    cell_width = _align(frame_width + 2 * gutter + padding, align)
+    cell_height = _align(frame_height + 2 * gutter + padding, align)
+
+    width = cell_width * columns
+    height = cell_height * rows
+    if power_of_two:
+        width = _next_power_of_two(width)
+        height = _next_power_of_two(height)
+
+    atlas = np.zeros((height, width, 4), dtype=np.uint8)
+    frames = []
+    for index, image in enumerate(images):
+        h, w = image.shape[:2]
+        column, row = index % columns, index // columns
+        # Quadro centrado na célula; a borda repete os pixels da beirada
+        x = column * cell_width + (cell_width - w) // 2
+        y = row * cell_height + (cell_height - h) // 2
+        bordered = np.pad(image, ((gutter, gutter), (gutter, gutter), (0, 0)), mode="edge")
+        atlas[y - gutter:y + h + gutter, x - gutter:x + w + gutter] = bordered
+        frames.append({
+            "x": x, "y": y, "w": w, "h": h,
+            "uv": [x / width, 1.0 - (y + h) / height, w / width, h / height],
+        })
+    return atlas, frames, (columns, rows)
+
+
+def build_from_files(paths, output, columns=None, padding=2, gutter=4, align=4, power_of_two=True):
+    """
+    Lê os PNGs, grava o atlas em `output` e os metadados em `output` + ".json"
+    Retorna: dict de metadados
+    """
+    images = [read_png(path) for path in paths]
+    atlas, frames, (columns, rows) = build_atlas(images, columns, padding, gutter, align, power_of_two)
+    write_png(output, atlas)
+
+    for frame, path in zip(frames, paths):
+        frame["name"] = os.path.basename(path)
+    metadata = {
+        "image": os.path.basename(output),
+        "width": int(atlas.shape[1]),
+        "height": int(atlas.shape[0]),
+        "frame_count": len(frames),
+        "columns": columns,
+        "rows": rows,
+        "padding": padding,
+        "gutter": gutter,
+        "align": align,
+        "frames": frames,
+    }
+    with open(metadata_path(output), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+def metadata_path(atlas_path):
+    """Caminho do JSON de metadados de um atlas"""
+    return os.path.splitext(atlas_path)[0] + ".json"
+
+
+def load_metadata(path):
+    """
+    Lê os metadados de um atlas (o JSON ou o próprio PNG do atlas)
+    Retorna: dict com "frame_count" e "rects" (lista de (u, v, largura, altura))
+    """
+    if not path.lower().endswith(".json"):
+        path = metadata_path(path)
+    with open(path, encoding="utf-8") as f:
+        metadata = json.load(f)
+    metadata["rects"] = [tuple(float(value) for value in frame["uv"]) for frame in metadata["frames"]]
+    return metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera atlas de flipbook para AdvancedParticleSystem")
+    parser.add_argument("output", help="PNG do atlas a gerar (metadados em .json ao lado)")
+    parser.add_argument("images", nargs="+", help="PNGs dos slots de textura, na ordem das etapas")
+    parser.add_argument("--columns", type=int, default=None, help="Colunas da grade (padrão: raiz do total)")
+    parser.add_argument("--padding", type=int, default=2, help="Espaço transparente entre células (px)")
+    parser.add_argument("--gutter", type=int, default=4, help="Borda repetida ao redor de cada quadro (px)")
+    parser.add_argument("--align", type=int, default=4, help="Alinhamento das células para mips (px)")
+    parser.add_argument("--no-pot", action="store_true", help="Não arredonda o atlas para potência de dois")
+    options = parser.parse_args(argv)
+
+    metadata = build_from_files(options.images, options.output, options.columns, options.padding,
+                                options.gutter, options.align, not options.no_pot)
+    print(f"Atlas {metadata['width']}x{metadata['height']} com {metadata['frame_count']} quadros "
+          f"({metadata['columns']}x{metadata['rows']}) -> {options.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
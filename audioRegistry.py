@@ -0,0 +1,137 @@
+"""
+Registro global de áudio compartilhado pelos sistemas de partículas
+
+Mantém um único aud.Device e um cache de sons decodificados indexado pelo
+caminho do arquivo. Cada componente que usa um arquivo adquire uma
+referência; sons sem referências continuam em cache até que o orçamento
+de memória exija removê-los (do menos usado recentemente para o mais).
+"""
+import os
+from collections import OrderedDict
+
+import aud
+
+# Orçamento padrão para sons decodificados em memória
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+def estimate_size(sound):
+    """
+    Estima os bytes de um som decodificado (amostras float32)
+    """
+    try:
+        rate, channels = sound.specs
+        return int(sound.length * channels * 4)
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+class AudioRegistry:
+    """
+    Dispositivo único + cache de buffers decodificados com contagem de referências
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self.memory_used = 0
+        self._device = None
+        # caminho -> {"sound": ..., "refs": int, "bytes": int}
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def device(self):
+        """
+        Dispositivo de áudio compartilhado (criado no primeiro uso)
+        """
+        if self._device is None:
+            self._device = aud.Device()
+        return self._device
+
+    @staticmethod
+    def normalize_path(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def acquire(self, path):
+        """
+        Retorna o som decodificado de `path` e incrementa sua referência
+        Decodifica e coloca em cache apenas na primeira vez
+        """
+        key = self.normalize_path(path)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            self.misses += 1
+            sound = aud.Sound.cache(aud.Sound(path))
+            entry = {"sound": sound, "refs": 0, "bytes": estimate_size(sound)}
+            self._entries[key] = entry
+            self.memory_used += entry["bytes"]
+        entry["refs"] += 1
+        self.evict()
+        return entry["sound"]
+
+    def release(self, path):
+        """
+        Libera uma referência de `path`; o som pode ser removido pelo orçamento
+        """
+        entry = self._entries.get(self.normalize_path(path))
+        if entry is None or entry["refs"] == 0:
+            return
+        entry["refs"] -= 1
+        if entry["refs"] == 0:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove sons sem referência, do menos usado para o mais usado,
+        até caber no orçamento de memória
+        """
+        if self.memory_used <= self.memory_budget:
+            return
+        for key in [k for k, e in self._entries.items() if e["refs"] == 0]:
+            if self.memory_used <= self.memory_budget:
+                break
+            entry = self._entries.pop(key)
+            self.memory_used -= entry["bytes"]
+            self.evictions += 1
+
+    def set_memory_budget(self, memory_budget):
+        """
+        Altera o orçamento de memória (bytes) e aplica imediatamente
+        """
+        self.memory_budget = memory_budget
+        self.evict()
+
+    def reset(self):
+        """
+        Esvazia o cache, zera os contadores e descarta o dispositivo
+        """
+        self._entries.clear()
+        self._device = None
+        self.memory_used = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def is_cached(self, path):
+        return self.normalize_path(path) in self._entries
+
+    def references(self, path):
+        entry = self._entries.get(self.normalize_path(path))
+        return entry["refs"] if entry else 0
+
+    def stats(self):
+        """Contadores do cache de áudio"""
+        return {
+            "sounds": len(self._entries),
+            "memory_used": self.memory_used,
+            "memory_budget": self.memory_budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Registro compartilhado por todos os componentes do processo
+audio_registry = AudioRegistry()
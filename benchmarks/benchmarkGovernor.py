@@ -0,0 +1,113 @@
+"""
+Verificação headless do governador de qualidade (qualityGovernor)
+
+Simula sequências de taxa de frames e confere o nível e as escalas dos
+sistemas, sem cena: os registros só precisam da prioridade e do mínimo de
+qualidade de cada sistema.
+
+- queda e vsync: 20 frames a 40 fps e depois 60 fps fixos (alvo 60); a
+  taxa nunca passa do alvo e a qualidade precisa voltar a 1.0;
+- queda e folga: 20 frames a 40 fps e depois 90 fps;
+- sobrecarga: o custo do frame acompanha as escalas (20 ms com tudo,
+  vsync em 60 fps); a qualidade precisa cair só o necessário, com a chuva
+  (menor prioridade) cortada antes das folhas.
+
+Uso:
+    python benchmarks/benchmarkGovernor.py
+"""
+import argparse
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "stubs"))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from qualityGovernor import QualityGovernor  # noqa: E402
+from weatherRegistry import quality_priority  # noqa: E402
+
+TARGET_FPS = 60.0
+
+
+class FakeSystem:
+    """O que o governador lê e escreve em um AdvancedParticleSystem"""
+
+    def __init__(self, name, weather_type, quality_min=0.1):
+        self.object = type("Obj", (), {"name": name})()
+        self.quality_priority = quality_priority(weather_type)
+        self.quality_min = quality_min
+        self.quality_scale = 1.0
+
+    def set_quality_scale(self, scale):
+        self.quality_scale = scale
+
+
+class Record:
+    def __init__(self, system):
+        self.system = system
+
+
+def load_fps(systems):
+    """Taxa com vsync de um frame de 12 ms + 8 ms proporcionais às escalas"""
+    scale = sum(system.quality_scale for system in systems) / len(systems)
+    return min(TARGET_FPS, 1000.0 / (12.0 + 8.0 * scale))
+
+
+def simulate(phases):
+    """
+    Executa as fases [(frames, fps), ...] e devolve o governador, os
+    sistemas e o frame (contado do início) em que o nível voltou a 1.0
+    `fps` pode ser uma função dos sistemas (taxa que responde ao corte)
+    """
+    systems = [FakeSystem("chuva", "chuva"), FakeSystem("folhas", "folhas")]
+    records = [Record(system) for system in systems]
+    governor = QualityGovernor()
+    governor.enable(TARGET_FPS)
+
+    frame_time = 0.0
+    frame = 0
+    recovered_at = None
+    lowest = 1.0
+    for frames, fps in phases:
+        for _ in range(frames):
+            rate = fps(systems) if callable(fps) else fps
+            frame_time += 1.0 / rate
+            frame += 1
+            governor.update(records, frame_time, rate)
+            lowest = min(lowest, governor.level)
+            if lowest < 1.0 and governor.level >= 1.0 and recovered_at is None:
+                recovered_at = frame
+    return governor, {s.object.name: s for s in systems}, lowest, recovered_at
+
+
+def check(name, condition, details, failures):
+    print(f"{'ok ' if condition else 'FALHA'} {name}: {details}")
+    if not condition:
+        failures.append(name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=4000, help="frames após a queda")
+    options = parser.parse_args(argv)
+    failures = []
+
+    governor, systems, lowest, recovered = simulate([(20, 40.0), (options.frames, TARGET_FPS)])
+    check("queda e vsync", lowest < 1.0 and governor.level == 1.0,
+          f"mínimo {lowest:.2f}, final {governor.level:.2f}, recuperado no frame {recovered}", failures)
+
+    governor, systems, lowest, recovered = simulate([(20, 40.0), (options.frames, 90.0)])
+    check("queda e folga", lowest < 1.0 and governor.level == 1.0,
+          f"mínimo {lowest:.2f}, final {governor.level:.2f}, recuperado no frame {recovered}", failures)
+
+    governor, systems, lowest, recovered = simulate([(options.frames, load_fps)])
+    rain, leaves = systems["chuva"], systems["folhas"]
+    check("sobrecarga", 0.0 < governor.level < 1.0 and leaves.quality_scale > rain.quality_scale,
+          f"nível {governor.level:.2f}, chuva {rain.quality_scale:.2f}, folhas {leaves.quality_scale:.2f}",
+          failures)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark headless das fontes de aleatoriedade por partícula
+
+Compara, no lado NumPy, as três fontes selecionáveis pelo arg
+"random_source" do AdvancedParticleSystem (Seno, Hash e Tabela):
+
+- tempo para gerar os três valores (dispersão x, y, z) de N partículas;
+- uniformidade: qui-quadrado de um histograma de 64 classes, em uma janela
+  de índices baixos e outra de índices altos (onde o sin em float32 perde
+  precisão);
+- repetição: fração de valores repetidos dentro da janela;
+- conferência do hash vetorizado contra uma implementação escalar em
+  inteiros do Python (o que o GLSL calcula com uint).
+
+Uso:
+    python benchmarks/benchmarkRandom.py
+    python benchmarks/benchmarkRandom.py --count 1000000 --repeat 5 --json random.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from particleSimulator import particle_noise  # noqa: E402
+from randomSource import RANDOM_SOURCES, DEFAULT_LUT_SIZE, generate_lut, hash_rand  # noqa: E402
+
+BINS = 64
+HIGH_OFFSET = 1 << 22
+MASK_32 = 0xFFFFFFFF
+
+
+def pcg_scalar(value):
+    """PCG escalar com aritmética de 32 bits explícita (referência do uint do GLSL)"""
+    state = (value * 747796405 + 2891336453) & MASK_32
+    word = (((state >> ((state >> 28) + 4)) ^ state) * 277803737) & MASK_32
+    return (word >> 22) ^ word
+
+
+def check_hash(samples=4096):
+    """
+    Compara hash_rand com a referência escalar em índices baixos e altos
+    Retorna: número de divergências
+    """
+    indices = np.concatenate([np.arange(samples), np.arange(samples) + HIGH_OFFSET, [MASK_32 // 4]])
+    mismatches = 0
+    for stream in range(3):
+        vector = hash_rand(indices, stream)
+        for index, value in zip(indices.tolist(), vector.tolist()):
+            expected = (pcg_scalar((index * 4 + stream) & MASK_32) >> 8) / 16777216.0
+            if value != expected:
+                mismatches += 1
+    return mismatches
+
+
+def noise_window(source, start, count, lut):
+    """Valores (count, 3) das partículas start..start+count-1"""
+    index = np.arange(start, start + count)
+    if source == RANDOM_SOURCES["Hash"]:
+        return np.stack([hash_rand(index, stream) for stream in range(3)], axis=1)
+    if source == RANDOM_SOURCES["Tabela"]:
+        return lut[index % len(lut), :3]
+    # Seno: o shader converte j para float antes do getRand
+    j = index.astype(np.float32)
+    coords = (np.float32(0.5), np.float32(1.3), np.float32(2.7))
+    values = []
+    for y in coords:
+        value = np.sin(j * np.float32(12.9898) + y * np.float32(78.233)) * np.float32(43758.5453)
+        values.append((value - np.floor(value)).astype(np.float32))
+    return np.stack(values, axis=1)
+
+
+def chi_square(values):
+    """Qui-quadrado por grau de liberdade (~1.0 para uma distribuição uniforme)"""
+    histogram, _ = np.histogram(values, bins=BINS, range=(0.0, 1.0))
+    expected = len(values) / BINS
+    return float(np.sum((histogram - expected) ** 2) / expected / (BINS - 1))
+
+
+def measure(name, source, count, repeat, lut):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        particle_noise(count, source)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    result = {"fonte": name, "ms": min(timings)}
+    for label, start in (("baixo", 0), ("alto", HIGH_OFFSET)):
+        values = noise_window(source, start, count, lut)
+        result[f"chi2_{label}"] = chi_square(values.reshape(-1))
+        result[f"repetidos_{label}"] = 1.0 - len(np.unique(values[:, 0])) / count
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100000, help="partículas por medição")
+    parser.add_argument("--repeat", type=int, default=3, help="repetições (vale a menor)")
+    parser.add_argument("--json", help="salva os resultados neste arquivo")
+    options = parser.parse_args(argv)
+
+    lut = generate_lut(1, DEFAULT_LUT_SIZE)
+    results = [measure(name, source, options.count, options.repeat, lut)
+               for name, source in RANDOM_SOURCES.items()]
+    mismatches = check_hash()
+
+    print(f"{options.count} partículas, janela alta a partir de j={HIGH_OFFSET}")
+    print(f"{'fonte':>8} {'ms':>8} {'chi2 baixo':>11} {'chi2 alto':>10} {'rep. baixo':>11} {'rep. alto':>10}")
+    for r in results:
+        print(f"{r['fonte']:>8} {r['ms']:8.2f} {r['chi2_baixo']:11.2f} {r['chi2_alto']:10.2f} "
+              f"{r['repetidos_baixo']:11.2%} {r['repetidos_alto']:10.2%}")
+    print(f"Hash NumPy x referência escalar: {mismatches} divergências")
+    print(f"Tabela: período de {DEFAULT_LUT_SIZE * DEFAULT_LUT_SIZE} partículas")
+
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as f:
+            json.dump({"count": options.count, "results": results, "hash_mismatches": mismatches}, f, indent=2)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
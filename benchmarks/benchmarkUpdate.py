@@ -0,0 +1,268 @@
+"""
+Benchmark headless de AdvancedParticleSystem.update e ClimaControl.update
+
+Monta uma cena falsa (módulos substitutos em benchmarks/stubs) com 1, 10,
+100 e 1000 sistemas de partículas e um ClimaControl, executa N frames
+simulados e reporta por frame: tempo Python, chamadas de uniform, prints
+emitidos e alocações.
+
+Uso:
+    python benchmarks/benchmarkUpdate.py --frames 300
+    python benchmarks/benchmarkUpdate.py --json atual.json
+    python benchmarks/benchmarkUpdate.py --check base.json --tolerance 0.25
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "stubs"))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import Range  # noqa: E402  (substituto)
+import aud  # noqa: E402  (substituto)
+from advancedParticleSystem import AdvancedParticleSystem  # noqa: E402
+from climaControl import ClimaControl  # noqa: E402
+from shaderCache import program_cache  # noqa: E402
+import uniformState  # noqa: E402
+from audioRegistry import audio_registry  # noqa: E402
+
+FRAME_STEP = 1.0 / 60.0
+TIPOS = ["chuva", "neve", "poeira", "folhas", "nevoa"]
+COUNTS = [1, 10, 100, 1000]
+
+# Configuração dos sistemas (os args do tipo conjunto recebem um valor fixo)
+PARTICLE_ARGS = {
+    "emission_mode": "World",
+    "billboard_mode": "Nenhum",
+    "audio_behavior": "Aleatório",
+    "audio_file": "chuva.wav",
+    "reference_object": "Camera",
+    "rotate_movement": True,
+}
+
+CLIMA_ARGS = {
+    "Debug": False,
+    "Debug Detalhado": False,
+    "Relógio": "Motor",
+    "Semente": 1,
+}
+
+
+class LineCounter(io.TextIOBase):
+    """Destino de stdout que só conta as linhas impressas"""
+
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += text.count("\n")
+        return len(text)
+
+
+def component_args(cls, overrides):
+    """Resolve os args padrão do componente como o motor faria"""
+    args = {}
+    for key, value in cls.args.items():
+        if isinstance(value, set):
+            value = sorted(value)[0]
+        args[key] = value
+    args.update({k: v for k, v in overrides.items() if k in args})
+    return args
+
+
+def build_scene(count):
+    """Cria uma cena com `count` sistemas de partículas e um ClimaControl"""
+    scene = Range.types.KX_Scene()
+    camera = scene.addObject(Range.types.KX_Camera("Camera", position=(0, -10, 2)))
+    scene.active_camera = camera
+
+    # Duplicatas do mesmo tipo compartilham malha e material, como no editor
+    meshes = {}
+    for tipo in TIPOS:
+        material = Range.types.KX_BlenderMaterial(f"MA_{tipo}", ["gota"])
+        meshes[tipo] = Range.types.KX_Mesh(f"ME_{tipo}", [material])
+
+    particles = []
+    for i in range(count):
+        tipo = TIPOS[i % len(TIPOS)]
+        mesh = meshes[tipo]
+        obj = scene.addObject(Range.types.KX_GameObject(
+            f"{tipo}_{i:04d}", position=(i % 32, i // 32, 0), meshes=[mesh]))
+        comp = AdvancedParticleSystem(obj)
+        obj.components["AdvancedParticleSystem"] = comp
+        comp.awake(component_args(AdvancedParticleSystem, PARTICLE_ARGS))
+        particles.append(comp)
+
+    for comp in particles:
+        comp.start(comp.args)
+
+    clima_obj = scene.addObject(Range.types.KX_GameObject("Clima"))
+    clima_obj["activate"] = True
+    clima_obj["clima_atual"] = "chuvoso"
+    clima = ClimaControl(clima_obj)
+    clima_obj.components["ClimaControl"] = clima
+    clima.start(component_args(ClimaControl, CLIMA_ARGS))
+    return scene, particles, clima
+
+
+def draw_objects(particles):
+    """
+    Simula o desenho: o motor chama os objectCallbacks do shader para cada
+    objeto visível (é onde os uniforms por objeto são enviados)
+    """
+    for comp in particles:
+        if comp.shader is None or not comp.object.visible:
+            continue
+        for callback in comp.shader.objectCallbacks:
+            callback(comp.object)
+
+
+def run_frames(particles, clima, frames, trace_memory=False):
+    """Executa `frames` frames e devolve as métricas brutas de cada um"""
+    samples = []
+    sink = LineCounter()
+    if trace_memory:
+        tracemalloc.start()
+
+    for _ in range(frames):
+        Range.logic.frame_time += FRAME_STEP
+        Range.reset_stats()
+        uniformState.reset_totals()
+        sink.lines = 0
+        if trace_memory:
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+
+        with contextlib.redirect_stdout(sink):
+            start = time.perf_counter()
+            for comp in particles:
+                comp.update()
+            clima.update()
+            draw_objects(particles)
+            elapsed = time.perf_counter() - start
+
+        sample = {
+            "time_ms": elapsed * 1000.0,
+            "uniform_calls": Range.stats["uniform_calls"],
+            "uniform_skipped": uniformState.totals["skipped"],
+            "compiles": Range.stats["compiles"],
+            "prints": sink.lines,
+        }
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            sample["alloc_kib"] = max(0, peak - mem_before) / 1024.0
+        samples.append(sample)
+
+    if trace_memory:
+        tracemalloc.stop()
+    return samples
+
+
+def benchmark(count, frames, audio_dir):
+    """Mede um cenário com `count` sistemas"""
+    random.seed(1234)
+    Range.logic.frame_time = 0.0
+    Range.logic.base_path = audio_dir
+    aud.reset_stats()
+    program_cache.clear()
+    audio_registry.reset()
+
+    with contextlib.redirect_stdout(LineCounter()):
+        scene, particles, clima = build_scene(count)
+
+    timed = run_frames(particles, clima, frames)
+    traced = run_frames(particles, clima, max(1, frames // 5), trace_memory=True)
+
+    times = sorted(s["time_ms"] for s in timed)
+    return {
+        "systems": count,
+        "frames": frames,
+        "ms_per_frame": statistics.mean(times),
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "us_per_system": statistics.mean(times) * 1000.0 / count,
+        "uniform_calls_per_frame": statistics.mean(s["uniform_calls"] for s in timed),
+        "uniform_skipped_per_frame": statistics.mean(s["uniform_skipped"] for s in timed),
+        "compiles": sum(s["compiles"] for s in timed),
+        "shader_cache_hits": program_cache.hits,
+        "prints_per_frame": statistics.mean(s["prints"] for s in timed),
+        "alloc_kib_per_frame": statistics.mean(s["alloc_kib"] for s in traced),
+        "audio_devices": aud.stats["devices"],
+        "audio_decodes": aud.stats["cached"],
+    }
+
+
+def print_report(results):
+    header = (f"{'sistemas':>8} {'ms/frame':>9} {'p95 ms':>8} {'us/sist':>8} "
+              f"{'uniforms':>9} {'evitados':>8} {'prints':>7} {'KiB/frame':>9} {'devices':>7} {'decodes':>7}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['systems']:>8} {r['ms_per_frame']:>9.3f} {r['p95_ms']:>8.3f} "
+              f"{r['us_per_system']:>8.2f} {r['uniform_calls_per_frame']:>9.1f} "
+              f"{r['uniform_skipped_per_frame']:>8.1f} "
+              f"{r['prints_per_frame']:>7.2f} {r['alloc_kib_per_frame']:>9.2f} "
+              f"{r['audio_devices']:>7} {r['audio_decodes']:>7}")
+
+
+def check_regressions(results, baseline_path, tolerance):
+    """
+    Compara com um resultado salvo anteriormente
+    Métricas de contagem são exatas; tempos aceitam `tolerance` de folga
+    Retorna: lista de mensagens de regressão
+    """
+    with open(baseline_path) as f:
+        baseline = {r["systems"]: r for r in json.load(f)}
+
+    regressions = []
+    for r in results:
+        base = baseline.get(r["systems"])
+        if base is None:
+            continue
+        for key in ("ms_per_frame", "alloc_kib_per_frame"):
+            if r[key] > base[key] * (1.0 + tolerance):
+                regressions.append(f"{r['systems']} sistemas: {key} {base[key]:.3f} -> {r[key]:.3f}")
+        for key in ("uniform_calls_per_frame", "prints_per_frame", "audio_decodes"):
+            if r[key] > base[key]:
+                regressions.append(f"{r['systems']} sistemas: {key} {base[key]} -> {r[key]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=120, help="frames simulados por cenário")
+    parser.add_argument("--counts", type=int, nargs="+", default=COUNTS, help="quantidades de sistemas")
+    parser.add_argument("--json", help="salva os resultados neste arquivo")
+    parser.add_argument("--check", help="compara com um JSON salvo e falha em regressão")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="folga relativa para tempos")
+    options = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as audio_dir:
+        with open(os.path.join(audio_dir, PARTICLE_ARGS["audio_file"]), "wb"):
+            pass
+        results = [benchmark(count, options.frames, audio_dir) for count in options.counts]
+
+    print_report(results)
+
+    if options.json:
+        with open(options.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if options.check:
+        regressions = check_regressions(results, options.check, options.tolerance)
+        for message in regressions:
+            print(f"REGRESSÃO: {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Substituto do módulo Range para o benchmark headless
+
+Fornece `types`, `logic` e `render` com objetos de cena, materiais e shaders
+falsos. Os shaders contam cada chamada de uniform/sampler/compilação em
+`stats`, que o benchmark lê para reportar custo por frame.
+"""
+import os
+from types import SimpleNamespace
+
+from mathutils import Matrix, Vector
+
+__all__ = ["types", "logic", "render", "stats", "reset_stats"]
+
+stats = {
+    "uniform_calls": 0,
+    "sampler_calls": 0,
+    "compiles": 0,
+    "visibility_calls": 0,
+}
+
+
+def reset_stats():
+    for key in stats:
+        stats[key] = 0
+
+
+class BL_Shader:
+    def __init__(self):
+        self._valid = False
+        self.sources = None
+        self.uniforms = {}
+        self.objectCallbacks = []
+
+    def isValid(self):
+        return self._valid
+
+    def setSourceList(self, sources, apply):
+        stats["compiles"] += 1
+        self.sources = dict(sources)
+        self._valid = True
+
+    def setSource(self, vertex, fragment, apply):
+        self.setSourceList({"vertex": vertex, "fragment": fragment}, apply)
+
+    def setSampler(self, name, index):
+        stats["sampler_calls"] += 1
+        self.uniforms[name] = index
+
+    def _uniform(self, name, *values):
+        stats["uniform_calls"] += 1
+        self.uniforms[name] = values[0] if len(values) == 1 else values
+
+    def setUniform1f(self, name, x):
+        self._uniform(name, x)
+
+    def setUniform2f(self, name, x, y):
+        self._uniform(name, x, y)
+
+    def setUniform3f(self, name, x, y, z):
+        self._uniform(name, x, y, z)
+
+    def setUniform4f(self, name, x, y, z, w):
+        self._uniform(name, x, y, z, w)
+
+    def setUniform1i(self, name, x):
+        self._uniform(name, x)
+
+    def setUniform2i(self, name, x, y):
+        self._uniform(name, x, y)
+
+    def setUniform3i(self, name, x, y, z):
+        self._uniform(name, x, y, z)
+
+    def setUniformfv(self, name, values):
+        self._uniform(name, tuple(values))
+
+    def setUniformMatrix4(self, name, matrix, transpose=True):
+        self._uniform(name, matrix)
+
+
+class Texture:
+    def __init__(self, name):
+        self.name = name
+
+
+class KX_BlenderMaterial:
+    def __init__(self, name, texture_names=()):
+        self.name = name
+        self.textures = [Texture(n) for n in texture_names]
+        self._shader = BL_Shader()
+
+    def getShader(self):
+        return self._shader
+
+
+class KX_Mesh:
+    def __init__(self, name, materials):
+        self.name = name
+        self.materials = materials
+
+
+class CListValue(list):
+    """Lista de objetos acessível por índice ou nome, como no motor"""
+
+    def get(self, name, default=None):
+        for obj in self:
+            if obj.name == name:
+                return obj
+        return default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            obj = self.get(key)
+            if obj is None:
+                raise KeyError(key)
+            return obj
+        return list.__getitem__(self, key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return self.get(key) is not None
+        return list.__contains__(self, key)
+
+
+class KX_GameObject:
+    def __init__(self, name, scene=None, position=(0.0, 0.0, 0.0), meshes=()):
+        self.name = name
+        self.scene = scene
+        self.worldPosition = Vector(position)
+        self.worldScale = Vector((1.0, 1.0, 1.0))
+        self.meshes = list(meshes)
+        self.components = {}
+        self.visible = True
+        self.invalid = False
+        self._props = {}
+
+    @property
+    def worldTransform(self):
+        # Apenas translação - os objetos de teste não giram nem escalam
+        p = self.worldPosition
+        return Matrix([[1, 0, 0, p.x], [0, 1, 0, p.y], [0, 0, 1, p.z], [0, 0, 0, 1]])
+
+    def setVisible(self, visible, recursive=False):
+        stats["visibility_calls"] += 1
+        self.visible = bool(visible)
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def __contains__(self, key):
+        return key in self._props
+
+    def getPropertyNames(self):
+        return list(self._props)
+
+
+class KX_Camera(KX_GameObject):
+    INSIDE = 0
+    INTERSECT = 1
+    OUTSIDE = 2
+
+    def __init__(self, name, scene=None, position=(0.0, 0.0, 0.0)):
+        super().__init__(name, scene, position)
+        self.lens = 35.0
+        self.near = 0.1
+        self.far = 100.0
+
+    def sphereInsideFrustum(self, centre, radius):
+        # Frustum simplificado: câmera olhando para +Y, cone de 90 graus
+        rel = Vector(centre) - self.worldPosition
+        if rel.y + radius < self.near or rel.y - radius > self.far:
+            return self.OUTSIDE
+        if abs(rel.x) - radius > rel.y + radius or abs(rel.z) - radius > rel.y + radius:
+            return self.OUTSIDE
+        if rel.y - radius > self.near and rel.y + radius < self.far:
+            return self.INSIDE
+        return self.INTERSECT
+
+
+class KX_Scene:
+    def __init__(self, name="Scene"):
+        self.name = name
+        self.objects = CListValue()
+        self.active_camera = None
+
+    def addObject(self, obj):
+        obj.scene = self
+        self.objects.append(obj)
+        return obj
+
+
+class KX_PythonComponent:
+    """Base dos componentes Python - o motor injeta o objeto dono"""
+    args = {}
+
+    def __init__(self, obj=None):
+        self.object = obj
+
+
+class _Logic:
+    def __init__(self):
+        self.frame_time = 0.0
+        self.average_frame_rate = 60.0
+        self.base_path = os.getcwd()
+
+    def getFrameTime(self):
+        return self.frame_time
+
+    def getAverageFrameRate(self):
+        return self.average_frame_rate
+
+    def expandPath(self, path):
+        if path.startswith("//"):
+            return os.path.join(self.base_path, path[2:])
+        return path
+
+
+class _Render:
+    def __init__(self):
+        self.width = 1280
+        self.height = 720
+
+    def getWindowWidth(self):
+        return self.width
+
+    def getWindowHeight(self):
+        return self.height
+
+
+types = SimpleNamespace(
+    KX_PythonComponent=KX_PythonComponent,
+    KX_GameObject=KX_GameObject,
+    KX_Camera=KX_Camera,
+    KX_Scene=KX_Scene,
+    KX_BlenderMaterial=KX_BlenderMaterial,
+    KX_Mesh=KX_Mesh,
+    BL_Shader=BL_Shader,
+    CListValue=CListValue,
+)
+logic = _Logic()
+render = _Render()
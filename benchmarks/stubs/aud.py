@@ -0,0 +1,63 @@
+"""
+Substituto do módulo aud para o benchmark headless
+Não reproduz som - apenas conta dispositivos, decodificações e reproduções.
+"""
+
+STATUS_INVALID = 0
+STATUS_PLAYING = 1
+STATUS_PAUSED = 2
+STATUS_STOPPED = 3
+
+stats = {
+    "devices": 0,
+    "sounds": 0,
+    "cached": 0,
+    "plays": 0,
+}
+
+
+def reset_stats():
+    for key in stats:
+        stats[key] = 0
+
+
+class Handle:
+    def __init__(self, sound):
+        self.sound = sound
+        self.status = STATUS_PLAYING
+        self.loop_count = 0
+        self.volume = 1.0
+
+    def stop(self):
+        self.status = STATUS_STOPPED
+        return True
+
+
+class Sound:
+    def __init__(self, filename=None):
+        stats["sounds"] += 1
+        self.filename = filename
+        # Especificação fictícia: 1 segundo estéreo a 44.1 kHz
+        self.length = 44100
+        self.specs = (44100.0, 2)
+
+    @staticmethod
+    def cache(sound):
+        stats["cached"] += 1
+        cached = Sound.__new__(Sound)
+        cached.filename = sound.filename
+        cached.length = sound.length
+        cached.specs = sound.specs
+        return cached
+
+
+class Device:
+    def __init__(self, *args, **kwargs):
+        stats["devices"] += 1
+
+    def play(self, sound, keep=False):
+        stats["plays"] += 1
+        return Handle(sound)
+
+    def stopAll(self):
+        pass
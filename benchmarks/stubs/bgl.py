@@ -0,0 +1,60 @@
+"""
+Substituto do módulo bgl para o benchmark headless
+As funções GL não fazem nada além de contar chamadas.
+"""
+
+GL_INT = 0x1404
+GL_FLOAT = 0x1406
+GL_RGBA = 0x1908
+GL_RGBA32F = 0x8814
+GL_TEXTURE_2D = 0x0DE1
+GL_TEXTURE0 = 0x84C0
+GL_NEAREST = 0x2600
+GL_TEXTURE_MIN_FILTER = 0x2801
+GL_TEXTURE_MAG_FILTER = 0x2800
+
+stats = {"calls": 0}
+
+
+class Buffer:
+    def __init__(self, gl_type, dimensions, template=None):
+        self.type = gl_type
+        self.dimensions = dimensions
+        size = dimensions if isinstance(dimensions, int) else dimensions[0]
+        self._data = list(template) if template is not None else [0] * size
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, i):
+        return self._data[i]
+
+    def __setitem__(self, i, value):
+        self._data[i] = value
+
+    def to_list(self):
+        return list(self._data)
+
+
+def _gl_call(*args, **kwargs):
+    stats["calls"] += 1
+
+
+def glGenTextures(count, buffer):
+    stats["calls"] += 1
+    for i in range(count):
+        buffer[i] = i + 1
+
+
+def glGetIntegerv(name, buffer):
+    # Sem driver: 0 (quem consulta cai nos mínimos da especificação)
+    stats["calls"] += 1
+    buffer[0] = 0
+
+
+glActiveTexture = _gl_call
+glBindTexture = _gl_call
+glTexImage2D = _gl_call
+glTexSubImage2D = _gl_call
+glTexParameteri = _gl_call
+glDeleteTextures = _gl_call
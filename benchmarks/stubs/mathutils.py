@@ -0,0 +1,137 @@
+"""
+Substituto mínimo do mathutils para rodar os componentes sem o Range Engine
+Implementa apenas o que os componentes e o benchmark usam.
+"""
+import math
+
+
+class Vector:
+    __slots__ = ("_v",)
+
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        self._v = [float(c) for c in seq]
+
+    # Acesso por componente
+    x = property(lambda self: self._v[0], lambda self, v: self._set(0, v))
+    y = property(lambda self: self._v[1], lambda self, v: self._set(1, v))
+    z = property(lambda self: self._v[2], lambda self, v: self._set(2, v))
+
+    def _set(self, i, value):
+        self._v[i] = float(value)
+
+    def __len__(self):
+        return len(self._v)
+
+    def __iter__(self):
+        return iter(self._v)
+
+    def __getitem__(self, i):
+        return self._v[i]
+
+    def __setitem__(self, i, value):
+        self._v[i] = float(value)
+
+    def __repr__(self):
+        return "Vector((" + ", ".join(f"{c:.4f}" for c in self._v) + "))"
+
+    def __eq__(self, other):
+        try:
+            return list(self._v) == [float(c) for c in other]
+        except TypeError:
+            return NotImplemented
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self._v, other))
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self._v, other))
+
+    def __mul__(self, scalar):
+        return Vector(a * scalar for a in self._v)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        return Vector(a / scalar for a in self._v)
+
+    def __neg__(self):
+        return Vector(-a for a in self._v)
+
+    def copy(self):
+        return Vector(self._v)
+
+    def dot(self, other):
+        return sum(a * b for a, b in zip(self._v, other))
+
+    def cross(self, other):
+        ax, ay, az = self._v
+        bx, by, bz = other
+        return Vector((ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx))
+
+    @property
+    def length(self):
+        return math.sqrt(sum(a * a for a in self._v))
+
+    @property
+    def length_squared(self):
+        return sum(a * a for a in self._v)
+
+    def normalized(self):
+        length = self.length
+        return Vector(self._v) if length == 0.0 else self / length
+
+
+class Matrix:
+    """Matriz 4x4 linha-maior (apenas o necessário para câmeras de teste)"""
+
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+        self._m = [[float(c) for c in row] for row in rows]
+
+    @classmethod
+    def Identity(cls, size=4):
+        return cls()
+
+    def __getitem__(self, i):
+        return self._m[i]
+
+    def __iter__(self):
+        return iter(self._m)
+
+    def __len__(self):
+        return len(self._m)
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix([[sum(self._m[i][k] * other._m[k][j] for k in range(4))
+                            for j in range(4)] for i in range(4)])
+        v = list(other) + [1.0] * (4 - len(other))
+        out = [sum(self._m[i][k] * v[k] for k in range(4)) for i in range(4)]
+        return Vector(out[:len(other)])
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and self._m == other._m
+
+    def copy(self):
+        return Matrix(self._m)
+
+    def transposed(self):
+        return Matrix([[self._m[j][i] for j in range(4)] for i in range(4)])
+
+    def inverted(self):
+        # Eliminação de Gauss-Jordan
+        n = 4
+        a = [row[:] + [1.0 if i == j else 0.0 for j in range(n)] for i, row in enumerate(self._m)]
+        for col in range(n):
+            pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+            if abs(a[pivot][col]) < 1e-12:
+                raise ValueError("Matriz não inversível")
+            a[col], a[pivot] = a[pivot], a[col]
+            p = a[col][col]
+            a[col] = [c / p for c in a[col]]
+            for r in range(n):
+                if r != col:
+                    f = a[r][col]
+                    a[r] = [x - f * y for x, y in zip(a[r], a[col])]
+        return Matrix([row[n:] for row in a])
@@ -1,16 +1,59 @@
 from Range import *
-from collections import OrderedDict
+from collections import OrderedDict, deque
+import math
 import random
 import time
 
+import numpy as np
+
+from weatherMarkov import WeatherMarkov
+from weatherRegistry import get_registry, type_from_name, ADDED, REMOVED
+from particleManager import get_manager
+from debugLog import get_logger, DEBUG, INFO, WARNING
+from frameProfiler import profiler, profiled
+from simClock import create_clock
+from windField import get_wind_field
+
+log = get_logger("clima")
+
+# Tipos de sistema de partículas ativos em cada clima
+SISTEMAS_POR_CLIMA = {
+    "chuvoso": ["chuva"],
+    "nevando": ["neve"],
+    "seco": ["poeira", "folhas"],
+    "nublado": ["nevoa"],
+    "ensolarado": ["folhas"],
+}
+
+# Vento por clima: (força em m/s, rajada 0..1)
+VENTO_POR_CLIMA = {
+    "ensolarado": (1.0, 0.2),
+    "seco": (4.0, 0.5),
+    "nublado": (2.5, 0.3),
+    "chuvoso": (5.0, 0.6),
+    "nevando": (2.0, 0.4),
+}
+
 class ClimaControl(types.KX_PythonComponent):
     args = OrderedDict([
         ("Duração mínima clima (min)", 0.1),
         ("Duração máxima clima (min)", 0.2),
         ("Chance de chuva (%)", 15),
         ("Chance de neve (%)", 30),
+        ("Tempo de transição (s)", 3.0),
+        ("Frames de aquecimento", 30),
+        ("Agenda (etapas)", 64),  # Climas sorteados com antecedência pelo modelo de Markov
+        ("Antecedência pré-carga (s)", 5.0),  # Prepara os sistemas do próximo clima antes da troca
+        ("Orçamento aquecimento (ms)", 4.0),
         ("Debug", True),
         ("Debug Detalhado", True),
+        ("Profiler", False),
+        ("Relógio", {"Motor", "Sistema"}),  # Motor = tempo de jogo (para na pausa)
+        ("Semente", 0),  # 0 = sorteada (fica em object["semente"] para replay)
+        ("Qualidade adaptativa", False),  # Reduz partículas (chuva antes de folhas) para manter o FPS alvo
+        ("FPS alvo", 60.0),
+        ("Direção do vento (°)", 45.0),  # Ângulo no plano xy (0 = +x)
+        ("Força do vento (x)", 1.0),     # Multiplica a força de VENTO_POR_CLIMA (0 = sem vento)
     ])
 
     def start(self, args):
@@ -19,19 +62,58 @@ class ClimaControl(types.KX_PythonComponent):
         self.duracao_max = args["Duração máxima clima (min)"] * 60
         self.chance_chuva = args["Chance de chuva (%)"]
         self.chance_neve = args["Chance de neve (%)"]
+        self.tempo_transicao = args.get("Tempo de transição (s)", 3.0)
+        self.frames_aquecimento = max(1, int(args.get("Frames de aquecimento", 30)))
+        self.orcamento_aquecimento = args.get("Orçamento aquecimento (ms)", 4.0)
+        self.tamanho_agenda = max(2, int(args.get("Agenda (etapas)", 64)))
+        self.antecedencia_pre_carga = args.get("Antecedência pré-carga (s)", 5.0)
         self.debug = args["Debug"]
         self.debug_detalhado = args["Debug Detalhado"]
+        log.set_level(DEBUG if self.debug_detalhado else INFO if self.debug else WARNING)
+        if args.get("Profiler", False):
+            profiler.enable()
+        
+        # Relógio injetável e gerador aleatório próprio (reprodutível pela semente)
+        self.relogio = create_clock(args.get("Relógio", "Motor"))
+        self.definir_semente(self.object.get("semente", args.get("Semente", 0)))
+
+        # Vento da cena, com força e rajada definidas por clima
+        self.vento = get_wind_field(self.object.scene)
+        angulo = math.radians(args.get("Direção do vento (°)", 45.0))
+        self.vento.set_direction((math.cos(angulo), math.sin(angulo), 0.0))
+        self.multiplicador_vento = args.get("Força do vento (x)", 1.0)
+
+        # Governador de qualidade compartilhado pelos sistemas da cena
+        self.governador = get_manager(self.object.scene).governor
+        if args.get("Qualidade adaptativa", False):
+            self.governador.enable(args.get("FPS alvo", 60.0))
         
         self.timer = 0.0
+        self.tempo_simulado = 0.0
         self.clima_atual = self.object.get("clima_atual", "ensolarado")
-        self.duracao_atual = random.uniform(self.duracao_min, self.duracao_max)
-        self.last_time = time.time()
+        # Modelo de transição (matriz construída uma vez) e agenda à frente
+        self.modelo = WeatherMarkov.from_chances(self.chance_chuva, self.chance_neve)
+        self.agenda = deque()
+        self.pre_carregado = None
+        self.duracao_atual = self.modelo.sample_duration(self.clima_atual, self.rng, self.duracao_min, self.duracao_max)
+        self.historico = [(0.0, self.clima_atual)]
+        self.last_time = self.relogio.now()
         self.last_clima_check = self.last_time
         self.last_debug_time = self.last_time
         
         self.sistemas_particulas = {}
+        self.transicoes = {}
         self.proximo_clima = None
         self.tempo_restante = self.duracao_atual
+
+        # Aquecimento (shaders e áudio) distribuído nos primeiros frames
+        self.fila_aquecimento = deque()
+        self.aquecimento_total = 0
+        self.aquecimento_feito = 0
+        self.aquecimento_por_frame = 1
+        self.aquecimento_concluido = False
+        self.callbacks_progresso = []
+        self.callbacks_concluido = []
         
         if self.debug:
             print(f"🔧 INICIALIZANDO SISTEMA DE CLIMA")
@@ -39,146 +121,237 @@ class ClimaControl(types.KX_PythonComponent):
             print(f"   Clima inicial: {self.clima_atual}")
             print(f"   Active: {self.active}")
         
-        self.coletar_sistemas_particulas_por_nome()
+        self.coletar_sistemas_particulas()
         self.definir_clima_inicial(self.clima_atual)
         
         self.proximo_clima = self.determinar_proximo_clima()
+        self.preparar_aquecimento()
         
         if self.debug:
             self.mostrar_info_clima()
 
+    def definir_semente(self, semente):
+        """
+        Reinicia o gerador aleatório da instância
+        Semente 0/None sorteia uma nova, gravada em object["semente"] para replay
+        """
+        if not semente:
+            semente = random.SystemRandom().randrange(1, 2**31)
+        self.semente = int(semente)
+        self.rng = np.random.default_rng(self.semente)
+        self.object["semente"] = self.semente
+
+    def definir_relogio(self, relogio):
+        """
+        Troca a fonte de tempo (qualquer objeto com now() em segundos),
+        ex.: simClock.ManualClock() para testes headless
+        """
+        self.relogio = relogio
+        self.last_time = relogio.now()
+        self.last_debug_time = self.last_time
+
+    def preparar_aquecimento(self):
+        """
+        Monta a fila de aquecimento: compilação do shader e carga do áudio de
+        cada sistema coletado, começando pelos tipos do próximo clima
+        """
+        prioritarios = SISTEMAS_POR_CLIMA.get(self.proximo_clima, [])
+        tipos = sorted(self.sistemas_particulas, key=lambda tipo: tipo not in prioritarios)
+
+        self.fila_aquecimento = deque()
+        for tipo in tipos:
+            for sistema in self.sistemas_particulas[tipo]:
+                componente = sistema['componente']
+                self.fila_aquecimento.append(componente.warm_up_shader)
+                self.fila_aquecimento.append(componente.load_audio)
+
+        self.aquecimento_total = len(self.fila_aquecimento)
+        self.aquecimento_feito = 0
+        self.aquecimento_concluido = False
+        # Mínimo por frame para terminar dentro de "Frames de aquecimento"
+        self.aquecimento_por_frame = max(1, math.ceil(self.aquecimento_total / self.frames_aquecimento))
+        self.object["aquecimento_progresso"] = 0.0 if self.aquecimento_total else 1.0
+
+        if self.debug:
+            print(f"🔥 Aquecimento: {self.aquecimento_total} tarefas em até {self.frames_aquecimento} frames")
+
+    def ao_progresso_aquecimento(self, callback):
+        """Registra callback(progresso) chamado a cada frame de aquecimento (0.0 a 1.0)"""
+        self.callbacks_progresso.append(callback)
+
+    def ao_concluir_aquecimento(self, callback):
+        """Registra callback() chamado quando o aquecimento termina (imediato se já terminou)"""
+        if self.aquecimento_concluido:
+            callback()
+        else:
+            self.callbacks_concluido.append(callback)
+
+    @profiled("aquecimento")
+    def atualizar_aquecimento(self):
+        """
+        Executa tarefas de aquecimento dentro do orçamento do frame, garantindo
+        o mínimo necessário para concluir em "Frames de aquecimento"
+        """
+        if self.aquecimento_concluido and not self.fila_aquecimento:
+            return
+
+        limite = time.perf_counter() + self.orcamento_aquecimento / 1000.0
+        feitas = 0
+        while self.fila_aquecimento:
+            if feitas >= self.aquecimento_por_frame and time.perf_counter() >= limite:
+                break
+            tarefa = self.fila_aquecimento.popleft()
+            tarefa()
+            feitas += 1
+
+        # Pré-cargas posteriores usam a mesma fila, sem progresso nem callbacks
+        if self.aquecimento_concluido:
+            return
+        self.aquecimento_feito += feitas
+
+        progresso = self.aquecimento_feito / self.aquecimento_total if self.aquecimento_total else 1.0
+        self.object["aquecimento_progresso"] = progresso
+        for callback in self.callbacks_progresso:
+            callback(progresso)
+
+        if not self.fila_aquecimento:
+            self.aquecimento_concluido = True
+            if self.debug:
+                print(f"✅ Aquecimento concluído: {self.aquecimento_feito} tarefas")
+            for callback in self.callbacks_concluido:
+                callback()
+            self.callbacks_concluido = []
+
+    @profiled("definir_clima")
     def definir_clima_inicial(self, clima):
         """Define o clima inicial desativando todos os sistemas primeiro"""
         if self.debug:
             print(f"\n🌤️  DEFININDO CLIMA INICIAL: {clima}")
 
-        sistemas_por_clima = {
-            "chuvoso": ["chuva"],
-            "nevando": ["neve"], 
-            "seco": ["poeira", "folhas"],
-            "nublado": ["nevoa"],
-            "ensolarado": ["folhas"]
-        }
-        
+        self.aplicar_vento(clima, 0.0)
+
         # 🔥 Desativa todos os sistemas primeiro
+        self.transicoes = {}
         for tipo, sistemas in self.sistemas_particulas.items():
             for sistema in sistemas:
                 sistema['componente'].deactivate_system()
         
-        # ✅ Ativa apenas os sistemas do clima inicial
-        tipos_ativar = sistemas_por_clima.get(clima, [])
+        # ✅ Ativa apenas os sistemas do clima inicial (sem transição)
+        tipos_ativar = SISTEMAS_POR_CLIMA.get(clima, [])
         for tipo in tipos_ativar:
             if tipo in self.sistemas_particulas:
                 for sistema in self.sistemas_particulas[tipo]:
+                    sistema['componente'].set_intensity(1.0)
                     sistema['componente'].activate_system()
-                    if self.debug_detalhado:
-                        print(f"   ✅ Ativado (inicial): {sistema['objeto'].name} ({tipo})")
+                    if log.debug_enabled:
+                        log.debug("   ✅ Ativado (inicial): %s (%s)", sistema['objeto'].name, tipo)
 
         self.clima_atual = clima
         self.object["clima_atual"] = clima
 
     def extrair_tipo_por_nome(self, nome_objeto):
-        """Extrai o tipo de partícula baseado no nome do objeto - VERSÃO CORRIGIDA"""
-        nome_lower = nome_objeto.lower().strip()
-        
-        # 🔥 ORDEM IMPORTANTE: termos mais específicos primeiro
-        mapeamento_tipos = [
-            ("neve", ["snow", "nevando", "neve_", "_neve"]),
-            ("chuva", ["rain", "chuvando", "chuva_", "_chuva"]),
-            ("nevoa", ["fog", "mist", "nevoa", "nevoeiro"]),
-            ("poeira", ["dust", "poeira"]),
-            ("folhas", ["leaves", "leaf", "folhas"])
-        ]
-        
-        for tipo, palavras_chave in mapeamento_tipos:
-            for palavra in palavras_chave:
-                if palavra in nome_lower:
-                    if self.debug_detalhado:
-                        print(f"   ✅ {nome_objeto} → '{tipo}' (palavra-chave: '{palavra}')")
-                    return tipo
-        
-        if self.debug_detalhado:
-            print(f"   ❌ {nome_objeto} → NÃO CLASSIFICADO")
-        return None
+        """Extrai o tipo de partícula baseado no nome do objeto (fallback do registro)"""
+        tipo, palavra = type_from_name(nome_objeto)
+        if log.debug_enabled:
+            if tipo:
+                log.debug("   ✅ %s → '%s' (palavra-chave: '%s')", nome_objeto, tipo, palavra)
+            else:
+                log.debug("   ❌ %s → NÃO CLASSIFICADO", nome_objeto)
+        return tipo
 
-    def coletar_sistemas_particulas_por_nome(self):
-        """Coleta sistemas de partículas baseado no nome do objeto - VERSÃO CORRIGIDA"""
+    @profiled("coletar_sistemas")
+    def coletar_sistemas_particulas(self):
+        """
+        Coleta os sistemas do registro de clima da cena (indexado por tipo)
+        e passa a receber os sistemas adicionados/removidos depois
+        """
+        self.registro = get_registry(self.object.scene)
+        self.registro.remove_listener(self.ao_mudar_registro)
         self.sistemas_particulas = {}
         sistemas_encontrados = 0
-        
-        for obj in self.object.scene.objects:
-            if "AdvancedParticleSystem" in obj.components:
-                componentes = obj.components["AdvancedParticleSystem"]
-                if not componentes:
-                    continue
-                    
-                comp = componentes
-                tipo = self.extrair_tipo_por_nome(obj.name)
-                
-                if tipo is None:
-                    if self.debug_detalhado:
-                        print(f"   Ignorado: {obj.name} - tipo não identificado")
-                    continue
-                
-                if tipo not in self.sistemas_particulas:
-                    self.sistemas_particulas[tipo] = []
-                
-                self.sistemas_particulas[tipo].append({
-                    'objeto': obj,
-                    'componente': comp
-                })
+
+        for tipo in self.registro.weather_types():
+            for comp in self.registro.systems(tipo):
+                self.adicionar_sistema(tipo, comp)
                 sistemas_encontrados += 1
-                
-                # 🔥 DESATIVA CADA SISTEMA ENCONTRADO
-                if comp.iniciarAtivado():
-                    print("sistema individual ativo {obj.name}, componente {comp}")
-                comp.deactivate_system()
-                
-                if self.debug_detalhado:
-                    print(f"   Coletado e DESATIVADO: {obj.name} → '{tipo}'")
-        
+
+        self.registro.add_listener(self.ao_mudar_registro)
+
         if self.debug:
             print(f"   Sistemas coletados: {sistemas_encontrados}")
             print(f"   Tipos: {list(self.sistemas_particulas.keys())}")
 
+    # Nome antigo mantido por compatibilidade
+    coletar_sistemas_particulas_por_nome = coletar_sistemas_particulas
+
+    def adicionar_sistema(self, tipo, comp):
+        """Inclui um sistema no índice local e o desativa até ser usado pelo clima"""
+        self.sistemas_particulas.setdefault(tipo, []).append({
+            'objeto': comp.object,
+            'componente': comp
+        })
+
+        # 🔥 DESATIVA CADA SISTEMA ENCONTRADO
+        comp.iniciarAtivado()
+        comp.deactivate_system()
+
+        if log.debug_enabled:
+            log.debug("   Coletado e DESATIVADO: %s → '%s'", comp.object.name, tipo)
+
+    def ao_mudar_registro(self, evento, tipo, comp):
+        """Ouvinte do registro: sistemas criados ou removidos após o start"""
+        if evento == ADDED:
+            self.adicionar_sistema(tipo, comp)
+
+            if tipo in SISTEMAS_POR_CLIMA.get(self.clima_atual, []):
+                comp.set_intensity(1.0)
+                comp.activate_system()
+
+            if not self.aquecimento_concluido:
+                self.fila_aquecimento.append(comp.warm_up_shader)
+                self.fila_aquecimento.append(comp.load_audio)
+                self.aquecimento_total += 2
+
+        elif evento == REMOVED:
+            sistemas = self.sistemas_particulas.get(tipo, [])
+            sistemas[:] = [sistema for sistema in sistemas if sistema['componente'] is not comp]
+            if not sistemas:
+                self.sistemas_particulas.pop(tipo, None)
+            self.transicoes.pop(comp, None)
+
+            if log.debug_enabled:
+                log.debug("   Removido: %s (%s)", comp.object.name, tipo)
+
     def calcular_probabilidades(self):
-        """Calcula as probabilidades de cada tipo de clima"""
-        prob_precipitacao = self.chance_chuva + self.chance_neve
-        prob_restante = max(0, 100 - prob_precipitacao)
-        
-        opcoes_nao_precipitacao = ["ensolarado", "seco", "nublado"]
-        prob_por_clima = prob_restante / len(opcoes_nao_precipitacao) if opcoes_nao_precipitacao else 0
-        
-        probabilidades = {
-            "chuvoso": self.chance_chuva,
-            "nevando": self.chance_neve,
-            "ensolarado": prob_por_clima,
-            "seco": prob_por_clima,
-            "nublado": prob_por_clima
-        }
-        
-        # ✅ Ajusta para garantir que a soma seja 100%
-        soma_atual = sum(probabilidades.values())
-        if soma_atual != 100:
-            ajuste = (100 - soma_atual) / len(probabilidades)
-            for clima in probabilidades:
-                probabilidades[clima] += ajuste
-        
-        return probabilidades
+        """Probabilidades (%) do próximo clima a partir do atual (linha do modelo, em cache)"""
+        return self.modelo.probabilities(self.clima_atual)
+
+    def completar_agenda(self):
+        """Reabastece a agenda em lote quando ela cai para a metade"""
+        if len(self.agenda) > self.tamanho_agenda // 2:
+            return
+        ultimo = self.agenda[-1][0] if self.agenda else self.clima_atual
+        self.agenda.extend(self.modelo.schedule(ultimo, self.tamanho_agenda - len(self.agenda),
+                                                self.rng, self.duracao_min, self.duracao_max))
 
     def determinar_proximo_clima(self):
-        """Determina o próximo clima baseado nas probabilidades"""
-        prob_precipitacao = self.chance_chuva + self.chance_neve
-        rand = random.random() * 100
-        
-        if rand < prob_precipitacao:
-            if rand < self.chance_chuva:
-                return "chuvoso"
-            else:
-                return "nevando"
-        
-        opcoes = ["ensolarado", "seco", "nublado"]
-        return random.choice(opcoes)
+        """Próximo clima da agenda gerada pelo modelo de Markov"""
+        self.completar_agenda()
+        return self.agenda[0][0]
+
+    def pre_carregar_proximo(self):
+        """
+        Enfileira no orçamento de aquecimento o que falta (shader/áudio)
+        para os sistemas do próximo clima
+        """
+        self.pre_carregado = self.proximo_clima
+        for tipo in SISTEMAS_POR_CLIMA.get(self.proximo_clima, []):
+            for sistema in self.sistemas_particulas.get(tipo, []):
+                componente = sistema['componente']
+                if not componente.shader_compiled:
+                    self.fila_aquecimento.append(componente.warm_up_shader)
+                if componente.audio_pending:
+                    self.fila_aquecimento.append(componente.load_audio)
 
     def mostrar_info_clima(self):
         """Mostra informações detalhadas sobre o estado do clima"""
@@ -191,6 +364,11 @@ class ClimaControl(types.KX_PythonComponent):
         print(f"Próximo Clima: {self.proximo_clima.upper()}")
         print(f"Timer: {self.timer:.1f}s / {self.duracao_atual:.1f}s")
         print(f"Tempo Restante: {self.tempo_restante/60:.1f}min ({self.tempo_restante:.0f}s)")
+        print("Agenda: " + " → ".join(f"{clima} ({duracao:.0f}s)" for clima, duracao in list(self.agenda)[:5]))
+        print(f"Vento: {self.vento.target_strength:.1f} m/s (rajada {self.vento.target_gust:.0%})")
+        if self.governador.enabled:
+            print(f"Qualidade: {self.governador.level:.0%} (pressão {self.governador.pressure:.2f}, "
+                  f"alvo {self.governador.target_fps:.0f} fps)")
         
         print("\n📊 PROBABILIDADES:")
         for clima, prob in probabilidades.items():
@@ -198,15 +376,7 @@ class ClimaControl(types.KX_PythonComponent):
             print(f"  {clima.capitalize()}: {prob:.1f}% {seta}")
         
         print("\n🎯 SISTEMAS DE PARTÍCULAS ATIVOS:")
-        sistemas_por_clima = {
-            "chuvoso": ["chuva"],
-            "nevando": ["neve"], 
-            "seco": ["poeira", "folhas"],
-            "nublado": ["nevoa"],
-            "ensolarado": ["folhas"]
-        }
-        
-        tipos_necessarios = sistemas_por_clima.get(self.clima_atual, [])
+        tipos_necessarios = SISTEMAS_POR_CLIMA.get(self.clima_atual, [])
         for tipo in tipos_necessarios:
             if tipo in self.sistemas_particulas:
                 status = f"✓ ENCONTRADO ({len(self.sistemas_particulas[tipo])} sistemas)"
@@ -216,6 +386,7 @@ class ClimaControl(types.KX_PythonComponent):
         
         print("="*50)
 
+    @profiled("definir_clima")
     def definir_clima(self, novo_clima):
         if novo_clima == self.clima_atual:
             return
@@ -223,63 +394,168 @@ class ClimaControl(types.KX_PythonComponent):
         if self.debug:
             print(f"\n🔄 MUDANÇA DE CLIMA: {self.clima_atual} → {novo_clima}")
 
-        sistemas_por_clima = {
-            "chuvoso": ["chuva"],
-            "nevando": ["neve"], 
-            "seco": ["poeira", "folhas"],
-            "nublado": ["nevoa"],
-            "ensolarado": ["folhas"]
-        }
-        
-        tipos_ativar = sistemas_por_clima.get(novo_clima, [])
-        tipos_desativar = sistemas_por_clima.get(self.clima_atual, [])
+        # Descarta sistemas cujos objetos saíram da cena sem dispose()
+        self.registro.prune()
+
+        tipos_ativar = SISTEMAS_POR_CLIMA.get(novo_clima, [])
+        tipos_desativar = SISTEMAS_POR_CLIMA.get(self.clima_atual, [])
         
         # 🔥 CORREÇÃO: Desativar apenas os tipos que NÃO serão reutilizados
+        # (a intensidade cai até zero e só então o sistema é desativado)
         for tipo in tipos_desativar:
             if tipo not in tipos_ativar and tipo in self.sistemas_particulas:
                 for sistema in self.sistemas_particulas[tipo]:
-                    sistema['componente'].deactivate_system()
-                    if self.debug_detalhado:
-                        print(f"   ❌ Desativado: {sistema['objeto'].name} ({tipo})")
+                    self.iniciar_transicao(sistema['componente'], 0.0)
+                    if log.debug_enabled:
+                        log.debug("   ❌ Desativando: %s (%s)", sistema['objeto'].name, tipo)
 
-        # ✅ DEPOIS: Ativar novos sistemas
+        # ✅ DEPOIS: Ativar novos sistemas com intensidade subindo de zero
         for tipo in tipos_ativar:
             if tipo in self.sistemas_particulas:
                 for sistema in self.sistemas_particulas[tipo]:
-                    sistema['componente'].activate_system()
-                    if self.debug_detalhado:
-                        print(f"   ✅ Ativado: {sistema['objeto'].name} ({tipo})")
+                    self.iniciar_transicao(sistema['componente'], 1.0)
+                    if log.debug_enabled:
+                        log.debug("   ✅ Ativado: %s (%s)", sistema['objeto'].name, tipo)
+
+        self.aplicar_vento(novo_clima, self.tempo_transicao)
 
+        # Resetar timer e sortear a próxima etapa da agenda
+        self.avancar_agenda(novo_clima)
+        self.last_time = self.relogio.now()
+        
+        if self.debug:
+            print(f"✅ Clima alterado: {novo_clima}")
+
+    def aplicar_vento(self, clima, transicao):
+        """Leva o vento da cena à força/rajada do clima em `transicao` segundos"""
+        forca, rajada = VENTO_POR_CLIMA.get(clima, (0.0, 0.0))
+        self.vento.set_target(forca * self.multiplicador_vento, rajada, transicao)
+
+    def avancar_agenda(self, novo_clima):
+        """
+        Avança a agenda para `novo_clima` sem tocar nos sistemas:
+        zera o timer, consome a etapa da agenda (ou recomeça a agenda se o
+        clima não era o previsto) e registra no histórico
+        """
         self.clima_atual = novo_clima
         self.object["clima_atual"] = novo_clima
-        
-        # Resetar timer
-        current_time = time.time()
         self.timer = 0.0
-        self.last_time = current_time
-        self.duracao_atual = random.uniform(self.duracao_min, self.duracao_max)
+        if self.agenda and self.agenda[0][0] == novo_clima:
+            _, self.duracao_atual = self.agenda.popleft()
+        else:
+            # Mudança fora da agenda (ex.: definir_clima manual): recomeça do novo clima
+            self.agenda.clear()
+            self.duracao_atual = self.modelo.sample_duration(novo_clima, self.rng, self.duracao_min, self.duracao_max)
         self.tempo_restante = self.duracao_atual
         self.proximo_clima = self.determinar_proximo_clima()
-        
-        if self.debug:
-            print(f"✅ Clima alterado: {novo_clima}")
+        self.pre_carregado = None
+        self.historico.append((self.tempo_simulado, novo_clima))
+
+    @profiled("simular")
+    def simular(self, duracao, aplicar=True):
+        """
+        Avança a agenda do clima `duracao` segundos em uma única chamada
+        (sem rampas nem ativações intermediárias). Com `aplicar`, o clima
+        final é aplicado aos sistemas de uma vez
+        Retorna: lista de (tempo simulado, clima) das mudanças ocorridas
+        """
+        inicio = len(self.historico)
+        clima_inicial = self.clima_atual
+        restante = max(0.0, duracao)
+
+        while restante > 0:
+            # Duração mínima evita laço infinito com duração 0 configurada
+            falta = max(self.duracao_atual - self.timer, 1e-3)
+            if restante < falta:
+                self.timer += restante
+                self.tempo_simulado += restante
+                break
+            restante -= falta
+            self.tempo_simulado += falta
+            self.avancar_agenda(self.proximo_clima)
+
+        self.tempo_restante = max(0, self.duracao_atual - self.timer)
+        self.last_time = self.relogio.now()
+
+        if aplicar and self.clima_atual != clima_inicial:
+            self.definir_clima_inicial(self.clima_atual)
+
+        return self.historico[inicio:]
+
+    # Nome em inglês para ferramentas e testes
+    simulate = simular
+
+    def iniciar_transicao(self, componente, alvo):
+        """Inicia a rampa de intensidade de um sistema até `alvo` (0 ou 1)"""
+        if self.tempo_transicao <= 0:
+            # Sem transição: liga/desliga imediatamente
+            self.transicoes.pop(componente, None)
+            if alvo > 0:
+                componente.set_intensity(1.0)
+                componente.activate_system()
+            else:
+                componente.deactivate_system()
+            return
+
+        if alvo > 0 and not componente.active:
+            componente.set_intensity(0.0)
+            componente.activate_system()
+        self.transicoes[componente] = alvo
+
+    @profiled("transicoes")
+    def atualizar_transicoes(self, delta_time):
+        """Avança as rampas de intensidade e desativa os sistemas que chegaram a zero"""
+        if not self.transicoes:
+            return
+
+        passo = delta_time / self.tempo_transicao
+        concluidas = []
+        for componente, alvo in self.transicoes.items():
+            atual = componente.intensity
+            if alvo > atual:
+                nova = min(alvo, atual + passo)
+            else:
+                nova = max(alvo, atual - passo)
+            componente.set_intensity(nova)
+
+            if nova == alvo:
+                concluidas.append(componente)
+                if alvo <= 0:
+                    componente.deactivate_system()
+                    # Volta ao padrão para ativações diretas futuras
+                    componente.set_intensity(1.0)
+
+        for componente in concluidas:
+            del self.transicoes[componente]
 
     def update(self):
+        # O aquecimento roda mesmo com o clima inativo (tela de carregamento)
+        self.atualizar_aquecimento()
+
         if not self.active:
-            if self.debug_detalhado and random.random() < 0.01:
-                print("❌ Sistema de clima INATIVO")
+            if log.debug_enabled:
+                log.debug("❌ Sistema de clima INATIVO", every=10.0)
             return
             
-        current_time = time.time()
-        delta_time = current_time - self.last_time
+        current_time = self.relogio.now()
+        delta_time = max(0.0, current_time - self.last_time)
         self.last_time = current_time
         self.timer += delta_time
+        self.tempo_simulado += delta_time
         self.tempo_restante = max(0, self.duracao_atual - self.timer)
+
+        # Transição suave entre climas (rampa de intensidade)
+        self.atualizar_transicoes(delta_time)
         
-        # Debug detalhado do timer
-        if self.debug_detalhado and int(current_time) % 5 == 0:
-            print(f"⏰ Timer: {self.timer:.1f}/{self.duracao_atual:.1f}s - Restante: {self.tempo_restante:.1f}s")
+        # Debug detalhado do timer (no máximo uma linha a cada 5s)
+        if log.debug_enabled:
+            log.debug("⏰ Timer: %.1f/%.1fs - Restante: %.1fs",
+                      self.timer, self.duracao_atual, self.tempo_restante, every=5.0)
         
+        # Prepara o próximo clima antes da troca (agenda conhecida com antecedência)
+        if self.pre_carregado != self.proximo_clima and self.tempo_restante <= self.antecedencia_pre_carga:
+            self.pre_carregar_proximo()
+
         # Mostra info completa a cada 30 segundos
         if self.debug and current_time - self.last_debug_time >= 30.0:
             self.last_debug_time = current_time
@@ -294,4 +570,8 @@ class ClimaControl(types.KX_PythonComponent):
             # ✅ RESET imediato do timer ANTES de mudar o clima
             self.timer = 0.0
             novo_clima = self.proximo_clima
-            self.definir_clima(novo_clima)
\ No newline at end of file
+            if novo_clima == self.clima_atual:
+                # Mesmo clima sorteado: apenas renova a duração e o próximo sorteio
+                self.avancar_agenda(novo_clima)
+            else:
+                self.definir_clima(novo_clima)
\ No newline at end of file
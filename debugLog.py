@@ -0,0 +1,204 @@
+"""
+Log com níveis, limite de frequência e buffer circular em memória
+
+Substitui os print() dos caminhos executados a cada frame. Cada mensagem é
+identificada pelo texto de formato (ou por `key`), então a mesma mensagem
+emitida por 100 sistemas no mesmo frame chega ao console uma vez por
+intervalo; as demais são apenas contadas. Todas as mensagens habilitadas
+entram no buffer circular (sem formatar) e podem ser despejadas com dump().
+
+Nos caminhos quentes, teste `log.debug_enabled` antes de montar argumentos:
+com o nível desligado o custo é só a leitura do atributo.
+
+    log = get_logger("particulas")
+    if log.debug_enabled:
+        log.debug("%s: LOD %d", nome, nivel, every=2.0)
+"""
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR", OFF: "OFF"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+# Intervalo mínimo padrão (s) entre duas saídas da mesma mensagem no console
+DEFAULT_INTERVAL = 1.0
+
+# Capacidade padrão do buffer circular
+DEFAULT_CAPACITY = 512
+
+# Buffer compartilhado: (tempo, nível, logger, formato, args)
+ring = deque(maxlen=DEFAULT_CAPACITY)
+
+# Contadores globais
+counters = {"emitted": 0, "printed": 0, "suppressed": 0}
+level_counts = {level: 0 for level in LEVEL_NAMES if level != OFF}
+
+# chave -> [impressas, suprimidas desde a última impressão, total suprimidas, última impressão, formato]
+message_counts = {}
+
+
+def parse_level(level):
+    """Aceita número ou nome ("DEBUG", "INFO", ...)"""
+    if isinstance(level, str):
+        return LEVELS.get(level.upper(), INFO)
+    return int(level)
+
+
+def format_message(msg, args):
+    """Formata no estilo % apenas quando necessário"""
+    if not args:
+        return msg
+    try:
+        return msg % args
+    except (TypeError, ValueError):
+        return f"{msg} {args}"
+
+
+class Logger:
+    """
+    Logger nomeado; o nível é conferido antes de qualquer formatação
+    """
+
+    def __init__(self, name, level=INFO, interval=DEFAULT_INTERVAL, echo=True):
+        self.name = name
+        self.interval = interval
+        self.echo = echo
+        self.set_level(level)
+
+    def set_level(self, level):
+        """Altera o nível e os atalhos *_enabled usados nos caminhos quentes"""
+        self.level = parse_level(level)
+        self.debug_enabled = self.level <= DEBUG
+        self.info_enabled = self.level <= INFO
+
+    def is_enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, msg, *args, key=None, every=None):
+        """
+        Registra a mensagem no buffer e a imprime respeitando o intervalo
+        `key`: identidade para o limite (padrão: o texto de formato)
+        `every`: intervalo mínimo em segundos (padrão: o do logger; 0 = sem limite)
+        """
+        if level < self.level:
+            return False
+
+        now = time.monotonic()
+        ring.append((now, level, self.name, msg, args))
+        counters["emitted"] += 1
+        level_counts[level] = level_counts.get(level, 0) + 1
+
+        if not self.echo:
+            return False
+
+        if key is None:
+            key = (self.name, msg)
+        interval = self.interval if every is None else every
+        entry = message_counts.get(key)
+        if entry is None:
+            entry = message_counts[key] = [0, 0, 0, None, msg]
+        elif entry[3] is not None and now - entry[3] < interval:
+            entry[1] += 1
+            entry[2] += 1
+            counters["suppressed"] += 1
+            return False
+
+        text = format_message(msg, args)
+        if entry[1]:
+            text = f"{text} (+{entry[1]} suprimidas)"
+        entry[0] += 1
+        entry[1] = 0
+        entry[3] = now
+        counters["printed"] += 1
+        print(f"[{LEVEL_NAMES.get(level, level)}] {self.name}: {text}")
+        return True
+
+    def debug(self, msg, *args, **kwargs):
+        if self.debug_enabled:
+            return self.log(DEBUG, msg, *args, **kwargs)
+        return False
+
+    def info(self, msg, *args, **kwargs):
+        if self.info_enabled:
+            return self.log(INFO, msg, *args, **kwargs)
+        return False
+
+    def warning(self, msg, *args, **kwargs):
+        return self.log(WARNING, msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        return self.log(ERROR, msg, *args, **kwargs)
+
+
+# Loggers por nome
+_loggers = {}
+
+
+def get_logger(name, level=None):
+    """
+    Retorna o logger `name`, criando-o no primeiro uso
+    """
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = Logger(name, INFO if level is None else level)
+        _loggers[name] = logger
+    elif level is not None:
+        logger.set_level(level)
+    return logger
+
+
+def set_level(level, name=None):
+    """Altera o nível de um logger ou de todos"""
+    loggers = _loggers.values() if name is None else [get_logger(name)]
+    for logger in loggers:
+        logger.set_level(level)
+
+
+def set_capacity(capacity):
+    """Redimensiona o buffer circular mantendo as mensagens mais recentes"""
+    global ring
+    ring = deque(ring, maxlen=max(1, int(capacity)))
+
+
+def dump(last=None, out=print):
+    """
+    Despeja o buffer (todas ou as `last` últimas mensagens) e os contadores
+    """
+    entries = list(ring)
+    if last is not None:
+        entries = entries[-last:]
+    start = entries[0][0] if entries else 0.0
+
+    out(f"=== LOG: {len(entries)} de {len(ring)} mensagens no buffer ===")
+    for stamp, level, name, msg, args in entries:
+        out(f"+{stamp - start:8.3f}s [{LEVEL_NAMES.get(level, level)}] {name}: {format_message(msg, args)}")
+
+    out(f"Emitidas: {counters['emitted']}  Impressas: {counters['printed']}  Suprimidas: {counters['suppressed']}")
+    noisy = sorted(message_counts.values(), key=lambda entry: entry[2], reverse=True)
+    for printed, pending, suppressed, last_time, msg in noisy[:10]:
+        if suppressed:
+            out(f"   {suppressed:6d} suprimidas / {printed} impressas: {msg}")
+
+
+def stats():
+    """Contadores globais e por nível"""
+    result = dict(counters)
+    result["buffered"] = len(ring)
+    result.update({LEVEL_NAMES[level].lower(): count for level, count in level_counts.items()})
+    return result
+
+
+def reset():
+    """Esvazia o buffer e zera todos os contadores"""
+    ring.clear()
+    message_counts.clear()
+    for name in counters:
+        counters[name] = 0
+    for level in level_counts:
+        level_counts[level] = 0
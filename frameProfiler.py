@@ -0,0 +1,235 @@
+"""
+Instrumentação opcional por frame (spans e contadores por sistema)
+
+Desligado por padrão: span() devolve um contexto nulo compartilhado e os
+métodos decorados com @profiled chamam o original direto. Ligado, cada span
+vira um evento "X" do formato Chrome trace (chrome://tracing / Perfetto),
+com uma linha por emissor ou pelo ClimaControl, e alimenta um resumo dos
+últimos frames para achar qual sistema ou mudança de clima causou um pico.
+
+    from frameProfiler import profiler
+    profiler.enable()
+    ...
+    profiler.print_summary()
+    profiler.export_chrome_trace(logic.expandPath("//trace.json"))
+"""
+import json
+import time
+from collections import deque
+from functools import wraps
+
+# Frames considerados no resumo
+DEFAULT_WINDOW = 120
+
+# Máximo de eventos guardados para exportação
+DEFAULT_CAPACITY = 200000
+
+
+class _NullSpan:
+    """Contexto que não faz nada (profiler desligado)"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "owner", "args", "started")
+
+    def __init__(self, profiler, name, owner, args):
+        self.profiler = profiler
+        self.name = name
+        self.owner = owner
+        self.args = args
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.end(self.name, self.owner, self.started, self.args)
+        return False
+
+
+class FrameProfiler:
+    """
+    Coleta spans (nome, dono, início, duração) e contadores por dono
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, capacity=DEFAULT_CAPACITY):
+        self.enabled = False
+        self.window = window
+        self.events = deque(maxlen=capacity)
+        # dono -> {contador: valor}
+        self.counters = {}
+        self.frame = 0
+        self.frame_starts = deque(maxlen=window + 1)
+        self.origin = time.perf_counter()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+        if enabled and not self.frame_starts:
+            self.frame_starts.append((self.frame, time.perf_counter()))
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Descarta eventos e contadores"""
+        self.events.clear()
+        self.counters.clear()
+        self.frame = 0
+        self.frame_starts.clear()
+        self.origin = time.perf_counter()
+        if self.enabled:
+            self.frame_starts.append((self.frame, self.origin))
+
+    def begin(self):
+        """Início de um span manual (use com end())"""
+        return time.perf_counter()
+
+    def end(self, name, owner, started, args=None):
+        """Registra um span iniciado em `started`"""
+        self.events.append((name, owner, started, time.perf_counter() - started, self.frame, args))
+
+    def span(self, name, owner="", **args):
+        """
+        Contexto que mede um trecho; nulo quando desligado
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, owner, args or None)
+
+    def count(self, owner, name, value=1):
+        """Soma `value` ao contador `name` do dono"""
+        counters = self.counters.get(owner)
+        if counters is None:
+            counters = self.counters[owner] = {}
+        counters[name] = counters.get(name, 0) + value
+
+    def next_frame(self):
+        """Marca o início de um novo frame (chamado pelo gerenciador)"""
+        self.frame += 1
+        self.frame_starts.append((self.frame, time.perf_counter()))
+
+    def summary(self, top=5):
+        """
+        Resumo dos últimos `window` frames:
+        por span (total, média por frame, pior caso e dono do pior caso)
+        e os `top` spans mais lentos individualmente
+        """
+        first_frame = self.frame - self.window + 1
+        frames = max(1, min(self.window, self.frame + 1))
+        spans = {}
+        slowest = []
+        for name, owner, started, duration, frame, args in reversed(self.events):
+            if frame < first_frame:
+                break
+            entry = spans.get(name)
+            if entry is None:
+                entry = spans[name] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "max_owner": owner}
+            ms = duration * 1000.0
+            entry["calls"] += 1
+            entry["total_ms"] += ms
+            if ms > entry["max_ms"]:
+                entry["max_ms"] = ms
+                entry["max_owner"] = owner
+            slowest.append((ms, name, owner, frame))
+
+        for entry in spans.values():
+            entry["ms_per_frame"] = entry["total_ms"] / frames
+
+        slowest.sort(reverse=True)
+        return {
+            "frames": frames,
+            "spans": spans,
+            "slowest": [{"ms": ms, "name": name, "owner": owner, "frame": frame}
+                        for ms, name, owner, frame in slowest[:top]],
+        }
+
+    def print_summary(self, top=5):
+        """Imprime o resumo dos últimos frames"""
+        summary = self.summary(top)
+        print(f"\n📈 PROFILER - últimos {summary['frames']} frames")
+        print(f"{'span':<24} {'chamadas':>9} {'ms/frame':>9} {'pior ms':>9}  pior dono")
+        for name, entry in sorted(summary["spans"].items(), key=lambda item: -item[1]["total_ms"]):
+            print(f"{name:<24} {entry['calls']:>9} {entry['ms_per_frame']:>9.3f} {entry['max_ms']:>9.3f}  {entry['max_owner']}")
+        if summary["slowest"]:
+            print("Spans mais lentos:")
+            for item in summary["slowest"]:
+                print(f"   {item['ms']:8.3f} ms  {item['name']} ({item['owner']}) frame {item['frame']}")
+
+    def chrome_trace(self):
+        """
+        Eventos no formato Chrome trace (dict pronto para json.dump)
+        Cada dono vira uma "thread" nomeada; os contadores acumulados de
+        cada dono saem como um evento de contador no fim do trace
+        """
+        owners = {}
+        trace = []
+        for name, owner, started, duration, frame, args in self.events:
+            tid = owners.get(owner)
+            if tid is None:
+                tid = owners[owner] = len(owners) + 1
+            event = {
+                "name": name,
+                "cat": "particulas",
+                "ph": "X",
+                "ts": (started - self.origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": 1,
+                "tid": tid,
+                "args": dict(args or {}, frame=frame),
+            }
+            trace.append(event)
+
+        for frame, started in self.frame_starts:
+            trace.append({"name": f"frame {frame}", "ph": "i", "s": "g", "pid": 1, "tid": 0,
+                          "ts": (started - self.origin) * 1e6})
+
+        for owner, tid in owners.items():
+            trace.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                          "args": {"name": owner or "global"}})
+        now = (time.perf_counter() - self.origin) * 1e6
+        for owner, counters in self.counters.items():
+            trace.append({"name": owner or "global", "ph": "C", "pid": 1, "ts": now,
+                          "args": counters})
+
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """
+        Grava o trace em JSON (abrir em chrome://tracing ou ui.perfetto.dev)
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+# Profiler compartilhado por todos os componentes do processo
+profiler = FrameProfiler()
+
+
+def profiled(name):
+    """
+    Decorador de método de componente: mede a chamada como span `name`,
+    usando o nome do objeto como dono. Desligado, chama o método direto
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not profiler.enabled:
+                return method(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                profiler.end(name, self.object.name, started)
+        return wrapper
+    return decorator
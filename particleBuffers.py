@@ -0,0 +1,322 @@
+"""
+Buffers de partículas com estado (CPU/NumPy)
+
+O geometry shader padrão não guarda estado: cada posição é recalculada a
+partir de `time + j * 0.1`. No modo com estado, posição, velocidade e idade
+ficam em arrays NumPy compactos com alocação em anel (a partícula nova
+ocupa o slot seguinte, sobrescrevendo a mais antiga se preciso), a
+integração e a colisão com plano ou heightfield são vetorizadas e o
+resultado vai para a GPU em uma textura RGBA32F (um texel por partícula,
+lida com texelFetch no geometry shader).
+
+Sem custo Python por partícula: cada frame são algumas operações de array
+sobre a capacidade inteira.
+"""
+import bgl
+import numpy as np
+
+# Texels por linha da textura de estado
+STATE_TEXTURE_WIDTH = 1024
+
+# Unidade de textura do sampler particle_state (0 a 6 são os slots do material)
+STATE_TEXTURE_UNIT = 7
+
+# Unidade da tabela aleatória (random_lut), quando usada
+RANDOM_TEXTURE_UNIT = 8
+
+# Maior passo de integração aceito (s); frames mais longos são truncados
+MAX_STEP = 0.1
+
+# Velocidade vertical abaixo da qual uma partícula que quica assenta
+SETTLE_SPEED = 0.05
+
+# Respostas à colisão com o chão
+COLLISION_RESPONSES = ("Morrer", "Parar", "Quicar")
+
+
+class Heightfield:
+    """
+    Altura do chão em uma grade regular no plano xy, amostrada bilinearmente
+    heights[linha, coluna] é a altura do nó origin + (coluna, linha) * cell_size
+    """
+
+    def __init__(self, heights, origin, cell_size):
+        self.heights = np.asarray(heights, dtype=np.float32)
+        self.origin = np.asarray(tuple(origin)[:2], dtype=np.float32)
+        self.cell_size = max(float(cell_size), 1e-6)
+
+    @classmethod
+    def from_points(cls, points, cell_size):
+        """
+        Grade a partir de pontos soltos (ex.: vértices do terreno): cada nó
+        fica com a maior altura dos pontos mais próximos dele
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 3)
+        origin = points[:, :2].min(axis=0)
+        nodes = np.rint((points[:, :2] - origin) / cell_size).astype(np.int64)
+        columns, rows = nodes.max(axis=0) + 1
+        heights = np.full((rows, columns), -np.inf, dtype=np.float32)
+        np.maximum.at(heights, (nodes[:, 1], nodes[:, 0]), points[:, 2])
+        # Nós sem ponto algum recebem a menor altura do terreno
+        heights[~np.isfinite(heights)] = points[:, 2].min()
+        return cls(heights, origin, cell_size)
+
+    def sample(self, x, y):
+        """Altura em (x, y); fora da grade vale a borda mais próxima"""
+        rows, columns = self.heights.shape
+        gx = np.clip((x - self.origin[0]) / self.cell_size, 0.0, columns - 1)
+        gy = np.clip((y - self.origin[1]) / self.cell_size, 0.0, rows - 1)
+        x0 = np.minimum(gx.astype(np.int64), max(columns - 2, 0))
+        y0 = np.minimum(gy.astype(np.int64), max(rows - 2, 0))
+        x1 = np.minimum(x0 + 1, columns - 1)
+        y1 = np.minimum(y0 + 1, rows - 1)
+        fx = np.clip(gx - x0, 0.0, 1.0)
+        fy = np.clip(gy - y0, 0.0, 1.0)
+        h = self.heights
+        bottom = h[y0, x0] + (h[y0, x1] - h[y0, x0]) * fx
+        top = h[y1, x0] + (h[y1, x1] - h[y1, x0]) * fx
+        return (bottom + (top - bottom) * fy).astype(np.float32)
+
+
+def heightfield_from_object(obj, cell_size=1.0):
+    """
+    Heightfield a partir dos vértices (em coordenadas de mundo) da malha de
+    um objeto do motor. Percorre a malha uma vez, na configuração
+    Retorna: Heightfield ou None se o objeto não tiver vértices
+    """
+    transform = np.asarray(obj.worldTransform, dtype=np.float32)
+    points = []
+    for mesh in obj.meshes:
+        for material in range(mesh.numMaterials):
+            for i in range(mesh.getVertexArrayLength(material)):
+                points.append(tuple(mesh.getVertex(material, i).XYZ))
+    if not points:
+        return None
+    points = np.asarray(points, dtype=np.float32)
+    world = points @ transform[:3, :3].T + transform[:3, 3]
+    return Heightfield.from_points(world, cell_size)
+
+
+class ParticleBuffers:
+    """
+    Estado de `capacity` partículas com alocação em anel
+    """
+
+    def __init__(self, capacity, seed=None):
+        self.capacity = max(1, int(capacity))
+        self.position = np.zeros((self.capacity, 3), dtype=np.float32)
+        self.velocity = np.zeros((self.capacity, 3), dtype=np.float32)
+        self.age = np.zeros(self.capacity, dtype=np.float32)
+        self.life = np.ones(self.capacity, dtype=np.float32)
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.settled = np.zeros(self.capacity, dtype=bool)
+        self.head = 0
+        # Fração de partícula acumulada entre frames (taxas baixas)
+        self.spawn_carry = 0.0
+        self.rng = np.random.default_rng(seed)
+        # Posições das colisões do último passo (respingos, marcas no chão)
+        self.last_hits = np.empty((0, 3), dtype=np.float32)
+
+        self.texture_width = min(self.capacity, STATE_TEXTURE_WIDTH)
+        self.texture_height = -(-self.capacity // self.texture_width)
+        self.packed = np.full((self.texture_width * self.texture_height, 4), -1.0, dtype=np.float32)
+
+        self.stats = {
+            "spawned": 0,
+            "expired": 0,
+            "collisions": 0,
+        }
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def clear(self):
+        """Libera todos os slots"""
+        self.alive[:] = False
+        self.settled[:] = False
+        self.spawn_carry = 0.0
+        self.last_hits = self.last_hits[:0]
+
+    def spawn(self, positions, velocities, life):
+        """
+        Ocupa os próximos slots do anel
+        Retorna: índices dos slots usados
+        """
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)[-self.capacity:]
+        count = len(positions)
+        if count == 0:
+            return np.empty(0, dtype=np.int64)
+        index = (self.head + np.arange(count)) % self.capacity
+        self.head = int((self.head + count) % self.capacity)
+
+        self.position[index] = positions
+        self.velocity[index] = np.broadcast_to(np.asarray(velocities, dtype=np.float32), (count, 3))
+        self.age[index] = 0.0
+        self.life[index] = life
+        self.alive[index] = True
+        self.settled[index] = False
+        self.stats["spawned"] += count
+        return index
+
+    def emit(self, rate, dt, center, area, velocity, life):
+        """
+        Cria rate * dt partículas espalhadas em center ± area
+        `dt` é limitado a MAX_STEP como no step(): uma pausa longa não vira
+        uma fila de criação para os frames seguintes
+        Retorna: número de partículas criadas
+        """
+        dt = min(max(dt, 0.0), MAX_STEP)
+        self.spawn_carry = min(self.spawn_carry + max(0.0, rate) * dt, float(self.capacity))
+        count = int(self.spawn_carry)
+        self.spawn_carry -= count
+        if count == 0:
+            return 0
+        offsets = self.rng.uniform(-1.0, 1.0, (count, 3)).astype(np.float32)
+        positions = np.asarray(center, dtype=np.float32) + offsets * np.asarray(area, dtype=np.float32)
+        self.spawn(positions, velocity, life)
+        return count
+
+    def step(self, dt, gravity=(0.0, 0.0, 0.0), drag=0.0, wind=None, wind_influence=1.0):
+        """
+        Integra velocidade e posição (Euler semi-implícito) e libera as
+        partículas que chegaram ao fim da vida
+        `wind`: WindField cuja velocidade do ar (x wind_influence) arrasta
+        as partículas, como o deslocamento de vento do shader sem estado
+        Retorna: número de partículas expiradas
+        """
+        dt = np.float32(min(max(dt, 0.0), MAX_STEP))
+        moving = self.alive & ~self.settled
+        if drag > 0.0:
+            self.velocity[moving] *= np.float32(max(0.0, 1.0 - drag * dt))
+        self.velocity[moving] += np.asarray(gravity, dtype=np.float32) * dt
+        if wind is not None and wind_influence:
+            drift = wind.sample(self.position[moving]) * np.float32(wind_influence)
+            self.position[moving] += (self.velocity[moving] + drift) * dt
+        else:
+            self.position[moving] += self.velocity[moving] * dt
+
+        self.age[self.alive] += dt
+        expired = self.alive & (self.age >= self.life)
+        count = int(np.count_nonzero(expired))
+        if count:
+            self.alive[expired] = False
+            self.stats["expired"] += count
+        return count
+
+    def collide(self, ground, response="Morrer", bounce=0.3):
+        """
+        Colisão com o chão: `ground` é a altura de um plano horizontal ou
+        um Heightfield. Respostas: "Morrer" (chuva), "Parar" (neve que
+        assenta) ou "Quicar" (velocidade vertical refletida por `bounce`)
+        Retorna: número de colisões
+        """
+        moving = self.alive & ~self.settled
+        if isinstance(ground, Heightfield):
+            floor = ground.sample(self.position[:, 0], self.position[:, 1])
+        else:
+            floor = np.float32(ground)
+        hit = moving & (self.position[:, 2] < floor)
+        count = int(np.count_nonzero(hit))
+        if not count:
+            self.last_hits = self.last_hits[:0]
+            return 0
+
+        self.position[hit, 2] = floor[hit] if np.ndim(floor) else floor
+        self.last_hits = self.position[hit]
+        self.stats["collisions"] += count
+
+        if response == "Morrer":
+            self.alive[hit] = False
+        elif response == "Parar":
+            self.velocity[hit] = 0.0
+            self.settled[hit] = True
+        else:
+            self.velocity[hit, 2] *= -np.float32(bounce)
+            resting = hit & (np.abs(self.velocity[:, 2]) < SETTLE_SPEED)
+            self.velocity[resting] = 0.0
+            self.settled[resting] = True
+        return count
+
+    def wrap(self, center, size):
+        """
+        Volume que acompanha a câmera: posições das partículas em movimento
+        tomadas módulo a caixa `size` centrada em `center` (as assentadas
+        ficam onde pousaram até expirar)
+        """
+        size = np.asarray(size, dtype=np.float32)
+        corner = np.asarray(center, dtype=np.float32) - size * np.float32(0.5)
+        moving = self.alive & ~self.settled
+        self.position[moving] = corner + np.mod(self.position[moving] - corner, size)
+
+    def pack(self, to_local=None):
+        """
+        Estado no formato da textura: xyz = posição (no espaço do objeto se
+        `to_local` for a matriz 4x4 mundo -> objeto), w = progresso da vida,
+        ou -1 nos slots livres
+        Retorna: array float32 (largura * altura, 4) reutilizado entre frames
+        """
+        packed = self.packed
+        capacity = self.capacity
+        if to_local is None:
+            packed[:capacity, :3] = self.position
+        else:
+            matrix = np.asarray(to_local, dtype=np.float32)
+            np.matmul(self.position, matrix[:3, :3].T, out=packed[:capacity, :3])
+            packed[:capacity, :3] += matrix[:3, 3]
+        packed[:capacity, 3] = np.where(self.alive, np.minimum(self.age / self.life, 1.0), -1.0)
+        return packed
+
+
+def _buffer_view(buffer):
+    """View NumPy sobre um bgl.Buffer (None se não suportar o protocolo de buffer)"""
+    try:
+        return np.frombuffer(buffer, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+
+
+class StateTexture:
+    """
+    Textura RGBA32F com um texel por partícula, atualizada a cada frame
+    """
+
+    def __init__(self, width, height, unit=STATE_TEXTURE_UNIT):
+        self.width = width
+        self.height = height
+        self.unit = unit
+        ids = bgl.Buffer(bgl.GL_INT, 1)
+        bgl.glGenTextures(1, ids)
+        self.texture = ids[0]
+        self.buffer = bgl.Buffer(bgl.GL_FLOAT, width * height * 4)
+        self.view = _buffer_view(self.buffer)
+        self.uploads = 0
+
+        self.bind()
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_NEAREST)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_NEAREST)
+        bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA32F, width, height, 0,
+                         bgl.GL_RGBA, bgl.GL_FLOAT, self.buffer)
+        bgl.glActiveTexture(bgl.GL_TEXTURE0)
+
+    def bind(self):
+        """Deixa a textura ligada na unidade do sampler particle_state"""
+        bgl.glActiveTexture(bgl.GL_TEXTURE0 + self.unit)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.texture)
+
+    def upload(self, packed):
+        """Copia o estado empacotado para a GPU (uma chamada glTexSubImage2D)"""
+        if self.view is not None:
+            self.view[:] = packed.reshape(-1)
+        else:
+            self.buffer[:] = packed.reshape(-1).tolist()
+        self.bind()
+        bgl.glTexSubImage2D(bgl.GL_TEXTURE_2D, 0, 0, 0, self.width, self.height,
+                            bgl.GL_RGBA, bgl.GL_FLOAT, self.buffer)
+        bgl.glActiveTexture(bgl.GL_TEXTURE0)
+        self.uploads += 1
+
+    def free(self):
+        """Apaga a textura da GPU"""
+        if self.texture is not None:
+            bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [self.texture]))
+            self.texture = None
@@ -0,0 +1,203 @@
+"""
+Gerenciador de partículas por cena
+
+Todos os AdvancedParticleSystem de uma cena se registram aqui. Um dos
+sistemas (o "condutor") dispara `tick()` no seu update(), que lê o tempo do
+frame uma única vez e percorre registros compactos de todos os sistemas; o
+update() dos demais apenas conta a chamada e retorna. Se o condutor sair da
+cena sem dispose(), o próximo sistema a notar a falta de ticks assume.
+
+O trabalho urgente (compilação pendente, culling, LOD e uniforms) roda para
+todos os sistemas. O trabalho não urgente (agendamento de áudio e saída de
+debug) é distribuído entre frames dentro de um orçamento em milissegundos.
+O governador de qualidade (desligado por padrão) roda no início do tick.
+"""
+from Range import *
+from collections import deque
+import time
+
+from frameProfiler import profiler
+from qualityGovernor import QualityGovernor
+
+# Orçamento padrão por frame para trabalho não urgente
+DEFAULT_BUDGET_MS = 0.5
+
+# Intervalo (em ticks) da verificação de objetos removidos da cena
+CLEANUP_INTERVAL = 60
+
+
+class SystemRecord:
+    """
+    Registro compacto de um sistema (métodos já resolvidos)
+    """
+    __slots__ = ("system", "update_frame", "update_audio")
+
+    def __init__(self, system):
+        self.system = system
+        self.update_frame = system.update_frame
+        self.update_audio = system.update_audio_system
+
+
+class ParticleManager:
+    """
+    Atualiza todos os sistemas de partículas de uma cena uma vez por frame
+    """
+
+    def __init__(self, scene=None, budget_ms=DEFAULT_BUDGET_MS):
+        self.scene = scene
+        self.budget_ms = budget_ms
+        self.records = []
+        self.registered = set()
+        self.driver = None
+        self.idle_calls = 0
+        self.idle_limit = 0
+        self.deferred = deque()
+        self.with_audio = []
+        self.last_frame_time = None
+        self.audio_cursor = 0
+        self.governor = QualityGovernor()
+        self.stats = {
+            "ticks": 0,
+            "systems_updated": 0,
+            "audio_updates": 0,
+            "audio_postponed": 0,
+            "deferred_run": 0,
+            "budget_overruns": 0,
+        }
+
+    def register(self, system):
+        """Adiciona um sistema (ignora se já registrado)"""
+        if id(system) in self.registered:
+            return
+        self.registered.add(id(system))
+        self.records.append(SystemRecord(system))
+        self.idle_limit = 2 * len(self.records)
+        self.governor.invalidate()
+        if self.driver is None:
+            self.driver = system
+
+    def unregister(self, system):
+        """Remove um sistema do gerenciador"""
+        self.set_records([record for record in self.records if record.system is not system])
+
+    def set_records(self, records):
+        """Substitui a lista de registros mantendo índice e condutor coerentes"""
+        self.records = records
+        self.registered = {id(record.system) for record in records}
+        self.idle_limit = 2 * len(records)
+        self.governor.invalidate()
+        if self.driver is not None and id(self.driver) not in self.registered:
+            self.driver = records[0].system if records else None
+
+    def defer(self, task):
+        """
+        Agenda trabalho não urgente (callable sem argumentos) para os
+        próximos frames, executado dentro do orçamento
+        """
+        self.deferred.append(task)
+
+    def set_budget(self, budget_ms):
+        """Altera o orçamento por frame (ms) para trabalho não urgente"""
+        self.budget_ms = max(0.0, budget_ms)
+
+    def request_tick(self, system):
+        """
+        Chamado pelo update() de cada sistema; apenas o condutor executa o tick
+        """
+        if system is self.driver:
+            self.tick()
+            return
+
+        # Sem ticks por mais de dois frames de chamadas: o condutor sumiu
+        self.idle_calls += 1
+        if self.idle_calls > self.idle_limit:
+            self.driver = system
+            self.tick()
+
+    def tick(self, frame_time=None):
+        """
+        Atualiza todos os sistemas registrados para o frame atual
+        """
+        if frame_time is None:
+            frame_time = logic.getFrameTime()
+        profiling = profiler.enabled
+        if profiling:
+            profiler.next_frame()
+            started = profiler.begin()
+        self.last_frame_time = frame_time
+        self.idle_calls = 0
+        self.stats["ticks"] += 1
+
+        # Remove periodicamente objetos que saíram da cena sem dispose()
+        if self.stats["ticks"] % CLEANUP_INTERVAL == 0:
+            self.set_records([record for record in self.records if not record.system.object.invalid])
+
+        # Qualidade adaptativa: ajusta as escalas antes de enviar os uniforms
+        self.governor.update(self.records, frame_time)
+
+        # Trabalho urgente: todos os sistemas ativos, todo frame
+        with_audio = self.with_audio
+        with_audio.clear()
+        updated = 0
+        for record in self.records:
+            system = record.system
+            if system.active and record.update_frame(frame_time):
+                updated += 1
+                if system.audio_initialized:
+                    with_audio.append(record)
+        self.stats["systems_updated"] += updated
+
+        self.run_budgeted(with_audio, frame_time)
+
+        if profiling:
+            profiler.end("tick", "ParticleManager", started, {"systems": updated})
+
+    def run_budgeted(self, with_audio, frame_time):
+        """
+        Trabalho não urgente dentro do orçamento: áudio em rodízio e tarefas
+        adiadas. Sempre executa ao menos um item para não travar a fila
+        """
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        done = 0
+
+        count = len(with_audio)
+        if count:
+            start = self.audio_cursor % count
+            for i in range(count):
+                if done and time.perf_counter() >= deadline:
+                    self.stats["audio_postponed"] += count - i
+                    self.stats["budget_overruns"] += 1
+                    self.audio_cursor = start + i
+                    return
+                with_audio[(start + i) % count].update_audio(frame_time)
+                self.stats["audio_updates"] += 1
+                done += 1
+            self.audio_cursor = start
+
+        while self.deferred:
+            if done and time.perf_counter() >= deadline:
+                self.stats["budget_overruns"] += 1
+                return
+            self.deferred.popleft()()
+            self.stats["deferred_run"] += 1
+            done += 1
+
+
+# Um gerenciador por cena: id(cena) -> ParticleManager
+_managers = {}
+
+
+def get_manager(scene):
+    """
+    Retorna o gerenciador da cena, criando-o no primeiro uso
+    """
+    manager = _managers.get(id(scene))
+    if manager is None or manager.scene is not scene:
+        manager = ParticleManager(scene)
+        _managers[id(scene)] = manager
+    return manager
+
+
+def remove_manager(scene):
+    """Descarta o gerenciador de uma cena (ex.: ao trocar de cena)"""
+    _managers.pop(id(scene), None)
@@ -0,0 +1,420 @@
+"""
+Simulador de referência (NumPy) do geometry shader do AdvancedParticleSystem
+
+Reproduz, para todas as partículas de uma vez, o que o shader `geometry`
+calcula em um instante `time`: life_progress, fade, cor em três etapas,
+dispersão via particleNoise (seno, hash ou tabela), movimento e os vértices finais (com billboard).
+Não depende do Range, bgl ou aud - roda em máquinas de build sem GPU.
+"""
+import numpy as np
+
+from randomSource import RANDOM_SOURCES, DEFAULT_LUT_SIZE, hash_rand, generate_lut, lut_rand
+
+# Mapeamentos dos args do tipo conjunto para os valores usados no shader
+# (importados pelo AdvancedParticleSystem no compile_shader)
+BILLBOARD_MODES = {"Nenhum": 0, "2D": 1, "3D": 2}
+EMISSION_MODES = {"World": 0, "Camera": 1, "Hybrid": 2, "Volume": 3}
+
+# Orçamento padrão de leituras de depth por sistema no modo Hybrid
+DEFAULT_HYBRID_SAMPLES = 256
+
+# Triângulo base usado quando a geometria real não é informada
+DEFAULT_TRIANGLE = np.array([
+    [-0.5, -0.5, 0.0],
+    [0.5, -0.5, 0.0],
+    [0.0, 0.5, 0.0],
+], dtype=np.float32)
+
+
+def _vec3(value):
+    """Converte Vector/tupla/lista em array float32 de 3 componentes"""
+    return np.asarray(tuple(value)[:3], dtype=np.float32)
+
+
+def shader_constants(args):
+    """
+    Converte os args do componente nas constantes que o compile_shader embute no GLSL
+    Retorna: dict com os valores já no tipo usado pelo shader
+    """
+    grid = args.get("flipbook_grid", (4, 4, 0))
+    flipbook_grid = (max(1, int(grid[0])), max(1, int(grid[1])))
+    return {
+        "amount": int(args["amount"]),
+        "life": np.float32(args["life"]),
+        "scale_start": np.float32(args["scale_start"]),
+        "scale_end": np.float32(args["scale_end"]),
+        "movement_speed": np.float32(args["movement_speed"]),
+        "fade_in": np.float32(args["fade_in"]),
+        "fade_out": np.float32(args["fade_out"]),
+        "base_direction": _vec3(args["base_direction"]),
+        "rotate_movement": 1 if args["rotate_movement"] else 0,
+        "billboard_mode": BILLBOARD_MODES.get(args["billboard_mode"], 0),
+        "emission_mode": EMISSION_MODES.get(args["emission_mode"], 0),
+        "dispersion_area": _vec3(args["dispersion_area"]),
+        "start_color": _vec3(args["start_color"]),
+        "mid_color": _vec3(args["mid_color"]),
+        "end_color": _vec3(args["end_color"]),
+        "world_emission_center": _vec3(args["world_emission_center"]),
+        "hybrid_samples": int(args.get("hybrid_samples", DEFAULT_HYBRID_SAMPLES)),
+        "flipbook": args.get("texture_mode", "Sequência") == "Flipbook",
+        "flipbook_grid": flipbook_grid,
+        "flipbook_frames": max(1, min(int(args.get("flipbook_frames", 0)) or flipbook_grid[0] * flipbook_grid[1],
+                                      flipbook_grid[0] * flipbook_grid[1])),
+        "flipbook_fps": np.float32(args.get("flipbook_fps", 0.0)),
+        "wind_influence": np.float32(args.get("wind_influence", 1.0)),
+        "volume_size": np.maximum(np.abs(_vec3(args.get("volume_size", (30.0, 30.0, 20.0)))), np.float32(0.01)),
+        "volume_fade": np.float32(args.get("volume_fade", 0.15)),
+        "random_source": RANDOM_SOURCES.get(args.get("random_source", "Seno"), 0),
+        "random_seed": int(args.get("random_seed", 1)),
+    }
+
+
+def compute_hybrid_grid(samples, width, height):
+    """
+    Grade de amostragem do modo Hybrid com no máximo `samples` células,
+    seguindo a proporção da tela para que as células fiquem quadradas
+    Retorna: (colunas, linhas)
+    """
+    samples = max(int(samples), 1)
+    aspect = max(float(width), 1.0) / max(float(height), 1.0)
+    columns = max(1, min(samples, int(round((samples * aspect) ** 0.5))))
+    rows = max(1, samples // columns)
+    return columns, rows
+
+
+def flipbook_rects(grid, frames):
+    """
+    Retângulos uv (u, v, largura, altura) dos quadros da grade, como o
+    flipbookRect do shader sem atlas
+    Retorna: array (frames, 4)
+    """
+    columns, rows = grid
+    index = np.arange(frames)
+    size = np.array([1.0 / columns, 1.0 / rows], dtype=np.float32)
+    corner = np.stack([index % columns, rows - 1 - index // columns], axis=1) * size
+    return np.concatenate([corner, np.broadcast_to(size, (frames, 2))], axis=1).astype(np.float32)
+
+
+def get_rand(x, y):
+    """
+    Equivalente vetorizado de getRand(vec2) do shader
+    fract(sin(dot(coord, vec2(12.9898, 78.233))) * 43758.5453)
+    """
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    dot = x * np.float32(12.9898) + y * np.float32(78.233)
+    value = np.sin(dot) * np.float32(43758.5453)
+    return (value - np.floor(value)).astype(np.float32)
+
+
+# Tabelas já sorteadas: (semente, lado) -> array
+_luts = {}
+
+
+def particle_noise(amount, source=0, seed=1):
+    """
+    Equivalente vetorizado de particleNoise(j) do shader para j em 0..amount-1
+    source: 0 = seno (getRand), 1 = hash PCG, 2 = tabela sorteada
+    Retorna: array float32 (amount, 3)
+    """
+    index = np.arange(amount)
+    if source == RANDOM_SOURCES["Hash"]:
+        return np.stack([hash_rand(index, stream) for stream in range(3)], axis=1)
+    if source == RANDOM_SOURCES["Tabela"]:
+        lut = _luts.get((seed, DEFAULT_LUT_SIZE))
+        if lut is None:
+            lut = _luts[(seed, DEFAULT_LUT_SIZE)] = generate_lut(seed, DEFAULT_LUT_SIZE)
+        return np.stack([lut_rand(lut, index, stream) for stream in range(3)], axis=1)
+    j = index.astype(np.float32)
+    return np.stack([get_rand(j, 0.5), get_rand(j, 1.3), get_rand(j, 2.7)], axis=1)
+
+
+def _normalize(v):
+    """Normaliza vetores (..., 3) como o normalize() do GLSL"""
+    length = np.linalg.norm(v, axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (v / length).astype(np.float32)
+
+
+def _smoothstep(edge0, edge1, x):
+    """smoothstep() do GLSL"""
+    t = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+
+def _mix(a, b, t):
+    """mix() do GLSL para cores (N, 3) com fator (N,)"""
+    return a + (b - a) * t[:, None]
+
+
+def _sample_depth(depth, uv, screen_size=None):
+    """
+    Leitura de um texel do depth buffer (H, W) em coordenadas uv (N, 2),
+    como o texelFetch do shader em ivec2(uv * screen_size)
+    """
+    height, width = depth.shape
+    sx, sy = screen_size if screen_size is not None else (width, height)
+    px = np.clip((uv[:, 0] * np.float32(sx)).astype(np.int64), 0, int(sx) - 1)
+    py = np.clip((uv[:, 1] * np.float32(sy)).astype(np.int64), 0, int(sy) - 1)
+    return depth[np.minimum(py, height - 1), np.minimum(px, width - 1)].astype(np.float32)
+
+
+def simulate(args, time, ref_pos=(0.0, 0.0, 0.0), use_tracking=False,
+             emission_mode=None, triangle=None, modelview=None,
+             projection=None, depth=None, screen_size=None, intensity=1.0,
+             atlas_rects=None, wind=(0.0, 0.0, 0.0), wind_turbulence=0.0):
+    """
+    Calcula as saídas do geometry shader para todas as partículas
+
+    args: mesmos args do AdvancedParticleSystem
+    time: valor do uniform `time` (logic.getFrameTime())
+    ref_pos: posição do objeto de referência (uniform vec3 ref_pos)
+    use_tracking: valor do uniform use_tracking
+    emission_mode: sobrescreve o modo derivado dos args (0 a 3)
+    triangle: vértices (3, 3) do triângulo base; padrão DEFAULT_TRIANGLE
+    modelview/projection: matrizes 4x4 (linha-maior) para billboard e clip space
+    depth/screen_size: depth buffer (H, W) e tamanho da tela para o modo Hybrid
+                       (que também exige modelview e projection)
+    intensity: uniform intensity; apenas as primeiras ceil(amount * intensity)
+               partículas são emitidas (máscara "active")
+    atlas_rects: retângulos uv do atlas (metadados do atlasBuilder); sem eles
+                 o Flipbook usa a grade flipbook_grid
+    wind/wind_turbulence: uniforms wind_vector e wind_turbulence do windField
+
+    Retorna: dict de arrays com uma linha por partícula; no modo Flipbook
+    também "frame_index", "next_frame", "frame_rect", "next_rect" e
+    "frame_blend"; no modo Hybrid
+    também "surface" (célula com superfície) e "depth_fetches" (leituras
+    de depth que as partículas ativas fazem)
+    """
+    c = shader_constants(args)
+    amount = c["amount"]
+    life = c["life"]
+    if emission_mode is None:
+        emission_mode = c["emission_mode"]
+
+    j = np.arange(amount, dtype=np.float32)
+    ref = _vec3(ref_pos)
+    time = np.float32(time)
+
+    # Progresso da vida e fade
+    life_progress = np.mod(time + j * np.float32(0.1), life) / life
+    fade = np.float32(1.0) - (life_progress / life)
+
+    # Ruídos usados na dispersão (mesma fonte do particleNoise do shader)
+    noise = particle_noise(amount, c["random_source"], c["random_seed"])
+
+    # Cor em três etapas (início -> meio -> fim)
+    first_half = life_progress < 0.5
+    color = np.where(
+        first_half[:, None],
+        _mix(c["start_color"], c["mid_color"], life_progress * 2.0),
+        _mix(c["mid_color"], c["end_color"], (life_progress - 0.5) * 2.0),
+    ).astype(np.float32)
+
+    # Posicionamento base conforme o modo de emissão
+    if emission_mode == 0:
+        base_position = np.broadcast_to(c["world_emission_center"], (amount, 3))
+    elif emission_mode == 1:
+        base_position = np.broadcast_to(ref, (amount, 3))
+    elif emission_mode == 2:
+        if depth is None or projection is None:
+            raise ValueError("Modo Hybrid precisa de depth buffer e matriz de projeção")
+        depth = np.asarray(depth, dtype=np.float32)
+        if screen_size is None:
+            screen_size = (depth.shape[1], depth.shape[0])
+        sx, sy = float(screen_size[0]), float(screen_size[1])
+
+        # Células da grade: partículas consecutivas compartilham a célula
+        columns, rows = compute_hybrid_grid(c["hybrid_samples"], sx, sy)
+        cells = columns * rows
+        per_cell = max(1, -(-amount // cells))
+        cell = (np.arange(amount) // per_cell) % cells
+        uv = np.stack([
+            (cell % columns + 0.5) / columns,
+            (cell // columns + 0.5) / rows,
+        ], axis=1).astype(np.float32)
+
+        # Um texel do depth (nível 0) no centro de cada célula, como o texelFetch
+        d = _sample_depth(depth, uv, (sx, sy))
+        surface = d < 1.0
+
+        # Reconstrução pela inversa da view-projection (espaço do objeto)
+        inverse = np.linalg.inv(np.asarray(projection, dtype=np.float64) @ _matrix(modelview).astype(np.float64))
+        ndc = np.concatenate([uv * 2.0 - 1.0, (d * 2.0 - 1.0)[:, None], np.ones((amount, 1))], axis=1)
+        position = ndc @ inverse.T
+        base_position = (position[:, :3] / position[:, 3:4]).astype(np.float32)
+    else:
+        base_position = np.zeros((amount, 3), dtype=np.float32)
+
+    # Movimento e dispersão
+    movement = c["base_direction"] * c["movement_speed"] * life_progress[:, None]
+    dispersion = (noise * 2.0 - 1.0) * c["dispersion_area"]
+    if emission_mode == 3:
+        # Volume: distribuição uniforme em uma caixa (o módulo faz o resto)
+        dispersion = noise * c["volume_size"]
+
+    # Vento: deriva pela idade e oscilação por partícula
+    influence = c["wind_influence"]
+    age = life_progress * life
+    wind_offset = _vec3(wind) * (influence * age)[:, None]
+    sway = np.float32(wind_turbulence) * influence
+    wind_offset[:, 0] += sway * np.sin(time * np.float32(1.7) + noise[:, 0] * np.float32(6.2831853))
+    wind_offset[:, 1] += sway * np.cos(time * np.float32(1.3) + noise[:, 1] * np.float32(6.2831853))
+
+    position = (base_position + movement + dispersion + wind_offset).astype(np.float32)
+
+    # Reinício no fim da vida
+    ended = life_progress >= 1.0
+    if np.any(ended):
+        if emission_mode == 0:
+            position[ended] = c["world_emission_center"]
+        elif emission_mode == 1:
+            position[ended] = ref
+
+    if emission_mode == 3:
+        # Módulo a caixa centrada na referência e fade nas bordas
+        size = c["volume_size"]
+        corner = ref - np.float32(0.5) * size
+        position = (corner + np.mod(position - corner, size)).astype(np.float32)
+        border = (np.abs(position - ref) / (np.float32(0.5) * size)).max(axis=1)
+        fade = fade * (np.float32(1.0) - _smoothstep(np.float32(1.0) - c["volume_fade"], np.float32(1.0), border))
+
+    vertices = _emit_vertices(c, position, life_progress, ref, use_tracking,
+                              triangle, modelview)
+
+    active_amount = int(np.ceil(np.float32(amount) * np.float32(min(max(intensity, 0.0), 1.0))))
+
+    active = np.arange(amount) < active_amount
+
+    if emission_mode == 2:
+        # Céu não emite; cada célula distinta custa uma leitura de depth
+        active &= surface
+        fetched = cell[:active_amount]
+        extra = {
+            "surface": surface,
+            "depth_fetches": int(np.count_nonzero(np.diff(fetched)) + 1) if len(fetched) else 0,
+        }
+    else:
+        extra = {}
+
+    result = {
+        "active": active,
+        "life_progress": life_progress.astype(np.float32),
+        "fade": fade.astype(np.float32),
+        "color": color,
+        "noise": noise,
+        "position": position,
+        "vertices": vertices,
+    }
+    result.update(extra)
+
+    if c["flipbook"]:
+        # Mesmo cálculo do geometry shader (uma vez por partícula)
+        if atlas_rects is not None:
+            rects = np.asarray(atlas_rects, dtype=np.float32)
+            frames = int(args.get("flipbook_frames", 0)) or len(rects)
+            frames = max(1, min(frames, len(rects)))
+        else:
+            frames = c["flipbook_frames"]
+            rects = flipbook_rects(c["flipbook_grid"], frames)
+        frames = np.float32(frames)
+        if c["flipbook_fps"] > 0:
+            frame_position = (time + j * np.float32(0.1)) * c["flipbook_fps"]
+        else:
+            frame_position = life_progress * frames
+        frame_index = np.mod(np.floor(frame_position), frames)
+        if c["flipbook_fps"] > 0:
+            next_frame = np.mod(frame_index + 1, frames)
+        else:
+            next_frame = np.minimum(frame_index + 1, frames - 1)
+        result["frame_index"] = frame_index.astype(np.int64)
+        result["next_frame"] = next_frame.astype(np.int64)
+        result["frame_rect"] = rects[result["frame_index"]]
+        result["next_rect"] = rects[result["next_frame"]]
+        result["frame_blend"] = (frame_position - np.floor(frame_position)).astype(np.float32)
+
+    if projection is not None:
+        mvp = np.asarray(projection, dtype=np.float32) @ _matrix(modelview)
+        homogeneous = np.concatenate(
+            [vertices, np.ones(vertices.shape[:2] + (1,), dtype=np.float32)], axis=2)
+        result["clip"] = homogeneous @ mvp.T
+
+    return result
+
+
+def _matrix(matrix):
+    """Matriz 4x4 float32 (identidade quando None)"""
+    if matrix is None:
+        return np.identity(4, dtype=np.float32)
+    return np.asarray(matrix, dtype=np.float32)
+
+
+def _emit_vertices(c, position, life_progress, ref, use_tracking, triangle, modelview):
+    """
+    Gera os três vértices (espaço do objeto) de cada partícula, seguindo
+    os ramos de billboard/rotação do shader
+    Retorna: array (amount, 3, 3)
+    """
+    tri = DEFAULT_TRIANGLE if triangle is None else np.asarray(triangle, dtype=np.float32)
+    scale = c["scale_start"] + (c["scale_end"] - c["scale_start"]) * life_progress
+    offsets = tri[None, :, :2] * scale[:, None, None]
+
+    if use_tracking and c["rotate_movement"] == 1:
+        mode = c["billboard_mode"]
+        if mode == 1:
+            # Billboard 2D - eixos da câmera extraídos da modelview
+            mv = _matrix(modelview)
+            right, up = mv[0, :3], mv[1, :3]
+            return (position[:, None, :]
+                    + right * offsets[..., 0:1]
+                    + up * offsets[..., 1:2]).astype(np.float32)
+        if mode == 2:
+            # Billboard 3D - olha para o objeto alvo
+            to_target = _normalize(ref - position)
+            up_axis = np.array([0.0, 0.0, 1.0], dtype=np.float32)
+            right = _normalize(np.cross(up_axis, to_target))
+            real_up = _normalize(np.cross(to_target, right))
+            return (position[:, None, :]
+                    + right[:, None, :] * offsets[..., 0:1]
+                    + real_up[:, None, :] * offsets[..., 1:2]).astype(np.float32)
+
+        # Rotação tradicional em torno de Z voltada ao alvo
+        to_target = ref - position
+        distance = np.linalg.norm(to_target, axis=1)
+        direction = _normalize(to_target)
+        angle = np.where(distance > 0.1, np.arctan2(direction[:, 0], direction[:, 1]), 0.0)
+        cos_a, sin_a = np.cos(angle)[:, None], np.sin(angle)[:, None]
+        x, y = offsets[..., 0], offsets[..., 1]
+        rotated = np.stack([cos_a * x + sin_a * y, -sin_a * x + cos_a * y], axis=2)
+        vertices = np.concatenate([rotated, np.broadcast_to(tri[None, :, 2:], rotated.shape[:2] + (1,))], axis=2)
+        return (vertices + position[:, None, :]).astype(np.float32)
+
+    # Comportamento normal - apenas escala e translação
+    vertices = np.broadcast_to(tri, (len(position), 3, 3)).copy()
+    vertices[..., :2] = offsets
+    return (vertices + position[:, None, :]).astype(np.float32)
+
+
+if __name__ == "__main__":
+    import sys
+    import time as _time
+
+    # Uso: python particleSimulator.py [amount] [time]
+    amount = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    at = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    demo_args = {
+        "amount": amount, "life": 5.0, "scale_start": 0.1, "scale_end": 0.3,
+        "movement_speed": 1.0, "fade_in": 0.2, "fade_out": 0.3,
+        "base_direction": (0, 1, 0), "rotate_movement": False,
+        "billboard_mode": "Nenhum", "emission_mode": "World",
+        "dispersion_area": (2.0, 2.0, 1.0), "start_color": (1, 0.5, 0.2),
+        "mid_color": (1, 0.8, 0.1), "end_color": (1, 0, 0),
+        "world_emission_center": (0, 0, 0),
+    }
+    start = _time.perf_counter()
+    out = simulate(demo_args, at)
+    elapsed = (_time.perf_counter() - start) * 1000.0
+    print(f"{amount} partículas em t={at}: {elapsed:.2f} ms")
+    print(f"life_progress médio: {out['life_progress'].mean():.3f}")
+    print(f"Caixa: {out['vertices'].reshape(-1, 3).min(axis=0)} -> {out['vertices'].reshape(-1, 3).max(axis=0)}")
@@ -0,0 +1,166 @@
+"""
+Governador de qualidade adaptativo pelo tempo de frame
+
+Lê a taxa média de frames do motor a cada tick do ParticleManager e ajusta
+um nível global de qualidade (0..1) para manter o tempo de frame alvo. O
+nível só desce acima da faixa superior (histerese), com um intervalo mínimo
+entre ajustes. Sobe na hora abaixo da faixa inferior e, como com vsync ou
+limite de fps a taxa nunca passa do alvo, também depois de um período
+contínuo dentro do orçamento; a subida é mais lenta que a descida para não
+oscilar.
+
+O nível vira uma escala por sistema em cascata de prioridade: o grupo de
+menor prioridade (ex.: chuva) é reduzido até o seu mínimo antes que o
+próximo grupo (ex.: folhas) comece a perder partículas. A escala multiplica
+a intensidade do sistema, então nada é recompilado.
+
+    governor = get_manager(scene).governor
+    governor.enable(target_fps=60.0)
+"""
+from Range import *
+
+from debugLog import get_logger
+
+log = get_logger("qualidade")
+
+# Taxa de frames alvo padrão
+DEFAULT_TARGET_FPS = 60.0
+
+# Faixa de histerese em torno do tempo de frame alvo (fração)
+DEFAULT_UPPER_BAND = 0.10   # acima de alvo * 1.10: reduz
+DEFAULT_LOWER_BAND = 0.15   # abaixo de alvo * 0.85: recupera
+
+# Passos do nível por ajuste (descida rápida, subida lenta)
+DEFAULT_STEP_DOWN = 0.10
+DEFAULT_STEP_UP = 0.02
+
+# Intervalo mínimo (s de jogo) entre dois ajustes; a média do motor
+# precisa desse tempo para refletir o ajuste anterior
+DEFAULT_COOLDOWN = 0.25
+
+# Recuperação dentro do orçamento: pressão até 1 + tolerância mantida por
+# este tempo (s de jogo) sobe um passo (jogos limitados ao alvo por vsync)
+DEFAULT_RECOVERY_TOLERANCE = 0.02
+DEFAULT_RECOVERY_HOLD = 1.0
+
+
+class QualityGovernor:
+    """
+    Nível global de qualidade com histerese, distribuído por prioridade
+    """
+
+    def __init__(self, target_fps=DEFAULT_TARGET_FPS, upper_band=DEFAULT_UPPER_BAND,
+                 lower_band=DEFAULT_LOWER_BAND, step_down=DEFAULT_STEP_DOWN,
+                 step_up=DEFAULT_STEP_UP, cooldown=DEFAULT_COOLDOWN,
+                 recovery_tolerance=DEFAULT_RECOVERY_TOLERANCE, recovery_hold=DEFAULT_RECOVERY_HOLD):
+        self.enabled = False
+        self.target_fps = target_fps
+        self.upper_band = upper_band
+        self.lower_band = lower_band
+        self.step_down = step_down
+        self.step_up = step_up
+        self.cooldown = cooldown
+        self.recovery_tolerance = recovery_tolerance
+        self.recovery_hold = recovery_hold
+        self.level = 1.0
+        # Tempo de frame medido / alvo (>1 = acima do orçamento)
+        self.pressure = 0.0
+        self.last_adjust = None
+        # Início do período contínuo dentro do orçamento (None = fora)
+        self.within_since = None
+        self.dirty = True
+        self.stats = {
+            "adjustments": 0,
+            "reductions": 0,
+            "recoveries": 0,
+        }
+
+    def enable(self, target_fps=None, enabled=True):
+        """Liga (ou desliga) o governador, opcionalmente trocando o alvo"""
+        if target_fps is not None:
+            self.target_fps = max(1.0, float(target_fps))
+        self.enabled = enabled
+        self.dirty = True
+
+    def disable(self):
+        """Desliga e devolve a qualidade total no próximo tick"""
+        self.enabled = False
+        self.level = 1.0
+        self.within_since = None
+        self.dirty = True
+
+    def invalidate(self):
+        """Sistemas entraram ou saíram: redistribui no próximo tick"""
+        self.dirty = True
+
+    def update(self, records, frame_time, fps=None):
+        """
+        Chamado uma vez por tick do gerenciador
+        `fps`: taxa medida (padrão: logic.getAverageFrameRate())
+        Retorna: True se as escalas foram reaplicadas
+        """
+        if self.enabled:
+            if fps is None:
+                fps = logic.getAverageFrameRate()
+            if fps > 0:
+                self.pressure = self.target_fps / fps
+                self.adjust(frame_time)
+
+        if not self.dirty:
+            return False
+        self.apply(records)
+        return True
+
+    def adjust(self, frame_time):
+        """
+        Move o nível um passo quando a pressão sai da faixa de histerese ou
+        fica dentro do orçamento por recovery_hold segundos
+        """
+        if self.pressure <= 1.0 + self.recovery_tolerance:
+            if self.within_since is None:
+                self.within_since = frame_time
+        else:
+            self.within_since = None
+
+        if self.last_adjust is not None and frame_time - self.last_adjust < self.cooldown:
+            return
+
+        held = self.within_since is not None and frame_time - self.within_since >= self.recovery_hold
+        if self.pressure > 1.0 + self.upper_band and self.level > 0.0:
+            # Passo proporcional ao excesso, limitado a 3 passos
+            excess = min(3.0, (self.pressure - 1.0) / self.upper_band)
+            level = max(0.0, self.level - self.step_down * excess)
+            self.stats["reductions"] += 1
+        elif (self.pressure < 1.0 - self.lower_band or held) and self.level < 1.0:
+            level = min(1.0, self.level + self.step_up)
+            self.stats["recoveries"] += 1
+            if held:
+                # O próximo passo espera outro período inteiro no orçamento
+                self.within_since = frame_time
+        else:
+            return
+
+        self.last_adjust = frame_time
+        self.stats["adjustments"] += 1
+        self.level = level
+        self.dirty = True
+        if log.debug_enabled:
+            log.debug("Nível %.2f (pressão %.2f, alvo %.0f fps)", level, self.pressure, self.target_fps)
+
+    def apply(self, records):
+        """
+        Converte o nível em escalas: cada grupo de prioridade perde a sua
+        parte do corte, do menos prioritário para o mais prioritário
+        """
+        self.dirty = False
+        systems = [record.system for record in records]
+        priorities = sorted({system.quality_priority for system in systems})
+        cut = (1.0 - self.level) * len(priorities)
+        order = {priority: index for index, priority in enumerate(priorities)}
+        for system in systems:
+            scale = 1.0 - min(1.0, max(0.0, cut - order[system.quality_priority]))
+            system.set_quality_scale(max(system.quality_min, scale))
+
+    def scales(self, records):
+        """Escala atual de cada sistema (nome -> escala), para debug"""
+        return {record.system.object.name: record.system.quality_scale for record in records}
@@ -0,0 +1,71 @@
+"""
+Fontes de números aleatórios por partícula (lado NumPy)
+
+O getRand original, fract(sin(dot(...)) * 43758.5453), depende da precisão
+do sin de cada driver e perde uniformidade para j grande. Há duas
+alternativas selecionáveis por sistema (arg "random_source"):
+
+- "Hash": hash inteiro PCG de 32 bits (uint) calculado no shader;
+- "Tabela": textura RGBA32F sorteada com semente, um texel por partícula
+  (os quatro canais são os quatro fluxos), lida com texelFetch.
+
+Nas duas, os valores são múltiplos exatos de 2^-24, representáveis em
+float32 sem arredondamento; as funções abaixo produzem bit a bit o mesmo
+que o GLSL.
+"""
+import numpy as np
+
+# Valores do arg "random_source" -> RANDOM_SOURCE no shader
+RANDOM_SOURCES = {"Seno": 0, "Hash": 1, "Tabela": 2}
+
+# Fluxos independentes por partícula (dispersão x, y, z e um livre)
+RANDOM_STREAMS = 4
+
+# Lado padrão da tabela (texels); a sequência se repete a cada lado² partículas
+DEFAULT_LUT_SIZE = 256
+
+# Escala de um inteiro de 24 bits para [0, 1)
+INV_2_24 = np.float32(1.0 / 16777216.0)
+
+# Constantes do hash PCG (mesmas do GLSL)
+_PCG_MULTIPLIER = np.uint32(747796405)
+_PCG_INCREMENT = np.uint32(2891336453)
+_PCG_OUTPUT = np.uint32(277803737)
+
+def pcg_hash(values):
+    """
+    Hash PCG (RXS-M-XS) de 32 bits, com o mesmo transbordo do uint do GLSL
+    Retorna: array uint32
+    """
+    v = np.asarray(values).astype(np.uint32)
+    with np.errstate(over="ignore"):
+        state = v * _PCG_MULTIPLIER + _PCG_INCREMENT
+        word = ((state >> ((state >> np.uint32(28)) + np.uint32(4))) ^ state) * _PCG_OUTPUT
+    return (word >> np.uint32(22)) ^ word
+
+
+def hash_rand(j, stream):
+    """
+    Valor em [0, 1) da partícula `j` no fluxo `stream` (caminho "Hash")
+    GLSL: float(pcgHash(uint(j) * 4u + uint(stream)) >> 8u) * (1.0 / 16777216.0)
+    """
+    index = np.asarray(j).astype(np.uint32) * np.uint32(RANDOM_STREAMS) + np.uint32(stream)
+    return (pcg_hash(index) >> np.uint32(8)).astype(np.float32) * INV_2_24
+
+
+def generate_lut(seed=1, size=DEFAULT_LUT_SIZE):
+    """
+    Tabela sorteada para o caminho "Tabela"
+    Retorna: array float32 (size * size, 4) com valores k / 2^24
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 1 << 24, size=(size * size, RANDOM_STREAMS), dtype=np.int64)
+    return values.astype(np.float32) * INV_2_24
+
+
+def lut_rand(lut, j, stream):
+    """
+    Valor da partícula `j` no fluxo `stream` lido da tabela, como o
+    texelFetch do shader (índice j módulo o número de texels)
+    """
+    return lut[np.asarray(j).astype(np.int64) % len(lut), stream]
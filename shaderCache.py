@@ -0,0 +1,128 @@
+"""
+Cache global de programas de shader compilados
+
+Os programas são identificados pelo hash das fontes geradas (vertex,
+geometry e fragment). Um shader que já recebeu exatamente essas fontes não
+é recompilado - é o caso comum de vários objetos "chuva" com os mesmos args
+compartilhando o mesmo material.
+
+O Range não permite ligar um programa compilado a outro material, então
+materiais diferentes com fontes idênticas ainda compilam uma vez cada; o
+cache garante que nenhum deles recompile enquanto a configuração não mudar.
+"""
+import hashlib
+from collections import OrderedDict
+
+SHADER_STAGES = ("vertex", "geometry", "fragment")
+
+
+def source_key(sources):
+    """
+    Gera a chave do programa a partir das fontes dos estágios
+    Retorna: hash hexadecimal (sha1)
+    """
+    digest = hashlib.sha1()
+    for stage in SHADER_STAGES:
+        digest.update(stage.encode())
+        digest.update(b"\0")
+        digest.update(sources.get(stage, "").encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ShaderProgramCache:
+    """
+    Cache LRU de programas por hash de fonte, com contadores de acerto/falha
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        # chave -> {"sources": ..., "shaders": [shaders que contêm o programa]}
+        self._entries = OrderedDict()
+        # id(shader) -> (shader, chave) do programa carregado nele; independe
+        # do LRU: o programa continua no shader mesmo após sair do cache
+        self._loaded = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_sources(self, key):
+        """Fontes de um programa em cache (ou None)"""
+        entry = self._entries.get(key)
+        return entry["sources"] if entry else None
+
+    def loaded_key(self, shader):
+        """Chave do programa atualmente carregado em `shader` (ou None)"""
+        loaded = self._loaded.get(id(shader))
+        if loaded and loaded[0] is shader:
+            return loaded[1]
+        return None
+
+    def bind(self, shader, sources, key=None):
+        """
+        Garante que `shader` esteja com o programa de `sources`
+        Compila apenas se o shader ainda não tiver esse programa
+        Retorna: True se compilou, False se reutilizou
+        """
+        if key is None:
+            key = source_key(sources)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        if self.loaded_key(shader) == key and shader.isValid():
+            self.hits += 1
+            return False
+        if entry is None:
+            entry = {"sources": sources, "shaders": []}
+            self._entries[key] = entry
+
+        self.misses += 1
+        previous = self.loaded_key(shader)
+        if previous is not None and previous in self._entries:
+            shaders = self._entries[previous]["shaders"]
+            if shader in shaders:
+                shaders.remove(shader)
+
+        shader.setSourceList(sources, 1)
+        self._loaded[id(shader)] = (shader, key)
+        entry["shaders"].append(shader)
+        self._evict()
+        return True
+
+    def _evict(self):
+        """
+        Remove as fontes dos programas menos usados recentemente além do
+        limite; os shaders que já têm o programa não são tocados e não
+        recompilam por causa disso
+        """
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Esvazia o cache e zera os contadores"""
+        self._entries.clear()
+        self._loaded.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Contadores do cache"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Cache compartilhado por todos os AdvancedParticleSystem do processo
+program_cache = ShaderProgramCache()
@@ -0,0 +1,57 @@
+"""
+Relógios injetáveis para a simulação do clima
+
+O ClimaControl lê o tempo apenas por `clock.now()`. O relógio do motor segue
+o tempo de jogo (para quando o jogo pausa), o manual só avança quando
+advance() é chamado (testes headless e replays) e o do sistema reproduz o
+comportamento antigo com time.time().
+"""
+from Range import *
+import time
+
+
+class EngineClock:
+    """Tempo de jogo do motor (logic.getFrameTime)"""
+
+    def now(self):
+        return logic.getFrameTime()
+
+
+class ManualClock:
+    """Tempo controlado pelo chamador"""
+
+    def __init__(self, start=0.0):
+        self.time = float(start)
+
+    def now(self):
+        return self.time
+
+    def advance(self, seconds):
+        """Avança o relógio e retorna o novo tempo"""
+        self.time += seconds
+        return self.time
+
+    def set(self, value):
+        self.time = float(value)
+
+
+class WallClock:
+    """Relógio de parede (time.time), continua correndo com o jogo pausado"""
+
+    def now(self):
+        return time.time()
+
+
+# Nomes usados no arg "Relógio" do ClimaControl (o ManualClock entra só
+# pelo definir_relogio(), em testes headless)
+CLOCKS = {
+    "Motor": EngineClock,
+    "Sistema": WallClock,
+}
+
+
+def create_clock(kind="Motor"):
+    """
+    Cria um relógio pelo nome (padrão: tempo do motor)
+    """
+    return CLOCKS.get(kind, EngineClock)()
@@ -0,0 +1,130 @@
+"""
+Espelho de estado dos uniforms de um shader
+
+Guarda o último valor enviado de cada uniform e só chama setUniform* quando
+o valor muda. Há um espelho por shader (não por componente), então vários
+objetos que compartilham o material também deixam de reenviar os mesmos
+valores no mesmo frame.
+
+Valores próprios de cada objeto (intensidade, LOD...) não podem ficar no
+estado compartilhado: o último sistema a enviar venceria para todos. O
+espelho também registra um único callback de desenho (objectCallbacks) que
+despacha para o sistema do objeto sendo desenhado, e guarda em `owner` de
+quem são os valores por objeto carregados no programa.
+"""
+
+# Totais de todos os espelhos do processo
+totals = {"uploads": 0, "skipped": 0}
+
+
+class UniformState:
+    """
+    Envia uniforms apenas quando o valor difere do último enviado
+    """
+
+    def __init__(self, shader):
+        self.shader = shader
+        self.values = {}
+        self.uploads = 0
+        self.skipped = 0
+        # Sistema cujos uniforms por objeto estão no programa agora
+        self.owner = None
+        # Callbacks de desenho por objeto: id(objeto) -> (objeto, callback)
+        self.draw_callbacks = {}
+
+    def invalidate(self, name=None):
+        """
+        Esquece os valores enviados (todos ou um uniform)
+        Necessário após recompilar, pois o programa novo começa zerado
+        """
+        if name is None:
+            self.values.clear()
+            self.owner = None
+        else:
+            self.values.pop(name, None)
+
+    def _changed(self, name, value):
+        """Registra o valor e informa se precisa ser enviado"""
+        if self.values.get(name) == value:
+            self.skipped += 1
+            totals["skipped"] += 1
+            return False
+        self.values[name] = value
+        self.uploads += 1
+        totals["uploads"] += 1
+        return True
+
+    def set1f(self, name, x):
+        if self._changed(name, x):
+            self.shader.setUniform1f(name, x)
+
+    def set1i(self, name, x):
+        if self._changed(name, x):
+            self.shader.setUniform1i(name, x)
+
+    def set2f(self, name, x, y):
+        if self._changed(name, (x, y)):
+            self.shader.setUniform2f(name, x, y)
+
+    def set3f(self, name, x, y, z):
+        if self._changed(name, (x, y, z)):
+            self.shader.setUniform3f(name, x, y, z)
+
+    def set4f(self, name, x, y, z, w):
+        if self._changed(name, (x, y, z, w)):
+            self.shader.setUniform4f(name, x, y, z, w)
+
+    def attach(self, obj, callback):
+        """
+        Chama `callback(obj)` sempre que o motor desenhar `obj` com este
+        shader. Um único objectCallback por shader despacha pelo objeto, em
+        vez de cada sistema testar o desenho de todos os outros
+        Retorna: False se o motor não oferece objectCallbacks
+        """
+        callbacks = getattr(self.shader, "objectCallbacks", None)
+        if callbacks is None:
+            return False
+        if self.dispatch not in callbacks:
+            callbacks.append(self.dispatch)
+        self.draw_callbacks[id(obj)] = (obj, callback)
+        return True
+
+    def detach(self, obj):
+        """Remove o callback de desenho de `obj`"""
+        self.draw_callbacks.pop(id(obj), None)
+        if self.owner is not None and getattr(self.owner, "object", None) is obj:
+            self.owner = None
+        callbacks = getattr(self.shader, "objectCallbacks", None)
+        if not self.draw_callbacks and callbacks and self.dispatch in callbacks:
+            callbacks.remove(self.dispatch)
+
+    def dispatch(self, obj):
+        """objectCallback do shader: repassa ao sistema do objeto desenhado"""
+        entry = self.draw_callbacks.get(id(obj))
+        if entry is not None and entry[0] is obj:
+            entry[1](obj)
+
+    def stats(self):
+        """Contadores de envios realizados e evitados"""
+        return {"uploads": self.uploads, "skipped": self.skipped}
+
+
+# Um espelho por shader: id(shader) -> UniformState
+_states = {}
+
+
+def uniform_state_for(shader):
+    """
+    Retorna o espelho compartilhado do shader, criando-o se necessário
+    """
+    state = _states.get(id(shader))
+    if state is None or state.shader is not shader:
+        state = UniformState(shader)
+        _states[id(shader)] = state
+    return state
+
+
+def reset_totals():
+    """Zera os totais globais de envios"""
+    totals["uploads"] = 0
+    totals["skipped"] = 0
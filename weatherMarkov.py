@@ -0,0 +1,138 @@
+"""
+Modelo de clima por cadeia de Markov (NumPy)
+
+Cada clima tem uma linha de probabilidades de transição (ex.: neve fica mais
+provável depois de nublado) e um fator de duração próprio. A agenda é gerada
+em lote: os sorteios de toda a sequência saem de uma vez e a cadeia é
+resolvida por uma varredura prefixada de composições (log2(n) passos
+vetorizados), sem laço Python por etapa.
+"""
+import numpy as np
+
+# Ordem dos estados nas matrizes
+STATES = ("ensolarado", "seco", "nublado", "chuvoso", "nevando")
+STATE_INDEX = {state: i for i, state in enumerate(STATES)}
+
+# Afinidade entre climas: multiplica a probabilidade base da transição
+# linha = clima atual, coluna = próximo clima (1.0 = neutro)
+DEFAULT_AFFINITY = np.array([
+    # ensol  seco  nubl  chuva neve
+    [1.0,   1.2,  1.0,  0.7,  0.5],   # ensolarado
+    [1.2,   1.0,  0.8,  0.6,  0.5],   # seco
+    [0.8,   0.6,  1.0,  1.6,  2.0],   # nublado
+    [0.8,   0.5,  1.6,  1.0,  0.8],   # chuvoso
+    [0.7,   0.4,  1.5,  0.6,  1.0],   # nevando
+])
+
+# Fator aplicado ao sorteio uniforme entre duração mínima e máxima
+DEFAULT_DURATION_FACTORS = {
+    "ensolarado": 1.2,
+    "seco": 1.0,
+    "nublado": 1.0,
+    "chuvoso": 0.8,
+    "nevando": 0.9,
+}
+
+
+def base_probabilities(chance_chuva, chance_neve):
+    """
+    Tabela independente do ClimaControl original: chuva e neve pelas
+    chances configuradas e o restante dividido entre os demais climas
+    Retorna: array na ordem de STATES (soma 1)
+    """
+    rest = max(0.0, 100.0 - chance_chuva - chance_neve) / 3.0
+    probabilities = np.array([rest, rest, rest, chance_chuva, chance_neve], dtype=np.float64)
+    total = probabilities.sum()
+    if total <= 0:
+        return np.full(len(STATES), 1.0 / len(STATES))
+    return probabilities / total
+
+
+class WeatherMarkov:
+    """
+    Matriz de transição + fatores de duração, com geração vetorizada da agenda
+    """
+
+    def __init__(self, transitions, duration_factors=None):
+        transitions = np.asarray(transitions, dtype=np.float64)
+        if transitions.shape != (len(STATES), len(STATES)):
+            raise ValueError(f"Matriz de transição deve ser {len(STATES)}x{len(STATES)}")
+        transitions = np.clip(transitions, 0.0, None)
+        sums = transitions.sum(axis=1, keepdims=True)
+        sums[sums == 0] = 1.0
+        self.transitions = transitions / sums
+
+        factors = dict(DEFAULT_DURATION_FACTORS)
+        factors.update(duration_factors or {})
+        self.duration_factors = np.array([factors[state] for state in STATES], dtype=np.float64)
+
+        # Limites acumulados por linha para o sorteio por inversão
+        self.cumulative = np.cumsum(self.transitions, axis=1)
+        self.cumulative[:, -1] = 1.0
+        self._rows = {}
+
+    @classmethod
+    def from_chances(cls, chance_chuva, chance_neve, affinity=DEFAULT_AFFINITY,
+                     persistence=0.0, duration_factors=None):
+        """
+        Constrói o modelo a partir das chances do ClimaControl: cada linha é
+        a tabela base ajustada pela afinidade e pela `persistence` (chance
+        extra de repetir o clima atual)
+        """
+        base = base_probabilities(chance_chuva, chance_neve)
+        transitions = base[None, :] * np.asarray(affinity, dtype=np.float64)
+        transitions /= transitions.sum(axis=1, keepdims=True)
+        if persistence > 0:
+            transitions = (1.0 - persistence) * transitions + persistence * np.eye(len(STATES))
+        return cls(transitions, duration_factors)
+
+    def probabilities(self, state):
+        """
+        Probabilidades (%) do próximo clima a partir de `state` (em cache)
+        """
+        row = self._rows.get(state)
+        if row is None:
+            values = self.transitions[STATE_INDEX.get(state, 0)] * 100.0
+            row = self._rows[state] = {name: float(value) for name, value in zip(STATES, values)}
+        return row
+
+    def stationary(self):
+        """Distribuição de longo prazo (fração do tempo em cada clima, sem durações)"""
+        values, vectors = np.linalg.eig(self.transitions.T)
+        vector = np.real(vectors[:, np.argmin(np.abs(values - 1.0))])
+        vector = np.abs(vector)
+        return {state: float(value) for state, value in zip(STATES, vector / vector.sum())}
+
+    def generate(self, start, count, rng, duracao_min, duracao_max):
+        """
+        Gera `count` etapas seguintes a `start` em uma passada vetorizada
+        Retorna: (índices dos climas, durações em segundos), arrays de tamanho `count`
+        """
+        if count <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        draws = rng.random(count)
+        # step[i, s] = próximo clima vindo de s com o sorteio i
+        step = (draws[:, None, None] >= self.cumulative[None, :, :]).sum(axis=2)
+
+        # Varredura prefixada: chain[i] = step[i] ∘ ... ∘ step[0]
+        chain = step
+        shift = 1
+        while shift < count:
+            chain[shift:] = np.take_along_axis(chain[shift:], chain[:-shift], axis=1)
+            shift *= 2
+
+        states = chain[:, STATE_INDEX.get(start, 0)]
+        durations = rng.uniform(duracao_min, duracao_max, count) * self.duration_factors[states]
+        return states, durations
+
+    def sample_duration(self, state, rng, duracao_min, duracao_max):
+        """Duração de uma única etapa de `state`"""
+        return float(rng.uniform(duracao_min, duracao_max) * self.duration_factors[STATE_INDEX.get(state, 0)])
+
+    def schedule(self, start, count, rng, duracao_min, duracao_max):
+        """
+        Agenda como lista de (clima, duração) - formato consumido pelo ClimaControl
+        """
+        states, durations = self.generate(start, count, rng, duracao_min, duracao_max)
+        return [(STATES[state], float(duration)) for state, duration in zip(states.tolist(), durations.tolist())]
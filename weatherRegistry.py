@@ -0,0 +1,180 @@
+"""
+Registro de sistemas de partículas por tipo de clima
+
+Cada AdvancedParticleSystem entra no registro da sua cena no awake(), com o
+tipo vindo da propriedade "weather_type" do objeto, do arg "weather_type" ou,
+em último caso, do nome do objeto. O índice é por tipo, então o ClimaControl
+não precisa varrer scene.objects; sistemas criados ou removidos depois são
+avisados aos ouvintes registrados.
+"""
+
+# Tipos de clima conhecidos pelos sistemas de partículas
+WEATHER_TYPES = ("chuva", "neve", "nevoa", "poeira", "folhas")
+
+# Valores do arg "weather_type" que não são tipos
+AUTO_TYPE = "Automático"
+NO_TYPE = "Nenhum"
+
+# 🔥 ORDEM IMPORTANTE: termos mais específicos primeiro
+NAME_KEYWORDS = [
+    ("neve", ["snow", "nevando", "neve_", "_neve"]),
+    ("chuva", ["rain", "chuvando", "chuva_", "_chuva"]),
+    ("nevoa", ["fog", "mist", "nevoa", "nevoeiro"]),
+    ("poeira", ["dust", "poeira"]),
+    ("folhas", ["leaves", "leaf", "folhas"])
+]
+
+# Prioridade de qualidade por tipo (menor = reduzido primeiro pelo
+# governador de qualidade): precipitação densa sai antes do ambiente
+QUALITY_PRIORITIES = {
+    "chuva": 1,
+    "neve": 2,
+    "poeira": 3,
+    "nevoa": 4,
+    "folhas": 5,
+}
+
+# Sistemas sem tipo de clima (efeitos de jogo) são os últimos a perder partículas
+DEFAULT_QUALITY_PRIORITY = 10
+
+# Eventos enviados aos ouvintes
+ADDED = "adicionado"
+REMOVED = "removido"
+
+
+def type_from_name(name):
+    """
+    Tipo de clima pelo nome do objeto (fallback por palavra-chave)
+    Retorna: (tipo, palavra-chave) ou (None, None)
+    """
+    name_lower = name.lower().strip()
+    for weather_type, keywords in NAME_KEYWORDS:
+        for keyword in keywords:
+            if keyword in name_lower:
+                return weather_type, keyword
+    return None, None
+
+
+def quality_priority(weather_type):
+    """Prioridade de qualidade de um tipo de clima (None = sem tipo)"""
+    return QUALITY_PRIORITIES.get(weather_type, DEFAULT_QUALITY_PRIORITY)
+
+
+def resolve_weather_type(obj, explicit=AUTO_TYPE):
+    """
+    Resolve o tipo de clima de um objeto: propriedade "weather_type",
+    depois o valor explícito do arg e, por fim, o nome do objeto
+    Retorna: tipo ou None
+    """
+    value = obj.get("weather_type", explicit) or AUTO_TYPE
+    if value == NO_TYPE:
+        return None
+    if value != AUTO_TYPE:
+        return value
+    return type_from_name(obj.name)[0]
+
+
+class WeatherRegistry:
+    """
+    Índice tipo -> sistemas de uma cena, com inserção/remoção O(1)
+    """
+
+    def __init__(self, scene=None):
+        self.scene = scene
+        # tipo -> {id(sistema): sistema} (mantém a ordem de registro)
+        self.by_type = {}
+        # id(sistema) -> tipo
+        self.types = {}
+        self.listeners = []
+
+    def __len__(self):
+        return len(self.types)
+
+    def __contains__(self, system):
+        return id(system) in self.types
+
+    def register(self, system, weather_type):
+        """
+        Adiciona (ou move de tipo) um sistema e avisa os ouvintes
+        """
+        if weather_type is None:
+            return
+        current = self.types.get(id(system))
+        if current == weather_type:
+            return
+        if current is not None:
+            self.unregister(system)
+
+        self.types[id(system)] = weather_type
+        self.by_type.setdefault(weather_type, {})[id(system)] = system
+        self.notify(ADDED, weather_type, system)
+
+    def unregister(self, system):
+        """Remove um sistema e avisa os ouvintes"""
+        weather_type = self.types.pop(id(system), None)
+        if weather_type is None:
+            return
+        systems = self.by_type.get(weather_type)
+        if systems is not None:
+            systems.pop(id(system), None)
+            if not systems:
+                del self.by_type[weather_type]
+        self.notify(REMOVED, weather_type, system)
+
+    def prune(self):
+        """
+        Remove sistemas cujos objetos saíram da cena sem dispose()
+        Retorna: número de sistemas removidos
+        """
+        removed = [system
+                   for systems in self.by_type.values()
+                   for system in systems.values()
+                   if system.object.invalid]
+        for system in removed:
+            self.unregister(system)
+        return len(removed)
+
+    def systems(self, weather_type):
+        """Sistemas de um tipo (lista nova, segura para iterar e alterar)"""
+        return list(self.by_type.get(weather_type, {}).values())
+
+    def type_of(self, system):
+        return self.types.get(id(system))
+
+    def weather_types(self):
+        return list(self.by_type.keys())
+
+    def add_listener(self, callback):
+        """
+        Registra callback(evento, tipo, sistema) para ADDED/REMOVED
+        """
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def notify(self, event, weather_type, system):
+        for callback in list(self.listeners):
+            callback(event, weather_type, system)
+
+
+# Um registro por cena: id(cena) -> WeatherRegistry
+_registries = {}
+
+
+def get_registry(scene):
+    """
+    Retorna o registro da cena, criando-o no primeiro uso
+    """
+    registry = _registries.get(id(scene))
+    if registry is None or registry.scene is not scene:
+        registry = WeatherRegistry(scene)
+        _registries[id(scene)] = registry
+    return registry
+
+
+def remove_registry(scene):
+    """Descarta o registro de uma cena (ex.: ao trocar de cena)"""
+    _registries.pop(id(scene), None)
@@ -0,0 +1,183 @@
+"""
+Campo de vento global por cena (NumPy)
+
+Um único campo por cena, atualizado uma vez por frame (a primeira chamada
+de update() com um tempo novo faz o trabalho; as demais retornam na hora):
+
+- vento médio analítico: direção base x força, com rajadas formadas por
+  duas senoides de frequências incomensuráveis e uma leve oscilação da
+  direção;
+- turbulência: grade 3D grossa de vetores aleatórios, interpolada
+  trilinearmente e transportada pelo vento médio (a grade "corre" com o
+  vento), usada pelas partículas com estado.
+
+Os sistemas sem estado recebem apenas `wind_vector` e `wind_turbulence`
+como uniforms (enviados só quando mudam); os com estado amostram a grade
+por partícula. O ClimaControl ajusta força e rajada por clima com
+set_target(), e o campo interpola até o alvo.
+"""
+import math
+
+import numpy as np
+
+# Resolução padrão da grade de turbulência (x, y, z) e tamanho da célula (m)
+DEFAULT_GRID = (8, 8, 4)
+DEFAULT_CELL_SIZE = 8.0
+
+# Frequência base das rajadas (Hz)
+DEFAULT_GUST_FREQUENCY = 0.15
+
+
+class WindField:
+    """
+    Vento médio com rajadas + grade de turbulência transportada
+    """
+
+    def __init__(self, direction=(1.0, 0.0, 0.0), strength=0.0, gust=0.0,
+                 turbulence=0.25, grid=DEFAULT_GRID, cell_size=DEFAULT_CELL_SIZE,
+                 gust_frequency=DEFAULT_GUST_FREQUENCY, seed=None):
+        self.scene = None
+        self.set_direction(direction)
+        self.strength = float(strength)
+        self.gust = float(gust)
+        self.turbulence = float(turbulence)
+        self.gust_frequency = gust_frequency
+        self.cell_size = float(cell_size)
+
+        # Alvos interpolados pelo update() (ClimaControl)
+        self.target_strength = self.strength
+        self.target_gust = self.gust
+        self.ramp_time = 0.0
+
+        rng = np.random.default_rng(seed)
+        self.grid = rng.uniform(-1.0, 1.0, tuple(grid) + (3,)).astype(np.float32)
+        self.grid_shape = np.array(grid, dtype=np.int64)
+        self.phase = float(rng.uniform(0.0, 2.0 * math.pi))
+
+        self.time = None
+        self.offset = np.zeros(3, dtype=np.float32)
+        self.vector = np.zeros(3, dtype=np.float32)
+        self.uniform_vector = (0.0, 0.0, 0.0)
+        self.uniform_turbulence = 0.0
+        self.updates = 0
+        # Incrementado a cada novo alvo (volumes envolventes dependem do vento máximo)
+        self.revision = 0
+
+    def set_direction(self, direction):
+        """Direção base (normalizada; vetor nulo vira +x)"""
+        direction = np.asarray(tuple(direction)[:3], dtype=np.float32)
+        length = float(np.linalg.norm(direction))
+        self.direction = direction / length if length > 1e-6 else np.array([1.0, 0.0, 0.0], dtype=np.float32)
+
+    def set_target(self, strength, gust=None, ramp_time=0.0):
+        """
+        Leva força (m/s) e rajada (0..1) até o alvo em `ramp_time` segundos
+        """
+        self.target_strength = max(0.0, float(strength))
+        if gust is not None:
+            self.target_gust = max(0.0, float(gust))
+        self.ramp_time = max(0.0, float(ramp_time))
+        self.revision += 1
+        if self.ramp_time == 0.0:
+            self.strength = self.target_strength
+            self.gust = self.target_gust
+
+    def update(self, frame_time):
+        """
+        Avança o campo até `frame_time` (uma vez por frame para a cena toda)
+        Retorna: True se o campo foi recalculado
+        """
+        if frame_time == self.time:
+            return False
+        dt = 0.0 if self.time is None else max(0.0, frame_time - self.time)
+        self.time = frame_time
+        self.updates += 1
+
+        if self.ramp_time > 0.0 and dt > 0.0:
+            step = min(1.0, dt / self.ramp_time)
+            self.strength += (self.target_strength - self.strength) * step
+            self.gust += (self.target_gust - self.gust) * step
+            self.ramp_time = max(0.0, self.ramp_time - dt)
+
+        # Rajadas: soma de senoides incomensuráveis (não se repete visivelmente)
+        angle = 2.0 * math.pi * self.gust_frequency * frame_time + self.phase
+        gust = 0.6 * math.sin(angle) + 0.4 * math.sin(2.31 * angle + 1.7)
+        strength = max(0.0, self.strength * (1.0 + self.gust * gust))
+
+        # Oscilação lenta da direção no plano xy (até ~15° com rajada total)
+        wobble = 0.26 * self.gust * math.sin(0.37 * angle + 0.5)
+        c, s = math.cos(wobble), math.sin(wobble)
+        x, y, z = self.direction
+        self.vector[:] = (strength * (c * x - s * y), strength * (s * x + c * y), strength * z)
+
+        # A grade de turbulência é transportada pelo vento médio
+        self.offset += self.vector * np.float32(dt)
+        self.offset %= self.grid_shape * np.float32(self.cell_size)
+
+        self.uniform_vector = (float(self.vector[0]), float(self.vector[1]), float(self.vector[2]))
+        # Amplitude pela força base (sem rajada): só muda durante as rampas
+        self.uniform_turbulence = self.turbulence * self.strength
+        return True
+
+    def max_speed(self):
+        """
+        Maior velocidade do vento médio até o fim da rampa atual (m/s),
+        com a rajada no pico: as rajadas ficam entre -1 e +1 x gust
+        """
+        strength = max(self.strength, self.target_strength)
+        return strength * (1.0 + max(self.gust, self.target_gust))
+
+    def max_turbulence(self):
+        """Maior amplitude de turbulência (uniform_turbulence) até o fim da rampa"""
+        return self.turbulence * max(self.strength, self.target_strength)
+
+    def sample(self, positions):
+        """
+        Velocidade do ar em cada posição (N, 3): vento médio + turbulência
+        interpolada da grade (repetida periodicamente no espaço)
+        """
+        positions = np.asarray(positions, dtype=np.float32)
+        g = (positions - self.offset) / np.float32(self.cell_size)
+        base = np.floor(g)
+        frac = (g - base).astype(np.float32)
+        base = base.astype(np.int64)
+        nx, ny, nz = self.grid_shape
+
+        x0 = base[:, 0] % nx
+        y0 = base[:, 1] % ny
+        z0 = base[:, 2] % nz
+        x1 = (x0 + 1) % nx
+        y1 = (y0 + 1) % ny
+        z1 = (z0 + 1) % nz
+        fx, fy, fz = frac[:, 0:1], frac[:, 1:2], frac[:, 2:3]
+
+        grid = self.grid
+        c00 = grid[x0, y0, z0] + (grid[x1, y0, z0] - grid[x0, y0, z0]) * fx
+        c10 = grid[x0, y1, z0] + (grid[x1, y1, z0] - grid[x0, y1, z0]) * fx
+        c01 = grid[x0, y0, z1] + (grid[x1, y0, z1] - grid[x0, y0, z1]) * fx
+        c11 = grid[x0, y1, z1] + (grid[x1, y1, z1] - grid[x0, y1, z1]) * fx
+        c0 = c00 + (c10 - c00) * fy
+        c1 = c01 + (c11 - c01) * fy
+        turbulence = c0 + (c1 - c0) * fz
+        return self.vector + turbulence * np.float32(self.uniform_turbulence)
+
+
+# Um campo por cena: id(cena) -> WindField
+_fields = {}
+
+
+def get_wind_field(scene):
+    """
+    Retorna o campo de vento da cena, criando-o (sem vento) no primeiro uso
+    """
+    field = _fields.get(id(scene))
+    if field is None or field.scene is not scene:
+        field = WindField()
+        field.scene = scene
+        _fields[id(scene)] = field
+    return field
+
+
+def remove_wind_field(scene):
+    """Descarta o campo de uma cena (ex.: ao trocar de cena)"""
+    _fields.pop(id(scene), None)